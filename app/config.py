@@ -25,14 +25,118 @@ GEO_IDS = {
 USER_DATA_DIR = "linkedin_profile"
 HEADLESS = False
 MAX_JOBS_PER_ROLE = 30
+# Постраничный обход поиска по смещению start: SEARCH_MAX_PAGES = 1 — одна страница
+# со скроллом до MAX_JOBS_PER_ROLE карточек; больше 1 — до стольких страниц по SEARCH_PAGE_SIZE
+SEARCH_MAX_PAGES = 1
+SEARCH_PAGE_SIZE = 25
+# Сколько страниц поиска открывать параллельно (отдельные вкладки)
+SEARCH_PARALLEL_PAGES = 1
+# Остановить обход, когда страница поиска не дала ни одной новой вакансии (все уже в БД или в этом прогоне)
+SEARCH_STOP_ON_KNOWN = True
+# Сколько вкладок вакансий работают параллельно в одном контексте браузера
+DETAIL_TABS = 3
+# Не открывать вакансии, чей LinkedIn job ID уже есть в БД (им только обновляется updated_at)
+SKIP_KNOWN_JOBS = True
+# Отсев карточек поиска по заголовку до открытия вакансии: заголовок с ключами только
+# других ролей не открываем. Заголовок без ключей ролей («Специалист», «Engineer») —
+# «неясно»: при PREFILTER_VISIT_UNKNOWN = True такие вакансии всё равно открываются.
+PREFILTER_BY_TITLE = True
+PREFILTER_VISIT_UNKNOWN = True
+# Ключи дедупликации прошлых прогонов: фильтр Блума по dedup_hash из БД, сохраняется в файл
+# и при следующем старте дочитывает только новые строки. Срабатывание фильтра подтверждается
+# точным запросом по уникальному индексу. Ёмкость — минимальная, при росте таблицы фильтр пересобирается.
+DEDUP_BLOOM_ENABLED = True
+DEDUP_BLOOM_PATH = "runs/dedup_bloom.bin"
+DEDUP_BLOOM_CAPACITY = 2_000_000
+DEDUP_BLOOM_ERROR_RATE = 0.001
+# Почти-дубликаты по описанию (MinHash + LSH): репосты с изменённым началом или другим
+# рекрутером не сохраняются повторно. Сигнатуры хранятся в колонке minhash и загружаются
+# в индекс в начале прогона. Похожесть — оценка коэффициента Жаккара шинглов из слов.
+NEAR_DUP_ENABLED = True
+NEAR_DUP_THRESHOLD = 0.8
+NEAR_DUP_SHINGLE_WORDS = 5
+# Описания короче стольких шинглов не проверяются (слишком мало текста для сравнения)
+NEAR_DUP_MIN_SHINGLES = 10
+# Длина сигнатуры и LSH-полосы: кандидаты — совпадение хотя бы одной полосы из BANDS по ROWS значений
+NEAR_DUP_NUM_PERM = 64
+NEAR_DUP_BANDS = 8
+NEAR_DUP_ROWS = 4
+# Выгрузка в JSON (SAVE_TO_JSON=true в .env): вакансии пишутся в NDJSON по мере приёма,
+# в конце прогона конвертируются в OUTPUT_JSON_PATH (прежний формат — массив с indent=2).
+# Сжатие — по расширению: .ndjson.gz (gzip) или .ndjson.zst (zstd, пакет zstandard).
+OUTPUT_NDJSON_PATH = "output_linkedin.ndjson"
+OUTPUT_JSON_PATH = "output_linkedin.json"
+# Сброс на диск (fsync) каждые N вакансий или раз в столько секунд
+OUTPUT_FSYNC_EVERY = 20
+OUTPUT_FSYNC_INTERVAL_SEC = 5.0
+# Журналы прогонов для --resume: runs/<run_id>/journal-*.jsonl
+RUNS_DIR = "runs"
+# Кэш контактов рекрутеров в PostgreSQL: сколько часов доверять записи с контактами / без них
+CONTACT_CACHE_TTL_HOURS = 24 * 14
+CONTACT_CACHE_NEGATIVE_TTL_HOURS = 24 * 3
+# Фоновая запись в PostgreSQL: размер пачки, ёмкость очереди, максимальная задержка сброса
+WRITER_BATCH_SIZE = 50
+WRITER_QUEUE_SIZE = 1000
+WRITER_FLUSH_INTERVAL_SEC = 2.0
+WRITER_RECONNECT_ATTEMPTS = 3
+# Вакансии, не попавшие в БД (переполнение очереди, БД недоступна), дописываются сюда;
+# дозапись в БД: python -m app.main --replay-spill. Пустая строка — просто отбрасывать
+WRITER_SPILL_PATH = "runs/writer_spill.ndjson"
+# Сохранять DOM страниц вакансий (gzip, по sha256) для офлайн-переизвлечения: python -m app.offline
+CAPTURE_SNAPSHOTS = False
+SNAPSHOTS_DIR = "snapshots"
+# Источник данных вакансии: "dom" — текст страницы после скролла и раскрытия описания,
+# "network" — JSON-ответы Voyager API, перехваченные при загрузке (при их отсутствии — "dom")
+EXTRACT_MODE = "dom"
+# Сколько ждать JSON с заголовком и описанием, и сколько после него — ответа команды найма
+NETWORK_PAYLOAD_TIMEOUT_MS = 5000
+NETWORK_HIRING_GRACE_MS = 1000
 PAGE_TIMEOUT_MS = 20_000
 NAV_TIMEOUT_MS = 20_000
 RETRY_ATTEMPTS = 3
 RETRY_DELAYS_SEC = [1, 5, 15]
-# Базовый джиттер между действиями (по умолчанию ~1.5–4 сек вместо 2–5)
-MIN_DELAY_SEC = 1.5
-MAX_DELAY_SEC = 4
+# Адаптивный темп навигаций (token bucket + AIMD), запросов в секунду на процесс
+RATE_START_RPS = 0.4
+RATE_MIN_RPS = 0.05
+RATE_MAX_RPS = 2.0
+# +RATE_INCREASE_RPS после чистой загрузки, ×RATE_DECREASE_FACTOR на сигнал антибота
+RATE_INCREASE_RPS = 0.05
+RATE_DECREASE_FACTOR = 0.5
+# Общая пауза всех вкладок после редиректа/authwall
+RATE_BLOCK_COOLDOWN_SEC = 30
+# Случайная добавка к каждой навигации, чтобы темп не был машинным
+RATE_JITTER_SEC = 0.7
+# Короткая человеческая пауза между действиями на странице (скролл, клик), мс
+HUMAN_PAUSE_MIN_MS = 150
+HUMAN_PAUSE_MAX_MS = 400
 
 PROXY_SERVER = None
 PROXY_USERNAME = None
-PROXY_PASSWORD = None
\ No newline at end of file
+PROXY_PASSWORD = None
+
+# Шардирование матрицы город × роль по процессам (1 = обычный запуск в одном процессе).
+# Каждый процесс работает со своей копией профиля USER_DATA_DIR.
+SHARDS = 1
+# Прокси для шардов по кругу (пусто — все шарды используют PROXY_SERVER)
+SHARD_PROXIES = []
+# Метрики этапов: JSON-отчёт пишется в runs/<run_id>/metrics-<part>.json всегда.
+# METRICS_PORT > 0 — отдавать /metrics в формате Prometheus во время прогона (шард N — порт + N),
+# METRICS_PROM_FILE — путь .prom-файла для node_exporter textfile collector (пишется в конце прогона).
+METRICS_PORT = 0
+METRICS_PROM_FILE = None
+# Блокировка ненужных ресурсов в браузере (мы читаем только текст)
+BLOCK_RESOURCES = True
+BLOCK_RESOURCE_TYPES = ["image", "media", "font"]
+# Подстроки URL аналитики/рекламы/трекинга
+BLOCK_URL_PATTERNS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "bat.bing.com",
+    "ads.linkedin.com",
+    "snap.licdn.com/li.lms-analytics",
+    "linkedin.com/li/track",
+    "linkedin.com/realtime/",
+]
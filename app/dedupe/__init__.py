@@ -1,3 +1 @@
-from .key import dedup_key
-
-
+from .key import dedup_digest, dedup_key
@@ -0,0 +1,126 @@
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+# Заголовок файла фильтра: magic, число бит, число хешей, ёмкость, записей, watermark (id строки)
+_MAGIC = b"LIBLOOM1"
+_HEADER = struct.Struct("<8sQIQQQ")
+
+
+class BloomFilter:
+    """
+    Фильтр Блума для 16-байтных ключей дедупликации (dedup_hash).
+
+    Ключ — уже равномерный md5, поэтому позиции бит берутся из двух его половин
+    двойным хешированием (h1 + i·h2), без дополнительных хеш-функций. Размер
+    задаётся ёмкостью и долей ложных срабатываний и не растёт с числом записей:
+    при 2 млн ключей и 0.1% ошибок — около 3.6 МБ.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, num_bits: int = 0, num_hashes: int = 0):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = num_bits or max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        # id последней учтённой строки таблицы: при тёплом старте дочитываются только новые
+        self.watermark = 0
+
+    def _positions(self, key: bytes) -> Iterable[int]:
+        m = self.num_bits
+        pos = int.from_bytes(key[:8], "little") % m
+        step = (int.from_bytes(key[8:16], "little") | 1) % m
+        # (h1 + i·h2) mod m без умножений и деления на каждом шаге
+        for _ in range(self.num_hashes):
+            yield pos
+            pos += step
+            if pos >= m:
+                pos -= m
+
+    def add(self, key: bytes) -> None:
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        """Записей больше ёмкости: доля ложных срабатываний выше заданной."""
+        return self.count > self.capacity
+
+    def save(self, path: str) -> None:
+        """Атомарная запись (через временный файл): шарды могут сохранять фильтр одновременно."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.capacity, self.count, self.watermark))
+            fh.write(self.bits)
+        os.replace(tmp, target)
+
+    @classmethod
+    def load(cls, path: str, error_rate: float) -> Optional["BloomFilter"]:
+        """Фильтр из файла или None, если файла нет или он повреждён."""
+        try:
+            with open(path, "rb") as fh:
+                header = fh.read(_HEADER.size)
+                bits = fh.read()
+        except OSError:
+            return None
+        if len(header) < _HEADER.size:
+            return None
+        magic, num_bits, num_hashes, capacity, count, watermark = _HEADER.unpack(header)
+        if magic != _MAGIC or len(bits) != (num_bits + 7) // 8:
+            return None
+        bloom = cls(capacity, error_rate, num_bits, num_hashes)
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        bloom.watermark = watermark
+        return bloom
+
+
+def load_known_keys(
+    storage,
+    path: str,
+    capacity: int,
+    error_rate: float,
+) -> Tuple[BloomFilter, int]:
+    """
+    Фильтр ключей dedup_hash, уже сохранённых в таблице.
+
+    Берётся файл path и дочитываются строки с id больше его watermark. Если файла
+    нет, таблица пересоздана (max(id) меньше watermark) или фильтр переполнен —
+    таблица сканируется целиком (ёмкость — не меньше capacity и вдвое больше строк).
+    После загрузки фильтр сохраняется обратно. Возвращает (фильтр, число прочитанных строк).
+
+    Строки, закоммиченные позже с меньшим id, фильтр может пропустить — их
+    по-прежнему ловит уникальный индекс при сохранении.
+    """
+    max_id, rows = storage.dedup_table_stats()
+    bloom = BloomFilter.load(path, error_rate)
+    if bloom is not None and (bloom.watermark > max_id or bloom.full):
+        bloom = None
+    if bloom is None:
+        bloom = BloomFilter(max(capacity, rows * 2), error_rate)
+
+    scanned = 0
+    for row_id, key in storage.iter_dedup_hashes(after_id=bloom.watermark):
+        bloom.add(key)
+        bloom.watermark = max(bloom.watermark, row_id)
+        scanned += 1
+
+    if bloom.full:
+        # Таблица выросла за время загрузки: следующий старт пересоберёт фильтр крупнее
+        print(f"[!] Фильтр ключей переполнен ({bloom.count} > {bloom.capacity})")
+    try:
+        bloom.save(path)
+    except OSError as e:
+        print(f"[-] Не удалось сохранить фильтр ключей: {e}")
+    return bloom, scanned
@@ -1,7 +1,13 @@
+import hashlib
 from typing import Tuple
 
 from app.normalize import normalize_text
 
+# Разделитель частей ключа в дайджесте. normalize_text заменяет \x1f (пробельный символ)
+# на пробел, поэтому в частях ключа он не встречается. Тот же разделитель — в SQL-миграции
+# (PostgresStorage._migrate_dedup_hash)
+_DIGEST_SEP = "\x1f"
+
 
 def dedup_key(description: str, contact: str) -> Tuple[str, str]:
     d_norm = normalize_text(description)[:200]
@@ -9,3 +15,12 @@ def dedup_key(description: str, contact: str) -> Tuple[str, str]:
     return d_norm, c_norm
 
 
+def dedup_digest(description: str, contact: str) -> bytes:
+    """16-байтный md5 ключа дедупликации: колонка dedup_hash и ключи claim_key в runner."""
+    d_norm, c_norm = dedup_key(description, contact)
+    return key_digest(d_norm, c_norm)
+
+
+def key_digest(desc200: str, contact_norm: str) -> bytes:
+    """md5(desc200 || '\\x1f' || contact_norm) — как decode(md5(...), 'hex') в PostgreSQL."""
+    return hashlib.md5(f"{desc200}{_DIGEST_SEP}{contact_norm}".encode("utf-8")).digest()
@@ -0,0 +1,236 @@
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from app.config import (
+    NEAR_DUP_BANDS,
+    NEAR_DUP_MIN_SHINGLES,
+    NEAR_DUP_NUM_PERM,
+    NEAR_DUP_ROWS,
+    NEAR_DUP_SHINGLE_WORDS,
+    NEAR_DUP_THRESHOLD,
+)
+from app.normalize import normalize_text
+
+# Ключ записи индекса: linkedin_job_id или, если его нет, url вакансии
+IndexKey = Union[int, str]
+
+_MASK32 = 0xFFFFFFFF
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+# Перемешивание crc32 перед выбором корзины (мультипликативный хеш Кнута)
+_MIX = 0x9E3779B97F4A7C15
+# Сдвиг значения, заимствованного пустой корзиной у соседней (densification)
+_BORROW_OFFSET = 0x61C88647
+
+
+class MinHasher:
+    """
+    Сигнатура MinHash описания по шинглам из слов.
+
+    Вместо num_perm перестановок используется one permutation hashing: каждый
+    шингл хешируется один раз (crc32), по хешу выбирается корзина, в корзине
+    хранится минимум. Пустые корзины заполняются значением ближайшей непустой
+    справа (rotation densification), так оценка похожести остаётся несмещённой
+    и для коротких текстов. Стоимость — O(число шинглов), а не O(шинглы × num_perm).
+    """
+
+    def __init__(
+        self,
+        num_perm: int = NEAR_DUP_NUM_PERM,
+        shingle_words: int = NEAR_DUP_SHINGLE_WORDS,
+        min_shingles: int = NEAR_DUP_MIN_SHINGLES,
+    ):
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.min_shingles = min_shingles
+        # job_to_row и проверка в runner считают сигнатуру одного описания подряд
+        self._last: Optional[Tuple[str, Optional[array]]] = None
+
+    def shingle_hashes(self, description: str) -> Set[int]:
+        """crc32 шинглов по shingle_words слов нормализованного описания."""
+        words = normalize_text(description).encode("utf-8").split()
+        n = self.shingle_words
+        if len(words) <= n:
+            return {zlib.crc32(b" ".join(words))} if words else set()
+        join = b" ".join
+        return set(map(zlib.crc32, [join(words[i:i + n]) for i in range(len(words) - n + 1)]))
+
+    def signature(self, description: str) -> Optional[array]:
+        """Сигнатура (array 'I' длины num_perm) или None, если текст слишком короткий."""
+        last = self._last
+        if last and last[0] == description:
+            return last[1]
+        hashes = self.shingle_hashes(description)
+        sig = None
+        if len(hashes) >= self.min_shingles:
+            sig = self._densify(self._buckets(hashes))
+        self._last = (description, sig)
+        return sig
+
+    def _buckets(self, hashes: Iterable[int]) -> List[Optional[int]]:
+        k = self.num_perm
+        buckets: List[Optional[int]] = [None] * k
+        for h in hashes:
+            b = (((h * _MIX) & _MASK64) >> 32) % k
+            cur = buckets[b]
+            if cur is None or h < cur:
+                buckets[b] = h
+        return buckets
+
+    def _densify(self, buckets: List[Optional[int]]) -> array:
+        k = self.num_perm
+        sig = array("I", [0]) * k
+        for i in range(k):
+            value = buckets[i]
+            distance = 0
+            while value is None:
+                distance += 1
+                value = buckets[(i + distance) % k]
+            sig[i] = (value + distance * _BORROW_OFFSET) & _MASK32
+        return sig
+
+    def signature_bytes(self, description: str) -> Optional[bytes]:
+        """Сигнатура для колонки minhash (little-endian uint32) или None."""
+        sig = self.signature(description)
+        if sig is None:
+            return None
+        return _to_bytes(sig)
+
+    def from_bytes(self, data: bytes) -> Optional[array]:
+        sig = array("I")
+        sig.frombytes(bytes(data))
+        if _BIG_ENDIAN:
+            sig.byteswap()
+        return sig if len(sig) == self.num_perm else None
+
+
+_BIG_ENDIAN = array("I", [1]).tobytes()[0] == 0
+
+
+def _to_bytes(sig: array) -> bytes:
+    if _BIG_ENDIAN:
+        sig = array("I", sig)
+        sig.byteswap()
+    return sig.tobytes()
+
+
+def similarity(a: array, b: array) -> float:
+    """Оценка коэффициента Жаккара по доле совпавших позиций сигнатур."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDupIndex:
+    """
+    LSH-индекс сигнатур MinHash: сигнатура режется на bands полос по rows значений,
+    кандидаты — записи, совпавшие хотя бы в одной полосе. Кандидаты проверяются
+    по всей сигнатуре, дубликатом считается похожесть не ниже threshold.
+
+    Поиск — bands обращений к словарям, поэтому его время не зависит от размера
+    индекса. В корзине полосы хранится номер записи, а список — только при коллизии.
+    """
+
+    def __init__(
+        self,
+        hasher: Optional[MinHasher] = None,
+        bands: int = NEAR_DUP_BANDS,
+        rows: int = NEAR_DUP_ROWS,
+        threshold: float = NEAR_DUP_THRESHOLD,
+    ):
+        self.hasher = hasher or MinHasher()
+        if bands * rows > self.hasher.num_perm:
+            raise ValueError(f"bands × rows ({bands} × {rows}) больше длины сигнатуры {self.hasher.num_perm}")
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self._keys: List[IndexKey] = []
+        self._sigs: List[array] = []
+        self._tables: List[Dict[int, Union[int, List[int]]]] = [{} for _ in range(bands)]
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _band_keys(self, sig: array) -> Iterable[Tuple[int, int]]:
+        # hash кортежа int детерминирован и занимает меньше памяти, чем сам кортеж;
+        # редкие коллизии хешей отсеет проверка по всей сигнатуре
+        r = self.rows
+        for band in range(self.bands):
+            yield band, hash(tuple(sig[band * r:(band + 1) * r]))
+
+    def add(self, key: IndexKey, sig: array) -> None:
+        idx = len(self._keys)
+        self._keys.append(key)
+        self._sigs.append(sig)
+        for band, band_key in self._band_keys(sig):
+            table = self._tables[band]
+            cur = table.get(band_key)
+            if cur is None:
+                table[band_key] = idx
+            elif isinstance(cur, list):
+                cur.append(idx)
+            else:
+                table[band_key] = [cur, idx]
+
+    def query(self, sig: array) -> Optional[Tuple[IndexKey, float]]:
+        """Самая похожая запись (ключ, похожесть) не ниже threshold или None."""
+        candidates = set()
+        for band, band_key in self._band_keys(sig):
+            cur = self._tables[band].get(band_key)
+            if cur is None:
+                continue
+            if isinstance(cur, list):
+                candidates.update(cur)
+            else:
+                candidates.add(cur)
+
+        best: Optional[Tuple[IndexKey, float]] = None
+        for idx in candidates:
+            score = similarity(sig, self._sigs[idx])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (self._keys[idx], score)
+        return best
+
+    def check_and_add(self, key: IndexKey, description: str) -> Optional[Tuple[IndexKey, float]]:
+        """
+        Ищет почти-дубликат описания среди записей с другим ключом. Если его нет,
+        описание добавляется в индекс. Короткие описания не проверяются.
+        """
+        sig = self.hasher.signature(description)
+        if sig is None:
+            return None
+        match = self.query(sig)
+        if match and match[0] != key:
+            return match
+        if match is None:
+            self.add(key, sig)
+        return None
+
+    def load(self, rows: Iterable[Tuple[Optional[int], str, bytes]]) -> int:
+        """Загружает сигнатуры из БД: строки (linkedin_job_id, url, minhash). Возвращает число записей."""
+        count = 0
+        for job_id, url, data in rows:
+            sig = self.hasher.from_bytes(data)
+            if sig is None:
+                continue
+            self.add(job_id if job_id is not None else url, sig)
+            count += 1
+        self.loaded = True
+        return count
+
+
+_hasher_instance: Optional[MinHasher] = None
+_index_instance: Optional[NearDupIndex] = None
+
+
+def get_hasher() -> MinHasher:
+    global _hasher_instance
+    if _hasher_instance is None:
+        _hasher_instance = MinHasher()
+    return _hasher_instance
+
+
+def get_near_dup_index() -> NearDupIndex:
+    global _index_instance
+    if _index_instance is None:
+        _index_instance = NearDupIndex(get_hasher())
+    return _index_instance
@@ -1,23 +1,32 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
-from playwright.sync_api import BrowserContext, Page, Playwright
+from playwright.async_api import BrowserContext, Page, Playwright
 
 from app.config import HEADLESS, PAGE_TIMEOUT_MS, USER_DATA_DIR, PROXY_SERVER, PROXY_USERNAME, PROXY_PASSWORD
+from app.linkedin.blocker import ResourceBlocker
 
 
-def create_context_and_page(playwright: Playwright) -> Tuple[BrowserContext, Page]:
+async def create_context_and_page(
+    playwright: Playwright,
+    user_data_dir: str = USER_DATA_DIR,
+    proxy_server: Optional[str] = None,
+    blocker: Optional[ResourceBlocker] = None,
+) -> Tuple[BrowserContext, Page]:
     proxy_cfg = None
-    if PROXY_SERVER:
-        proxy_cfg = {"server": PROXY_SERVER}
+    proxy_server = proxy_server or PROXY_SERVER
+    if proxy_server:
+        proxy_cfg = {"server": proxy_server}
         if PROXY_USERNAME and PROXY_PASSWORD:
             proxy_cfg["username"] = PROXY_USERNAME
             proxy_cfg["password"] = PROXY_PASSWORD
 
-    context = playwright.chromium.launch_persistent_context(
-        USER_DATA_DIR,
+    context = await playwright.chromium.launch_persistent_context(
+        user_data_dir,
         headless=HEADLESS,
         proxy=proxy_cfg,
     )
     context.set_default_timeout(PAGE_TIMEOUT_MS)
-    page = context.new_page()
-    return context, page
\ No newline at end of file
+    if blocker:
+        await blocker.install(context)
+    page = context.pages[0] if context.pages else await context.new_page()
+    return context, page
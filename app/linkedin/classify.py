@@ -0,0 +1,202 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import ROLE_KEYWORDS
+from app.linkedin.patterns import _HYBRID_PATTERNS, _REMOTE_PATTERNS, _OFFICE_PATTERNS
+
+# Формат работы по приоритету: при нескольких совпадениях побеждает меньший индекс
+_WORK_FORMATS = ["hybrid", "remote", "office"]
+_NO_FORMAT = len(_WORK_FORMATS)
+
+# Ключи роли не длиннее этого считаются аббревиатурами и ищутся целым словом
+# («ui» не должно находиться в «build»); длинные — по началу слова («test» → «testing»)
+_SHORT_KEYWORD_LEN = 3
+
+# Ведущие negative lookbehind перед литералом: (?<!not\s)(?<!no\s)remote
+_LEADING_LOOKBEHINDS = re.compile(r"^((?:\(\?<!(?:[^()\\]|\\.)*\))+)([\w%-][\w\s%-]*)$")
+
+
+@dataclass(frozen=True)
+class Classification:
+    work_format: str = ""
+    roles: FrozenSet[str] = frozenset()
+
+
+def _keyword_regex(keyword: str) -> str:
+    body = re.escape(keyword)
+    if len(keyword) <= _SHORT_KEYWORD_LEN:
+        return body + r"(?!\w)"
+    return body
+
+
+def _format_regex(pattern: str) -> str:
+    """
+    Шаблон формата работы для общего выражения: группы — без захвата, а ведущие
+    lookbehind переносятся за литерал ((?<!no\\s)remote → remote(?<!no\\sremote)),
+    чтобы ветка начиналась с литерала и движок мог быстро пропускать текст.
+    """
+    pattern = re.sub(r"(?<!\\)\((?!\?)", "(?:", pattern)
+    m = _LEADING_LOOKBEHINDS.match(pattern)
+    if not m:
+        return pattern
+    lookbehinds, literal = m.groups()
+    moved = re.sub(r"\(\?<!((?:[^()\\]|\\.)*)\)", lambda lb: f"(?<!{lb.group(1)}{literal})", lookbehinds)
+    return literal + moved
+
+
+class TextClassifier:
+    """
+    Формат работы и роли вакансии за один проход регулярного выражения.
+
+    Шаблоны из app.linkedin.patterns и ключевые слова ROLE_KEYWORDS собраны в одну
+    альтернативу без именованных групп (так re сохраняет быстрый поиск по первым
+    символам веток), привязанную к началу слова. Что именно совпало, определяется
+    по тексту совпадения через кэш; приоритет hybrid > remote > office разрешается
+    после прохода. Совпадения не пересекаются: на одной позиции побеждает
+    формат работы, затем более длинный ключ.
+
+    Общий проход нужен build_job (формат и роли сразу), а classify_many — тот же
+    проход для пачки вакансий при офлайн-переобработке. Для вопросов попроще есть
+    свои выражения: work_format — только шаблоны формата, matches_role — только
+    ключи одной роли, с отсечением подстрокой, как у прежнего фильтра.
+    """
+
+    def __init__(
+        self,
+        role_keywords: Dict[str, List[str]] = ROLE_KEYWORDS,
+        format_patterns: Sequence[Sequence[re.Pattern]] = (_HYBRID_PATTERNS, _REMOTE_PATTERNS, _OFFICE_PATTERNS),
+    ):
+        self.known_roles = set(role_keywords)
+        self._format_patterns: List[Tuple[int, re.Pattern]] = [
+            (priority, pattern) for priority, patterns in enumerate(format_patterns) for pattern in patterns
+        ]
+        self._roles_by_keyword: Dict[str, FrozenSet[str]] = {}
+        for role, keywords in role_keywords.items():
+            for keyword in keywords:
+                k = keyword.lower()
+                self._roles_by_keyword[k] = self._roles_by_keyword.get(k, frozenset()) | {role}
+
+        format_branches = [_format_regex(p.pattern.lower()) for _, p in self._format_patterns]
+        keyword_branches = [_keyword_regex(k) for k in sorted(self._roles_by_keyword, key=len, reverse=True)]
+        # Текст приводится к нижнему регистру один раз, шаблоны — уже в нижнем регистре
+        self._regex = re.compile(r"(?<!\w)(?:" + "|".join(format_branches + keyword_branches) + ")")
+        # Отдельные выражения для вопросов попроще: только формат работы и ключи одной роли
+        self._format_regex = re.compile(r"(?<!\w)(?:" + "|".join(format_branches) + ")")
+        self._role_keywords: Dict[str, Tuple[str, ...]] = {
+            role: tuple(k.lower() for k in keywords) for role, keywords in role_keywords.items()
+        }
+        self._role_regex: Dict[str, re.Pattern] = {
+            role: re.compile(
+                r"(?<!\w)(?:" + "|".join(_keyword_regex(k) for k in sorted(set(keywords), key=len, reverse=True)) + ")"
+            )
+            for role, keywords in self._role_keywords.items()
+            if keywords
+        }
+        self._resolved: Dict[str, Tuple[int, FrozenSet[str]]] = {}
+        # build_job и фильтр роли в runner классифицируют одну и ту же вакансию подряд
+        self._last: Optional[Tuple[str, str, Classification]] = None
+
+    def _resolve(self, matched: str) -> Tuple[int, FrozenSet[str]]:
+        """Текст совпадения -> (приоритет формата или _NO_FORMAT, роли)."""
+        hit = self._resolved.get(matched)
+        if hit is None:
+            # Контекст (lookaround) уже проверило общее выражение; здесь только узнаём шаблон
+            priority = next((p for p, pattern in self._format_patterns if pattern.fullmatch(matched)), _NO_FORMAT)
+            hit = self._resolved[matched] = (priority, self._roles_by_keyword.get(matched, frozenset()))
+        return hit
+
+    def _scan(self, text: str, format_from: int = 0) -> Classification:
+        roles: set = set()
+        best = _NO_FORMAT
+        for m in self._regex.finditer(text):
+            priority, matched_roles = self._resolve(m.group())
+            if matched_roles:
+                roles |= matched_roles
+            if priority < best and m.start() >= format_from:
+                best = priority
+        return Classification(_WORK_FORMATS[best] if best < _NO_FORMAT else "", frozenset(roles))
+
+    def classify(self, title: str, description: str) -> Classification:
+        """Роли — по заголовку и описанию, формат работы — только по описанию."""
+        title, description = title or "", description or ""
+        last = self._last
+        if last and last[0] == title and last[1] == description:
+            return last[2]
+        lowered = title.lower()
+        result = self._scan(f"{lowered}\n{description.lower()}", format_from=len(lowered) + 1)
+        self._last = (title, description, result)
+        return result
+
+    def classify_many(self, rows: Iterable[Tuple[str, str]]) -> List[Classification]:
+        """
+        classify() для пачки (title, description) — офлайн-переобработка тысяч вакансий.
+        Memo последней вакансии не читается и не обновляется: в пачке повторов почти нет.
+        """
+        results = []
+        for title, description in rows:
+            lowered = (title or "").lower()
+            results.append(self._scan(f"{lowered}\n{(description or '').lower()}", format_from=len(lowered) + 1))
+        return results
+
+    def work_format(self, description: str) -> str:
+        """Только шаблоны формата работы; проход останавливается на первом hybrid (высший приоритет)."""
+        best = _NO_FORMAT
+        for m in self._format_regex.finditer((description or "").lower()):
+            priority = self._resolve(m.group())[0]
+            if priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return _WORK_FORMATS[best] if best < _NO_FORMAT else ""
+
+    def roles(self, title: str, description: str) -> FrozenSet[str]:
+        return self.classify(title, description).roles
+
+    def matches_role(self, title: str, description: str, role: str) -> bool:
+        """
+        Роль без ключевых слов в ROLE_KEYWORDS не фильтруется.
+
+        Полный проход не нужен: если вакансию только что классифицировал build_job,
+        ответ берётся из него, иначе ищутся ключи одной роли — сначала в заголовке,
+        затем в описании. Описание без единого ключа подстрокой отсекается без regex.
+        """
+        regex = self._role_regex.get(role)
+        if regex is None:
+            return True
+        title, description = title or "", description or ""
+        last = self._last
+        if last and last[0] == title and last[1] == description:
+            return role in last[2].roles
+        if regex.search(title.lower()):
+            return True
+        lowered = description.lower()
+        # Подстрока — дёшево, как прежний фильтр; regex только подтверждает границу слова
+        if not any(k in lowered for k in self._role_keywords[role]):
+            return False
+        return regex.search(lowered) is not None
+
+    def title_verdict(self, title: str, role: str) -> str:
+        """
+        Оценка вакансии по одному заголовку (карточка поиска, до открытия страницы):
+        "match" — в заголовке есть ключ роли, "other" — только ключи других ролей,
+        "unknown" — заголовок пуст или ключей ролей в нём нет.
+        """
+        if role not in self.known_roles:
+            return "match"
+        if not (title or "").strip():
+            return "unknown"
+        roles = self._scan(title.lower()).roles
+        if role in roles:
+            return "match"
+        return "other" if roles else "unknown"
+
+
+_classifier_instance: Optional[TextClassifier] = None
+
+
+def get_classifier() -> TextClassifier:
+    global _classifier_instance
+    if _classifier_instance is None:
+        _classifier_instance = TextClassifier()
+    return _classifier_instance
@@ -1,87 +1,169 @@
-from typing import List, Set
+from typing import Dict, List
 
-from playwright.sync_api import Page
+from playwright.async_api import Page
 
 from app.config import MAX_JOBS_PER_ROLE
+from app.linkedin.parse import posted_date
+from app.linkedin.urls import job_id_from_url
+from app.metrics import get_metrics
+from app.models import JobCard
 
+_JOB_LINK_SELECTOR = 'a[href*="/jobs/view/"]'
 
-def collect_job_links(page: Page) -> List[str]:
-    # Даем результатам поискa прогрузиться, но без лишней задержки
-    page.wait_for_timeout(800)
+_LIST_SELECTORS = [
+    "div.jobs-search-results-list",
+    "div.scaffold-layout__list-container",
+    "div.jobs-search__left-rail",
+    "div.scaffold-layout__list",
+]
 
-    for sel in [
-        "div.jobs-search-results-list",
-        "div.scaffold-layout__list-container",
-        "div.jobs-search__left-rail",
-        "div.scaffold-layout__list",
-    ]:
+_CARD_LINK_SELECTORS = [
+    'a.job-card-container__link',
+    'a[data-control-name="job_card_click"]',
+    _JOB_LINK_SELECTOR,
+]
+
+# Сколько шагов скролла подряд без новых карточек считаем концом списка
+_MAX_IDLE_STEPS = 2
+
+# Один вызов на шаг: (опционально) скроллит список, ждёт новые карточки внутри
+# страницы и возвращает все ссылки на вакансии с данными карточек рядом с ними.
+_HARVEST_JS = """
+async ([linkSelectors, listSelectors, scrollPx, waitMs]) => {
+    const linkSel = linkSelectors.join(", ");
+    const countLinks = () => document.querySelectorAll(linkSel).length;
+    const text = (root, sel) => {
+        const el = root && root.querySelector(sel);
+        return el ? (el.innerText || "").trim() : "";
+    };
+
+    if (scrollPx > 0) {
+        let box = null;
+        for (const sel of listSelectors) {
+            const el = document.querySelector(sel);
+            if (el && el.scrollHeight > el.clientHeight) { box = el; break; }
+        }
+        const before = countLinks();
+        if (box) box.scrollBy(0, scrollPx); else window.scrollBy(0, scrollPx);
+        const started = performance.now();
+        while (countLinks() <= before && performance.now() - started < waitMs) {
+            await new Promise((r) => setTimeout(r, 100));
+        }
+    }
+
+    const out = [];
+    const seen = new Set();
+    for (const a of document.querySelectorAll(linkSel)) {
+        let href = a.getAttribute("href") || "";
+        href = href.split("?")[0];
+        if (href.startsWith("/")) href = "https://www.linkedin.com" + href;
+        if (!href.includes("/jobs/view/") || seen.has(href)) continue;
+        seen.add(href);
+        const card = a.closest("li, div.job-card-container, div.base-card") || a.parentElement;
+        const idHolder = card && (card.matches("[data-job-id], [data-occludable-job-id]")
+            ? card
+            : card.querySelector("[data-job-id], [data-occludable-job-id]"));
+        const time = card && card.querySelector("time");
+        // Пометка «Promoted» живёт в футере карточки; textContent не пересчитывает layout
+        const footerEl = card && card.querySelector(".job-card-container__footer-wrapper, .job-card-list__footer-wrapper");
+        const footer = (footerEl || card) ? (footerEl || card).textContent || "" : "";
+        out.push({
+            href: href,
+            title: (a.getAttribute("aria-label") || a.innerText || "").trim(),
+            company: text(card, ".artdeco-entity-lockup__subtitle, .job-card-container__primary-description"),
+            location: text(card, ".artdeco-entity-lockup__caption, .job-card-container__metadata-item"),
+            jobId: idHolder
+                ? idHolder.getAttribute("data-job-id") || idHolder.getAttribute("data-occludable-job-id") || ""
+                : "",
+            postedText: time ? (time.innerText || time.textContent || "").trim() : "",
+            postedAttr: time ? time.getAttribute("datetime") || "" : "",
+            promoted: /promoted|продвигается/i.test(footer),
+        });
+    }
+    return out;
+}
+"""
+
+
+def _card_from_harvest(item: Dict) -> JobCard:
+    # В aria-label/innerText ссылки заголовок иногда продублирован через перевод строки
+    title = (item.get("title") or "").split("\n")[0].strip()
+    job_id = str(item.get("jobId") or "")
+    posted_text = (item.get("postedText") or "").strip()
+    return JobCard(
+        job_url=item["href"],
+        title=title,
+        company=(item.get("company") or "").strip(),
+        location=(item.get("location") or "").strip(),
+        job_id=int(job_id) if job_id.isdigit() else job_id_from_url(item["href"]),
+        posted_text=posted_text,
+        posted_at=posted_date(posted_text, item.get("postedAttr") or ""),
+        promoted=bool(item.get("promoted")),
+    )
+
+
+async def _harvest(page: Page, scroll_px: int = 0, wait_ms: int = 0) -> List[Dict[str, str]]:
+    return await page.evaluate(_HARVEST_JS, [_CARD_LINK_SELECTORS, _LIST_SELECTORS, scroll_px, wait_ms])
+
+
+async def collect_job_cards(page: Page, limit: int = MAX_JOBS_PER_ROLE) -> List[JobCard]:
+    """
+    Карточки вакансий с открытой страницы поиска: ссылка и то, что видно в списке
+    (заголовок, компания, локация). Список докручивается, пока не наберётся limit
+    карточек или новые перестанут появляться.
+    """
+    metrics = get_metrics()
+    with metrics.stage("collect_links"):
+        cards = await _collect_job_cards(page, limit)
+    metrics.inc("links_collected", len(cards))
+    return cards
+
+
+async def _collect_job_cards(page: Page, limit: int) -> List[JobCard]:
+    # Фокус на список результатов, чтобы скролл шёл по нему
+    for sel in _LIST_SELECTORS:
         try:
             loc = page.locator(sel).first
-            if loc.count():
-                loc.click(timeout=800, force=True)
+            if await loc.count():
+                await loc.click(timeout=800, force=True)
                 break
         except Exception:
             pass
 
     try:
-        page.wait_for_selector('a[href*="/jobs/view/"]', timeout=15_000)
+        await page.wait_for_selector(_JOB_LINK_SELECTOR, timeout=15_000)
     except Exception:
         return []
 
-    list_container = None
-    for sel in [
-        "div.jobs-search-results-list",
-        "div.scaffold-layout__list-container",
-        "div.jobs-search__left-rail",
-        "div.scaffold-layout__list",
-    ]:
+    cards: List[JobCard] = []
+    seen = set()
+    idle_steps = 0
+    scroll_px = 0
+
+    for _ in range(30):
+        get_metrics().inc("harvest_steps")
         try:
-            loc = page.locator(sel).first
-            if loc.count():
-                can_scroll = loc.evaluate("(el) => el.scrollHeight > el.clientHeight")
-                if can_scroll:
-                    list_container = loc
-                    break
+            harvested = await _harvest(page, scroll_px=scroll_px, wait_ms=1500)
         except Exception:
-            pass
+            # Страница перерисовалась во время скролла — пробуем ещё раз без скролла
+            harvested = await _harvest(page)
 
-    selectors = [
-        'a.job-card-container__link',
-        'a[data-control-name="job_card_click"]',
-        'a[href*="/jobs/view/"]',
-    ]
-
-    links: List[str] = []
-    seen: Set[str] = set()
-
-    def grab():
-        for sel in selectors:
-            loc = page.locator(sel)
-            n = min(loc.count(), 300)
-            for j in range(n):
-                href = loc.nth(j).get_attribute("href")
-                if not href:
-                    continue
-                href = href.split("?")[0]
-                if href.startswith("/"):
-                    href = "https://www.linkedin.com" + href
-                if "/jobs/view/" in href and href not in seen:
-                    seen.add(href)
-                    links.append(href)
+        new = 0
+        for item in harvested:
+            href = item["href"]
+            if href not in seen:
+                seen.add(href)
+                cards.append(_card_from_harvest(item))
+                new += 1
 
-    for _ in range(30):
-        grab()
-        if len(links) >= MAX_JOBS_PER_ROLE:
+        if len(cards) >= limit:
             break
 
-        try:
-            if list_container:
-                list_container.evaluate("(el) => { el.scrollBy(0, 1400); }")
-            else:
-                page.mouse.wheel(0, 1600)
-        except Exception:
-            page.mouse.wheel(0, 1600)
-
-        page.wait_for_timeout(500)
+        # Первый шаг только собирает то, что уже отрисовано
+        if scroll_px:
+            idle_steps = 0 if new else idle_steps + 1
+            if idle_steps >= _MAX_IDLE_STEPS:
+                break
+        scroll_px = 1400
 
-    return links[:MAX_JOBS_PER_ROLE]
\ No newline at end of file
+    return cards[:limit]
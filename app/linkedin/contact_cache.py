@@ -0,0 +1,100 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import CONTACT_CACHE_TTL_HOURS, CONTACT_CACHE_NEGATIVE_TTL_HOURS
+from app.storage.postgres import get_storage
+
+
+class ContactCache:
+    """
+    Кэш контактов рекрутеров: память процесса → PostgreSQL → переход на профиль.
+
+    Ключ — нормализованная ссылка на профиль. Отсутствие контактов тоже кэшируется,
+    чтобы не ходить повторно в overlay рекрутера, который их не показывает. Если fetch()
+    бросает исключение (панель не открылась), ничего не кэшируется ни в памяти, ни в БД.
+    Вкладки одного прогона, открывшие одного рекрутера одновременно, ждут друг друга.
+    """
+
+    def __init__(
+        self,
+        ttl_hours: float = CONTACT_CACHE_TTL_HOURS,
+        negative_ttl_hours: float = CONTACT_CACHE_NEGATIVE_TTL_HOURS,
+    ):
+        self.ttl_hours = ttl_hours
+        self.negative_ttl_hours = negative_ttl_hours
+        # profile_url -> (контакты, время получения в unix time): TTL тот же, что в БД
+        self._memory: Dict[str, Tuple[dict, float]] = {}
+        # profile_url -> [lock, сколько вкладок его держат или ждут]; удаляется после загрузки
+        self._locks: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, info: dict, fetched_at: float) -> bool:
+        ttl_hours = self.ttl_hours if (info.get("email") or info.get("raw")) else self.negative_ttl_hours
+        return time.time() - fetched_at < ttl_hours * 3600
+
+    def _from_memory(self, profile_url: str) -> Optional[dict]:
+        cached = self._memory.get(profile_url)
+        if cached is None:
+            return None
+        info, fetched_at = cached
+        if not self._fresh(info, fetched_at):
+            del self._memory[profile_url]
+            return None
+        return info
+
+    def _from_db(self, profile_url: str) -> Optional[dict]:
+        try:
+            return get_storage().get_recruiter_contact(profile_url, self.ttl_hours, self.negative_ttl_hours)
+        except Exception as e:
+            print(f"[-] Кэш контактов недоступен: {e}")
+            return None
+
+    def _to_db(self, info: dict) -> None:
+        try:
+            get_storage().put_recruiter_contact(info)
+        except Exception as e:
+            print(f"[-] Не удалось закэшировать контакт: {e}")
+
+    async def get_or_fetch(self, profile_url: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        """Возвращает контакты из кэша или вызывает fetch() и кэширует результат."""
+        entry = self._locks.get(profile_url)
+        if entry is None:
+            entry = self._locks[profile_url] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._get_or_fetch(profile_url, fetch)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[profile_url]
+
+    async def _get_or_fetch(self, profile_url: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        info = self._from_memory(profile_url)
+        if info is None:
+            info = self._from_db(profile_url)
+            if info is not None:
+                self._memory[profile_url] = (info, info.pop("fetched_at", time.time()))
+        if info is not None:
+            self.hits += 1
+            return dict(info)
+
+        self.misses += 1
+        info = await fetch()
+        info["public_profile_url"] = profile_url
+        self._memory[profile_url] = (info, time.time())
+        self._to_db(info)
+        return dict(info)
+
+
+_cache_instance: Optional[ContactCache] = None
+
+
+def get_contact_cache() -> ContactCache:
+    """Возвращает глобальный кэш контактов рекрутеров."""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = ContactCache()
+    return _cache_instance
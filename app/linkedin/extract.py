@@ -1,76 +1,83 @@
-import re
-import random
-import time
-from typing import List, Tuple, Optional
-
-from playwright.sync_api import Page
-
-from app.linkedin.utils import safe_goto, is_bad_redirect, sleep_jitter
-from app.normalize import clean_description, extract_email
+from typing import Tuple, Optional
+
+from app.config import CAPTURE_SNAPSHOTS, EXTRACT_MODE, NETWORK_PAYLOAD_TIMEOUT_MS, NETWORK_HIRING_GRACE_MS
+from app.linkedin.contact_cache import get_contact_cache
+from app.linkedin.parse import (
+    build_job,
+    description_from_page_text,
+    is_notifications_title,
+    is_valid_job,
+    normalize_profile_url,
+    normalize_spaces,
+    parse_email,
+    title_from_page_title,
+)
+from app.linkedin.ratelimit import get_rate_limiter
+from app.linkedin.utils import safe_goto, is_bad_redirect
+from app.linkedin.snapshots import get_snapshot_store
+from app.linkedin.urls import job_id_from_url
+from app.linkedin.voyager import JobPayload, listen_voyager
+from app.linkedin.waits import human_pause, wait_for_any, wait_for_network_idle, wait_for_text_stable
+from app.metrics import get_metrics
+from app.normalize import clean_description
 from app.models import Job
 
-from app.linkedin.patterns import _HYBRID_PATTERNS, _REMOTE_PATTERNS, _OFFICE_PATTERNS
-
-def normalize_spaces(text: str) -> str:
-    """Нормализует пробелы и переносы строк."""
-    return re.sub(r"\s+", " ", (text or "")).strip()
-
-
-def normalize_profile_url(url: str) -> str:
-    """Приводит ссылку на профиль LinkedIn к единому виду."""
-    url = (url or "").strip()
-    if not url:
-        return ""
-
-    # Отбрасываем параметры и фрагменты
-    for sep in ("?", "#"):
-        if sep in url:
-            url = url.split(sep, 1)[0]
-
-    # Добавляем протокол/домен при необходимости
-    if url.startswith("//"):
-        url = "https:" + url
-    elif url.startswith("/"):
-        url = "https://www.linkedin.com" + url
-    elif not url.startswith("http"):
-        url = "https://" + url
 
-    # Нормализуем хвост /in/
-    if "/in/" in url and not url.endswith("/"):
-        url += "/"
-
-    return url
-
-
-def human_scroll(page, steps=6, px=800, delay_ms=450):
+# Контейнеры описания вакансии в разных версиях вёрстки LinkedIn
+_DESCRIPTION_SELECTORS = [
+    "#job-details",
+    "div.jobs-description",
+    "article.jobs-description__container",
+    'button[data-testid="expandable-text-button"]',
+]
+
+# Заголовок вакансии: пустой каркас main появляется раньше, поэтому ждём именно его
+_TITLE_SELECTORS = [
+    "h1",
+    ".job-details-jobs-unified-top-card__job-title",
+    ".jobs-unified-top-card__job-title",
+    ".top-card-layout__title",
+]
+
+_CONTACT_INFO_SELECTORS = [
+    'a#top-card-text-details-contact-info',
+    'a[data-control-name="topcard_contact_info"]',
+    'a:has-text("Контактные сведения")',
+    'a:has-text("Contact info")',
+    'button:has-text("Контактные сведения")',
+    'button:has-text("Contact info")',
+]
+
+
+async def human_scroll(page, steps=6, px=800, delay_ms=450):
+    # Скролл с человеческим джиттером: пауза в диапазоне [delay_ms/2, delay_ms]
     for _ in range(steps):
-        page.mouse.wheel(0, px)
-        page.wait_for_timeout(delay_ms)
+        await page.mouse.wheel(0, px)
+        await human_pause(delay_ms // 2, delay_ms)
 
 
-def click_expandable_text_button(page) -> bool:
+async def click_expandable_text_button(page) -> bool:
     btn = page.locator('button[data-testid="expandable-text-button"]').first
-    if btn.count() == 0:
+    if await btn.count() == 0:
         return False
 
     try:
-        btn.scroll_into_view_if_needed(timeout=5000)
+        await btn.scroll_into_view_if_needed(timeout=5000)
     except Exception:
         pass
 
     inner = btn.locator('span[style*="pointer-events: auto"]').first
-    if inner.count() > 0:
+    if await inner.count() > 0:
         try:
-            inner.click(timeout=3000)
-            page.wait_for_timeout(800)
+            await inner.click(timeout=3000)
             return True
         except Exception:
             pass
 
     try:
-        handle = btn.element_handle()
+        handle = await btn.element_handle()
         if handle:
-            page.evaluate(
+            await page.evaluate(
                 """(b) => {
                     b.removeAttribute('aria-hidden');
                     b.style.pointerEvents = 'auto';
@@ -80,7 +87,6 @@ def click_expandable_text_button(page) -> bool:
                 }""",
                 handle
             )
-            page.wait_for_timeout(800)
             return True
     except Exception:
         pass
@@ -88,83 +94,47 @@ def click_expandable_text_button(page) -> bool:
     return False
 
 
-def extract_between(text: str, start_markers: List[str], end_markers: List[str]) -> str:
-    if not text:
-        return ""
-
-    start_pos = -1
-    for sm in start_markers:
-        i = text.find(sm)
-        if i != -1:
-            start_pos = i + len(sm)
-            break
-    if start_pos == -1:
-        return ""
-
-    tail = text[start_pos:]
-
-    end_pos = None
-    for em in end_markers:
-        j = tail.find(em)
-        if j != -1:
-            end_pos = j
-            break
-
-    chunk = tail if end_pos is None else tail[:end_pos]
-    return normalize_spaces(chunk)
-
-
-def parse_email(text: str) -> str:
-    return extract_email(text)
-
-
-def scrape_job_description(page) -> str:
-    # Чуть быстрее, но даём странице прогрузиться
-    page.wait_for_timeout(900)
-    human_scroll(page, steps=3, px=700, delay_ms=300)
-    click_expandable_text_button(page)
+async def scrape_job_description(page) -> str:
+    metrics = get_metrics()
+    # Ждём блок описания, а не фиксированную паузу; короткий скролл оставляем для антибота
+    with metrics.stage("description_wait"):
+        await wait_for_any(page, _DESCRIPTION_SELECTORS, timeout_ms=6000)
+    with metrics.stage("scroll"):
+        await human_scroll(page, steps=2, px=700, delay_ms=300)
+    with metrics.stage("expand"):
+        expanded = await click_expandable_text_button(page)
+        if expanded:
+            # После раскрытия ждём, пока текст перестанет расти
+            await wait_for_text_stable(page, "main", timeout_ms=2500, interval_ms=120)
+    metrics.inc("description_expand", outcome="clicked" if expanded else "no_button")
 
     main_txt = ""
     try:
-        main_txt = page.locator("main").first.inner_text(timeout=4000)
+        main_txt = await page.locator("main").first.inner_text(timeout=4000)
     except Exception:
         try:
-            main_txt = page.locator("body").inner_text(timeout=4000)
+            main_txt = await page.locator("body").inner_text(timeout=4000)
         except Exception:
             return ""
 
-    main_txt = normalize_spaces(main_txt)
+    return description_from_page_text(main_txt)
 
-    desc = extract_between(
-        main_txt,
-        start_markers=["Об этой вакансии", "About this job"],
-        end_markers=["О компании", "About the company", "© LinkedIn", "Похожие вакансии", "Similar jobs"]
-    )
 
-    if not desc:
-        desc = extract_between(
-            main_txt,
-            start_markers=["Об этой вакансии", "About this job"],
-            end_markers=["Отправлять оповещения", "Send me alerts", "© LinkedIn"]
-        )
-
-    return desc
-
-
-def scrape_recruiter(page) -> Tuple[str, str]:
-    # Немного уменьшаем количество и длительность скроллов
-    human_scroll(page, steps=5, px=850, delay_ms=350)
+async def scrape_recruiter(page) -> Tuple[str, str]:
+    # Блок «Meet the hiring team» подгружается лениво: докручиваем вниз и ждём тишины в сети
+    await human_scroll(page, steps=3, px=1400, delay_ms=250)
+    await wait_for_network_idle(page, idle_ms=300, timeout_ms=2500)
 
     recruiter_profile = ""
     recruiter_name = ""
 
     links = page.locator('a[href*="/in/"], a[href*="linkedin.com/in/"]')
-    for i in range(min(links.count(), 60)):
-        href = links.nth(i).get_attribute("href") or ""
+    for i in range(min(await links.count(), 60)):
+        href = await links.nth(i).get_attribute("href") or ""
         if "/in/" in href:
             recruiter_profile = normalize_profile_url(href)
             try:
-                recruiter_name = normalize_spaces(links.nth(i).inner_text(timeout=1500))
+                recruiter_name = normalize_spaces(await links.nth(i).inner_text(timeout=1500))
             except Exception:
                 recruiter_name = ""
             break
@@ -172,28 +142,25 @@ def scrape_recruiter(page) -> Tuple[str, str]:
     return recruiter_name, recruiter_profile
 
 
-def try_contact_info_via_overlay(page, recruiter_profile: str) -> Optional[dict]:
+async def try_contact_info_via_overlay(page, recruiter_profile: str) -> Optional[dict]:
     overlay_url = recruiter_profile.rstrip("/") + "/overlay/contact-info/"
-    safe_goto(page, overlay_url)
-    page.wait_for_timeout(800)
+    await safe_goto(page, overlay_url)
 
     cur = (page.url or "").lower()
     if "login" in cur or "checkpoint" in cur or "authwall" in cur:
         return None
 
     try:
-        page.wait_for_selector("section.pv-contact-info", timeout=8000)
+        await page.wait_for_selector("section.pv-contact-info", timeout=8000)
     except Exception:
         return None
 
+    # Панель открылась: пустой текст — окончательный ответ «контактов нет»,
+    # None — только когда панель прочитать не удалось
     section = page.locator("section.pv-contact-info").first
     try:
-        raw = section.inner_text(timeout=4000)
+        raw = normalize_spaces(await section.inner_text(timeout=4000))
     except Exception:
-        raw = ""
-
-    raw = normalize_spaces(raw)
-    if not raw:
         return None
 
     return {
@@ -203,29 +170,21 @@ def try_contact_info_via_overlay(page, recruiter_profile: str) -> Optional[dict]
     }
 
 
-def click_contact_info_and_read_modal(page, recruiter_profile: str) -> Optional[dict]:
-    safe_goto(page, recruiter_profile)
-    page.wait_for_timeout(1000)
-
-    page.mouse.wheel(0, 500)
-    page.wait_for_timeout(400)
+async def click_contact_info_and_read_modal(page, recruiter_profile: str) -> Optional[dict]:
+    await safe_goto(page, recruiter_profile)
+    if not await wait_for_any(page, _CONTACT_INFO_SELECTORS, timeout_ms=6000):
+        return None
 
-    selectors = [
-        'a#top-card-text-details-contact-info',
-        'a[data-control-name="topcard_contact_info"]',
-        'a:has-text("Контактные сведения")',
-        'a:has-text("Contact info")',
-        'button:has-text("Контактные сведения")',
-        'button:has-text("Contact info")',
-    ]
+    await page.mouse.wheel(0, 500)
+    await human_pause()
 
     clicked = False
-    for sel in selectors:
+    for sel in _CONTACT_INFO_SELECTORS:
         loc = page.locator(sel).first
-        if loc.count() == 0:
+        if await loc.count() == 0:
             continue
         try:
-            loc.click(timeout=3500)
+            await loc.click(timeout=3500)
             clicked = True
             break
         except Exception:
@@ -235,18 +194,14 @@ def click_contact_info_and_read_modal(page, recruiter_profile: str) -> Optional[
         return None
 
     try:
-        page.wait_for_selector("section.pv-contact-info", timeout=8000)
+        await page.wait_for_selector("section.pv-contact-info", timeout=8000)
     except Exception:
         return None
 
     section = page.locator("section.pv-contact-info").first
     try:
-        raw = section.inner_text(timeout=4000)
+        raw = normalize_spaces(await section.inner_text(timeout=4000))
     except Exception:
-        raw = ""
-
-    raw = normalize_spaces(raw)
-    if not raw:
         return None
 
     info = {
@@ -257,7 +212,7 @@ def click_contact_info_and_read_modal(page, recruiter_profile: str) -> Optional[
 
     for close_sel in ['button[aria-label="Dismiss"]', 'button[aria-label="Закрыть"]']:
         try:
-            page.locator(close_sel).first.click(timeout=1500)
+            await page.locator(close_sel).first.click(timeout=1500)
             break
         except Exception:
             pass
@@ -265,107 +220,177 @@ def click_contact_info_and_read_modal(page, recruiter_profile: str) -> Optional[
     return info
 
 
-def scrape_contact_info(page, recruiter_profile: str) -> dict:
-    info = try_contact_info_via_overlay(page, recruiter_profile)
+class ContactInfoUnavailable(Exception):
+    """Панель контактов не открылась (таймаут, нет кнопки, сбой сети) — результат не кэшируется."""
+
+
+class ContactInfoBlocked(ContactInfoUnavailable):
+    """Контакты не прочитаны из-за редиректа антибота."""
+
+
+async def _fetch_contact_info(page, recruiter_profile: str) -> dict:
+    metrics = get_metrics()
+    with metrics.stage("contact_overlay"):
+        info = await try_contact_info_via_overlay(page, recruiter_profile)
     if info:
+        metrics.inc("contact_info_source", source="overlay")
         return info
 
-    info = click_contact_info_and_read_modal(page, recruiter_profile)
+    with metrics.stage("contact_modal"):
+        info = await click_contact_info_and_read_modal(page, recruiter_profile)
     if info:
+        metrics.inc("contact_info_source", source="modal")
         return info
 
-    return {"public_profile_url": recruiter_profile, "email": "", "raw": ""}
-
-def extract_work_format(description: str) -> str:
-    text = description.lower()
-    
-    # Идем строго по приоритетам
-    for pattern in _HYBRID_PATTERNS:
-        if pattern.search(text):
-            return "hybrid"
-
-    for pattern in _REMOTE_PATTERNS:
-        if pattern.search(text):
-            return "remote"
+    if is_bad_redirect(page.url):
+        raise ContactInfoBlocked(page.url)
+    # Отрицательный результат кэшируется только из открытой панели без email (выше),
+    # иначе временный сбой на 72 часа скрыл бы контакты рекрутера
+    raise ContactInfoUnavailable(page.url)
 
-    for pattern in _OFFICE_PATTERNS:
-        if pattern.search(text):
-            return "office"
 
-    return ""
+async def scrape_contact_info(page, recruiter_profile: str) -> dict:
+    # Повторные рекрутеры берутся из кэша без перехода на их профиль
+    profile_url = normalize_profile_url(recruiter_profile)
+    try:
+        with get_metrics().stage("contact_info"):
+            return await get_contact_cache().get_or_fetch(profile_url, lambda: _fetch_contact_info(page, profile_url))
+    except ContactInfoBlocked:
+        get_metrics().inc("contact_info_blocked")
+    except ContactInfoUnavailable:
+        get_metrics().inc("contact_info_unavailable")
+    return {"public_profile_url": profile_url, "email": "", "raw": ""}
 
 # =========================
 # MAIN EXTRACTOR (replaced)
 # =========================
 
-def extract_job_from_view(page, job_url: str, city: str) -> Optional[Job]:
-    safe_goto(page, job_url)
-    # Короткая пауза после перехода к вакансии — дальше полагаемся на scroll/життер
-    page.wait_for_timeout(800)
+async def extract_job_from_view(page, job_url: str, city: str) -> Optional[Job]:
+    with get_metrics().stage("extract_job"):
+        return await _extract_job_from_view(page, job_url, city)
+
+
+async def _extract_job_from_view(page, job_url: str, city: str) -> Optional[Job]:
+    metrics = get_metrics()
+    listener = listen_voyager(page) if EXTRACT_MODE == "network" else None
+    job_id = job_id_from_url(job_url)
+    if listener:
+        listener.expect(job_id)
+
+    await safe_goto(page, job_url)
+
+    if listener and job_id and not is_bad_redirect(page.url):
+        with metrics.stage("payload_wait"):
+            payload = await listener.wait(job_id, NETWORK_PAYLOAD_TIMEOUT_MS, NETWORK_HIRING_GRACE_MS)
+        if payload and not is_bad_redirect(page.url):
+            job = await _job_from_payload(page, payload, job_url, city)
+            if job:
+                metrics.inc("extract_source", source="network")
+                return job
+        metrics.inc("extract_source", source="dom_fallback")
+
+    # Ждём заголовок вакансии вместо фиксированной паузы
+    with metrics.stage("title_wait"):
+        if not await wait_for_any(page, _TITLE_SELECTORS, timeout_ms=5000):
+            # Заголовка нет (редирект, другая вёрстка) — хотя бы дождаться каркаса страницы
+            await wait_for_any(page, ["main"], timeout_ms=2000)
 
     # LinkedIn anti-bot
     if is_bad_redirect(page.url):
         print(f"[!] Redirected: {page.url} — cooling down...")
-        time.sleep(random.uniform(8, 15))
+        # Пауза общая для всех вкладок: её держит ограничитель темпа
+        get_rate_limiter().on_block("redirect")
+        metrics.inc("redirects")
         return None
 
     if "/jobs/view/" not in (page.url or ""):
         return None
 
-    sleep_jitter()
-
     # Title
     title = ""
     try:
         h1 = page.locator("h1").first
-        title = ((h1.text_content() or "").strip())
+        title = ((await h1.text_content() or "").strip())
     except Exception:
         pass
 
     if not title:
         try:
-            pt = (page.title() or "").strip()
-            if pt:
-                title = pt.split("|")[0].strip()
+            title = title_from_page_title(await page.title())
         except Exception:
             pass
 
-    if (title or "").strip().lower() in ["управляйте своими уведомлениями", "manage your notifications"]:
+    if is_notifications_title(title):
         return None
 
     # Better description
-    description = scrape_job_description(page)
+    with metrics.stage("description"):
+        description = await scrape_job_description(page)
     description = clean_description(description)
 
-    if not title or not description or len(description) < 40:
+    if not is_valid_job(title, description):
+        # Пустое описание часто означает урезанную страницу для бота — замедляемся без паузы
+        get_rate_limiter().on_block("empty_description", pause=False)
         return None
-    
-    # Work format
-    work_format = extract_work_format(description)
 
     # Recruiter + contact info
-    recruiter_name, recruiter_profile = scrape_recruiter(page)
+    with metrics.stage("recruiter"):
+        recruiter_name, recruiter_profile = await scrape_recruiter(page)
+
+    # Снимок DOM снимаем до ухода на профиль рекрутера, пока страница вакансии целая
+    html = ""
+    if CAPTURE_SNAPSHOTS:
+        try:
+            html = await page.content()
+        except Exception:
+            html = ""
+
+    return await _finish_job(page, job_url, city, title, description, recruiter_profile, html)
+
+
+async def _job_from_payload(page, payload: JobPayload, job_url: str, city: str) -> Optional[Job]:
+    """Вакансия из перехваченного JSON; None — данных не хватает, нужен разбор DOM."""
+    # Как в режиме dom: описание одной строкой, чтобы desc200 совпадал между режимами
+    description = clean_description(normalize_spaces(payload.description))
+    if is_notifications_title(payload.title) or not is_valid_job(payload.title, description):
+        return None
+
+    recruiter_profile = payload.recruiter_profile
+    if not recruiter_profile:
+        # Команда найма не пришла в JSON — ищем профиль на странице, как в режиме dom
+        with get_metrics().stage("recruiter"):
+            _, recruiter_profile = await scrape_recruiter(page)
+
+    # Снимок не сохраняем: DOM к этому моменту ещё не дорисован
+    job = await _finish_job(page, job_url, city, payload.title, description, recruiter_profile)
+    # Тип места работы из данных вакансии точнее, чем шаблоны по тексту описания
+    job.work_format = payload.work_format or job.work_format
+    job.company = payload.company
+    job.linkedin_job_id = payload.job_id
+    return job
+
+
+async def _finish_job(
+    page,
+    job_url: str,
+    city: str,
+    title: str,
+    description: str,
+    recruiter_profile: str,
+    html: str = "",
+) -> Job:
+    """Контакты рекрутера, снимок DOM (если снят) и сборка Job."""
     contact_info = {"public_profile_url": "", "email": "", "raw": ""}
 
     if recruiter_profile:
-        contact_info = scrape_contact_info(page, recruiter_profile)
-
-    # email HR
-    hr_email = (contact_info.get("email") or "").strip()
-    if not hr_email:
-        hr_email = extract_email(description)
-
-    # linkedin HR
-    hr_linkedin = recruiter_profile or ""
-
-    return Job(
-        job_url=job_url,
-        title=title,
-        description=description,
-        salary="не указана",
-        location=city,
-        work_format=work_format,
-        hr_email=hr_email,
-        hr_linkedin=hr_linkedin,
-        source="LinkedIn",
-    )
+        contact_info = await scrape_contact_info(page, recruiter_profile)
+
+    contact_email = (contact_info.get("email") or "").strip()
+    if html:
+        try:
+            with get_metrics().stage("snapshot"):
+                get_snapshot_store().save(html, job_url=job_url, city=city, contact_email=contact_email)
+        except Exception as e:
+            print(f"[-] Не удалось сохранить снимок: {e}")
+
+    return build_job(job_url, title, description, city, recruiter_profile, contact_email)
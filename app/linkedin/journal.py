@@ -0,0 +1,138 @@
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import RUNS_DIR
+
+# (город, geoId, роль) — как SearchTask в runner
+Task = Tuple[str, int, str]
+
+# Итоги, после которых ссылка не обрабатывается повторно. Сбои (failed, redirected на
+# логин/капчу) не окончательные: при --resume ссылка снова идёт в очередь
+TERMINAL_STATUSES = frozenset({"added", "skipped", "duplicate", "near_duplicate", "filtered"})
+
+
+def _task_key(task) -> Task:
+    city_name, geo_id, role = task
+    return city_name, int(geo_id), role
+
+
+@dataclass
+class ResumeState:
+    """Состояние прерванного прогона, восстановленное из журнала."""
+
+    run_id: str
+    done_tasks: Set[Task] = field(default_factory=set)
+    links: Dict[Task, List[str]] = field(default_factory=dict)
+    url_status: Dict[str, str] = field(default_factory=dict)
+
+    def pending_links(self, task: Task) -> Optional[List[str]]:
+        """
+        Необработанные ссылки задачи, если её поиск уже был собран.
+        None — поиск по задаче ещё не выполнялся.
+        """
+        links = self.links.get(_task_key(task))
+        if links is None:
+            return None
+        return [url for url in links if url not in self.url_status]
+
+
+class RunJournal:
+    """
+    Append-only журнал прогона: runs/<run_id>/journal-<part>.jsonl.
+
+    Каждое событие — одна JSON-строка, записывается с flush + fsync,
+    поэтому после падения теряется максимум последняя строка.
+    """
+
+    def __init__(self, run_id: str, part: str = "main", runs_dir: str = RUNS_DIR):
+        self.run_id = run_id
+        self.part = part
+        self.dir = Path(runs_dir) / run_id
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.dir / f"journal-{part}.jsonl"
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, event: str, **data) -> None:
+        record = {"event": event, "ts": datetime.now().isoformat(timespec="seconds"), **data}
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def task_links(self, task: Task, links: List[str]) -> None:
+        """Ссылки, собранные по задаче и поставленные в очередь."""
+        self._write("links", task=list(task), links=links)
+
+    def url_status(self, url: str, status: str) -> None:
+        """Окончательный итог обработки ссылки (TERMINAL_STATUSES)."""
+        self._write("url", url=url, status=status)
+
+    def task_done(self, task: Task) -> None:
+        self._write("task_done", task=list(task))
+
+    def finished(self) -> None:
+        self._write("finished")
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def latest_run_id(runs_dir: str = RUNS_DIR) -> Optional[str]:
+    root = Path(runs_dir)
+    if not root.is_dir():
+        return None
+    run_ids = sorted(p.name for p in root.iterdir() if p.is_dir())
+    return run_ids[-1] if run_ids else None
+
+
+def load_state(run_id: str, runs_dir: str = RUNS_DIR) -> ResumeState:
+    """Собирает состояние из всех частей журнала прогона (main и шарды)."""
+    state = ResumeState(run_id=run_id)
+    for path in sorted((Path(runs_dir) / run_id).glob("journal-*.jsonl")):
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Оборванная последняя строка после падения
+                    continue
+                event = record.get("event")
+                if event == "links":
+                    state.links[_task_key(record["task"])] = record["links"]
+                elif event == "url" and record["status"] in TERMINAL_STATUSES:
+                    # Сбои из журналов старых версий не считаются обработанными
+                    state.url_status[record["url"]] = record["status"]
+                elif event == "task_done":
+                    state.done_tasks.add(_task_key(record["task"]))
+    return state
+
+
+def prepare_run(resume: Optional[str] = None, runs_dir: str = RUNS_DIR) -> Tuple[str, Optional[ResumeState]]:
+    """
+    Возвращает (run_id, состояние для продолжения).
+
+    resume: None — новый прогон, "latest" — последний прогон из runs_dir,
+    иначе — конкретный run_id.
+    """
+    if resume:
+        run_id = latest_run_id(runs_dir) if resume == "latest" else resume
+        if run_id and (Path(runs_dir) / run_id).is_dir():
+            state = load_state(run_id, runs_dir)
+            print(
+                f"[+] Resume run {run_id}: done tasks {len(state.done_tasks)}, "
+                f"processed links {len(state.url_status)}"
+            )
+            return run_id, state
+        print(f"[-] Нет журнала для продолжения ({resume}), начинаем новый прогон")
+
+    run_id = new_run_id()
+    print(f"[+] Run ID: {run_id}")
+    return run_id, None
@@ -0,0 +1,167 @@
+import re
+from datetime import date, timedelta
+from typing import List, Optional
+
+from app.linkedin.classify import get_classifier
+from app.models import Job
+from app.normalize import extract_email
+
+# Разбор текста страницы вакансии без браузера: общий для живого скрапинга
+# (app.linkedin.extract) и офлайн-извлечения из снимков (app.offline).
+
+_DESCRIPTION_START = ["Об этой вакансии", "About this job"]
+_DESCRIPTION_END = ["О компании", "About the company", "© LinkedIn", "Похожие вакансии", "Similar jobs"]
+_DESCRIPTION_END_FALLBACK = ["Отправлять оповещения", "Send me alerts", "© LinkedIn"]
+
+_NOTIFICATION_TITLES = ["управляйте своими уведомлениями", "manage your notifications"]
+
+# «2 дня назад», «1 week ago», «Reposted 3 hours ago», «30+ days ago», «1 мес. назад», «3 ч назад»
+# -> число и единица. «мес»/«нед» покрывают и полные «месяц»/«неделю», «ч» — только отдельным словом.
+_POSTED_AGO = re.compile(r"(\d+)\+?\s*(мин|час|ч\b|дн|день|нед|мес|minute|hour|day|week|month)", re.I)
+_POSTED_UNIT_DAYS = {
+    "мин": 0, "час": 0, "ч": 0, "дн": 1, "день": 1, "нед": 7, "мес": 30,
+    "minute": 0, "hour": 0, "day": 1, "week": 7, "month": 30,
+}
+
+
+def normalize_spaces(text: str) -> str:
+    """Нормализует пробелы и переносы строк."""
+    return re.sub(r"\s+", " ", (text or "")).strip()
+
+
+def normalize_profile_url(url: str) -> str:
+    """Приводит ссылку на профиль LinkedIn к единому виду."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+
+    # Отбрасываем параметры и фрагменты
+    for sep in ("?", "#"):
+        if sep in url:
+            url = url.split(sep, 1)[0]
+
+    # Добавляем протокол/домен при необходимости
+    if url.startswith("//"):
+        url = "https:" + url
+    elif url.startswith("/"):
+        url = "https://www.linkedin.com" + url
+    elif not url.startswith("http"):
+        url = "https://" + url
+
+    # Нормализуем хвост /in/
+    if "/in/" in url and not url.endswith("/"):
+        url += "/"
+
+    return url
+
+
+def extract_between(text: str, start_markers: List[str], end_markers: List[str]) -> str:
+    if not text:
+        return ""
+
+    start_pos = -1
+    for sm in start_markers:
+        i = text.find(sm)
+        if i != -1:
+            start_pos = i + len(sm)
+            break
+    if start_pos == -1:
+        return ""
+
+    tail = text[start_pos:]
+
+    end_pos = None
+    for em in end_markers:
+        j = tail.find(em)
+        if j != -1:
+            end_pos = j
+            break
+
+    chunk = tail if end_pos is None else tail[:end_pos]
+    return normalize_spaces(chunk)
+
+
+def parse_email(text: str) -> str:
+    return extract_email(text)
+
+
+def extract_work_format(description: str) -> str:
+    """hybrid / remote / office / "" — один проход общего классификатора, приоритет hybrid > remote > office."""
+    return get_classifier().work_format(description)
+
+
+def description_from_page_text(main_txt: str) -> str:
+    """Вырезает описание вакансии из текста <main> между «About this job» и следующим блоком."""
+    main_txt = normalize_spaces(main_txt)
+
+    desc = extract_between(main_txt, start_markers=_DESCRIPTION_START, end_markers=_DESCRIPTION_END)
+
+    if not desc:
+        desc = extract_between(main_txt, start_markers=_DESCRIPTION_START, end_markers=_DESCRIPTION_END_FALLBACK)
+
+    return desc
+
+
+def posted_date(posted_text: str, datetime_attr: str = "", today: Optional[date] = None) -> Optional[str]:
+    """
+    Дата публикации YYYY-MM-DD: из атрибута <time datetime>, а если его нет —
+    приблизительно из относительного текста карточки («2 дня назад», «1 week ago»).
+    """
+    m = re.match(r"\d{4}-\d{2}-\d{2}", datetime_attr or "")
+    if m:
+        return m.group(0)
+
+    m = _POSTED_AGO.search(posted_text or "")
+    if not m:
+        return None
+    days = int(m.group(1)) * _POSTED_UNIT_DAYS[m.group(2).lower()]
+    return ((today or date.today()) - timedelta(days=days)).isoformat()
+
+
+def title_from_page_title(page_title: str) -> str:
+    """Заголовок вакансии из <title> вида «QA Engineer | Acme | LinkedIn»."""
+    return (page_title or "").strip().split("|")[0].strip()
+
+
+def is_notifications_title(title: str) -> bool:
+    """LinkedIn подсовывает страницу уведомлений вместо вакансии."""
+    return (title or "").strip().lower() in _NOTIFICATION_TITLES
+
+
+def matches_role(title: str, description: str, role: str) -> bool:
+    """Фильтр по роли: хотя бы одно ключевое слово роли (ROLE_KEYWORDS) в заголовке или описании."""
+    return get_classifier().matches_role(title, description, role)
+
+
+def is_valid_job(title: str, description: str) -> bool:
+    return bool(title) and bool(description) and len(description) >= 40
+
+
+def build_job(
+    job_url: str,
+    title: str,
+    description: str,
+    city: str,
+    recruiter_profile: str = "",
+    contact_email: str = "",
+    classify: bool = True,
+) -> Job:
+    """
+    Собирает Job из уже извлечённых полей (description — после clean_description).
+    classify=False — без формата работы: его проставит пакетный classify_many.
+    """
+    # email HR: из контактов рекрутера, иначе из текста описания
+    hr_email = (contact_email or "").strip() or extract_email(description)
+
+    return Job(
+        job_url=job_url,
+        title=title,
+        description=description,
+        salary="не указана",
+        location=city,
+        # Тот же проход классификатора потом переиспользует фильтр роли в runner
+        work_format=get_classifier().classify(title, description).work_format if classify else "",
+        hr_email=hr_email,
+        hr_linkedin=recruiter_profile or "",
+        source="LinkedIn",
+    )
@@ -0,0 +1,155 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Optional
+
+from app.config import (
+    RATE_START_RPS,
+    RATE_MIN_RPS,
+    RATE_MAX_RPS,
+    RATE_INCREASE_RPS,
+    RATE_DECREASE_FACTOR,
+    RATE_BLOCK_COOLDOWN_SEC,
+    RATE_JITTER_SEC,
+)
+from app.metrics import get_metrics
+
+
+class AdaptiveRateLimiter:
+    """
+    Темп навигаций к LinkedIn: token bucket со скоростью, которую подстраивает AIMD.
+
+    Каждая чистая загрузка прибавляет increase_rps к скорости (до max_rps),
+    сигнал антибота умножает скорость на decrease_factor (до min_rps) и,
+    для жёстких сигналов, ставит на паузу все вкладки на cooldown_sec.
+    Один экземпляр на процесс — его делят все вкладки. Состояние публикуется
+    в get_metrics(): gauges rate_limiter_* и счётчики rate_limiter_{navigations,signals,pauses}.
+    """
+
+    def __init__(
+        self,
+        start_rps: float = RATE_START_RPS,
+        min_rps: float = RATE_MIN_RPS,
+        max_rps: float = RATE_MAX_RPS,
+        increase_rps: float = RATE_INCREASE_RPS,
+        decrease_factor: float = RATE_DECREASE_FACTOR,
+        cooldown_sec: float = RATE_BLOCK_COOLDOWN_SEC,
+        jitter_sec: float = RATE_JITTER_SEC,
+    ):
+        self.rate = start_rps
+        self.min_rps = min_rps
+        self.max_rps = max_rps
+        self.increase_rps = increase_rps
+        self.decrease_factor = decrease_factor
+        self.cooldown_sec = cooldown_sec
+        self.jitter_sec = jitter_sec
+
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # asyncio.Lock привязан к циклу событий: новый run()/iter_jobs() в том же процессе — новый цикл
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.acquired = 0
+        self.successes = 0
+        self.signals: Counter = Counter()
+        self.waited_sec = 0.0
+        self.min_rate_seen = start_rps
+        self.max_rate_seen = start_rps
+        self._publish()
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _publish(self) -> None:
+        metrics = get_metrics()
+        metrics.set_gauge("rate_limiter_rate_rps", round(self.rate, 3))
+        metrics.set_gauge("rate_limiter_min_rate_rps", round(self.min_rate_seen, 3))
+        metrics.set_gauge("rate_limiter_max_rate_rps", round(self.max_rate_seen, 3))
+        metrics.set_gauge("rate_limiter_tokens", round(self._tokens, 3))
+        metrics.set_gauge("rate_limiter_waited_seconds", round(self.waited_sec, 3))
+
+    async def acquire(self) -> None:
+        """Ждёт разрешения на следующую навигацию."""
+        started = time.monotonic()
+        # Lock делает очередь справедливой: вкладки получают токены по порядку
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    break
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+        if self.jitter_sec:
+            await asyncio.sleep(random.uniform(0, self.jitter_sec))
+        self.acquired += 1
+        get_metrics().inc("rate_limiter_navigations")
+        self.waited_sec += time.monotonic() - started
+        self._publish()
+
+    def on_success(self) -> None:
+        """Страница загрузилась чисто: аддитивно ускоряемся."""
+        self.successes += 1
+        self.rate = min(self.max_rps, self.rate + self.increase_rps)
+        self.max_rate_seen = max(self.max_rate_seen, self.rate)
+        self._publish()
+
+    def on_block(self, reason: str, pause: bool = True) -> None:
+        """
+        Сигнал антибота (редирект, authwall, пустое описание, ошибка загрузки):
+        мультипликативно замедляемся, при pause=True — общая пауза для всех вкладок.
+        """
+        self.signals[reason] += 1
+        get_metrics().inc("rate_limiter_signals", reason=reason)
+        self.rate = max(self.min_rps, self.rate * self.decrease_factor)
+        self.min_rate_seen = min(self.min_rate_seen, self.rate)
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        if pause:
+            self._paused_until = max(self._paused_until, time.monotonic() + self.cooldown_sec)
+            get_metrics().inc("rate_limiter_pauses", reason=reason)
+            print(f"[!] Rate limiter: {reason} — pause {self.cooldown_sec:.0f}s, rate {self.rate:.2f} req/s")
+        self._publish()
+
+    def metrics(self) -> dict:
+        return {
+            "rate_rps": round(self.rate, 3),
+            "min_rate_rps": round(self.min_rate_seen, 3),
+            "max_rate_rps": round(self.max_rate_seen, 3),
+            "navigations": self.acquired,
+            "successes": self.successes,
+            "signals": dict(self.signals),
+            "waited_sec": round(self.waited_sec, 1),
+        }
+
+    def summary(self) -> str:
+        m = self.metrics()
+        signals = ", ".join(f"{k}={v}" for k, v in self.signals.most_common()) or "-"
+        return (
+            f"rate {m['rate_rps']} req/s (min {m['min_rate_rps']}, max {m['max_rate_rps']}), "
+            f"navigations {m['navigations']}, signals {signals}, waited {m['waited_sec']}s"
+        )
+
+
+_limiter_instance: Optional[AdaptiveRateLimiter] = None
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Возвращает общий для всех вкладок процесса ограничитель темпа."""
+    global _limiter_instance
+    if _limiter_instance is None:
+        _limiter_instance = AdaptiveRateLimiter()
+    return _limiter_instance
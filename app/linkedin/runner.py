@@ -1,119 +1,762 @@
-import random
-import time
-from typing import List, Set, Tuple
+import asyncio
+import inspect
+import os
+import queue as queue_mod
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
-from playwright.sync_api import sync_playwright
+from playwright.async_api import Page, async_playwright
 
-from app.config import ROLES, ROLE_KEYWORDS, RETRY_ATTEMPTS, RETRY_DELAYS_SEC, GEO_IDS
-from app.dedupe.key import dedup_key
+from app.config import (
+    ROLES,
+    RETRY_ATTEMPTS,
+    RETRY_DELAYS_SEC,
+    GEO_IDS,
+    DETAIL_TABS,
+    USER_DATA_DIR,
+    SKIP_KNOWN_JOBS,
+    PREFILTER_BY_TITLE,
+    PREFILTER_VISIT_UNKNOWN,
+    BLOCK_RESOURCES,
+    METRICS_PORT,
+    METRICS_PROM_FILE,
+    EXTRACT_MODE,
+    SEARCH_MAX_PAGES,
+    SEARCH_PAGE_SIZE,
+    SEARCH_PARALLEL_PAGES,
+    SEARCH_STOP_ON_KNOWN,
+    NEAR_DUP_ENABLED,
+    DEDUP_BLOOM_ENABLED,
+    DEDUP_BLOOM_PATH,
+    DEDUP_BLOOM_CAPACITY,
+    DEDUP_BLOOM_ERROR_RATE,
+)
+from app.dedupe.bloom import BloomFilter, load_known_keys
+from app.dedupe.key import dedup_digest
+from app.dedupe.minhash import get_near_dup_index
+from app.linkedin.blocker import ResourceBlocker
 from app.linkedin.browser import create_context_and_page
-from app.linkedin.collect import collect_job_links
+from app.linkedin.classify import get_classifier
+from app.linkedin.collect import collect_job_cards
+from app.linkedin.contact_cache import get_contact_cache
 from app.linkedin.extract import extract_job_from_view
-from app.linkedin.urls import build_search_url
-from app.linkedin.utils import safe_goto, is_bad_redirect, is_logged_in, sleep_jitter
-from app.models import Job
-from app.storage.postgres import get_storage, save_or_update, close_storage
+from app.linkedin.journal import TERMINAL_STATUSES, ResumeState, RunJournal, prepare_run
+from app.linkedin.parse import matches_role
+from app.linkedin.ratelimit import get_rate_limiter
+from app.linkedin.urls import build_search_url, job_id_from_url
+from app.linkedin.utils import safe_goto, is_bad_redirect, is_logged_in
+from app.linkedin.voyager import listen_voyager
+from app.linkedin.waits import track_network
+from app.metrics import get_metrics, serve_prometheus
+from app.models import Job, JobCard
+from app.output.sinks import CallbackSink, PostgresSink
+from app.storage.postgres import get_storage, close_storage
 
+# Маркер конца очереди: по одному на каждую вкладку вакансий
+_QUEUE_DONE = None
 
-def run() -> List[Job]:
-    all_jobs: List[Job] = []
-    seen_keys: Set[Tuple[str, str]] = set()
-    processed_urls: Set[str] = set()
+# Поисковая задача: (город, geoId, роль)
+SearchTask = Tuple[str, int, str]
+
+
+def search_tasks() -> List[SearchTask]:
+    """Матрица поиска город × роль в порядке обхода."""
+    return [(city_name, geo_id, role) for city_name, geo_id in GEO_IDS.items() for role in ROLES]
+
+
+class LocalSeen:
+    """Дедупликация ссылок и ключей в пределах одного процесса."""
+
+    def __init__(self):
+        self.urls: Set[str] = set()
+        self.keys: Set[bytes] = set()
+
+    def claim_url(self, url: str) -> bool:
+        """True, если ссылка встретилась впервые и её нужно обработать."""
+        if url in self.urls:
+            return False
+        self.urls.add(url)
+        return True
+
+    def claim_key(self, key: bytes) -> bool:
+        """True, если ключ дедупликации встретился впервые."""
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+
+
+def _known_and_touch(job_ids: Iterable[int]) -> Set[int]:
+    """Известные ID вакансий с обновлением им updated_at (блокирующие вызовы psycopg2)."""
+    storage = get_storage()
+    known = storage.known_job_ids(job_ids)
+    if known:
+        storage.touch_job_ids(known)
+    return known
+
+
+async def _skip_known_links(links: List[str]) -> List[str]:
+    """Отбрасывает вакансии, которые уже есть в БД, и одним запросом обновляет им updated_at."""
+    job_ids = {url: job_id_from_url(url) for url in links}
+    try:
+        # Запросы к БД — в потоке, чтобы не останавливать вкладки вакансий на время запроса
+        known = await asyncio.to_thread(_known_and_touch, list(job_ids.values()))
+    except Exception as e:
+        print(f"[-] Не удалось проверить известные вакансии: {e}")
+        return links
+
+    fresh = [url for url in links if job_ids[url] not in known]
+    if len(fresh) < len(links):
+        print(f"[=] Already in DB: {len(links) - len(fresh)} (updated_at touched), new: {len(fresh)}")
+    return fresh
+
+
+def _prefilter_cards(cards: List[JobCard], role: str) -> List[JobCard]:
+    """Отсев карточек, чей заголовок не может подойти под роль, до открытия страницы вакансии."""
+    classifier = get_classifier()
+    metrics = get_metrics()
+    kept = []
+    skipped = 0
+    for card in cards:
+        verdict = classifier.title_verdict(card.title, role)
+        metrics.inc("prefilter", verdict=verdict)
+        if verdict == "match" or (verdict == "unknown" and PREFILTER_VISIT_UNKNOWN):
+            kept.append(card)
+        else:
+            skipped += 1
+            print(f"[-] Pre-filter ({verdict}): {card.title or card.job_url}")
+    if skipped:
+        metrics.inc("visits_saved", skipped)
+        print(f"[=] Pre-filter: skipped {skipped} of {len(cards)} cards by title")
+    return kept
+
+
+class _Crawl:
+    """Общее состояние прогона для вкладки поиска и вкладок вакансий."""
+
+    def __init__(
+        self,
+        seen,
+        journal: Optional[RunJournal] = None,
+        resume: Optional[ResumeState] = None,
+        keep_jobs: bool = True,
+        sinks: Sequence = (),
+    ):
+        self.seen = seen
+        self.journal = journal
+        self.resume = resume
+        # keep_jobs=False — вакансии не копятся в памяти, а только отдаются в стоки
+        self.keep_jobs = keep_jobs
+        self.sinks = list(sinks)
+        self.all_jobs: List[Job] = []
+        # Карточки поиска по ссылке: их данные дописываются в Job после извлечения
+        self.cards: Dict[str, JobCard] = {}
+        # Ключи dedup_hash прошлых прогонов (DEDUP_BLOOM_ENABLED)
+        self.known_keys: Optional[BloomFilter] = None
+        self._pending: Dict[SearchTask, int] = {}
+        # Задачи, у которых есть ссылки со сбоем: они не закрываются, чтобы --resume их дообошёл
+        self._unfinished: Set[SearchTask] = set()
+
+        if resume:
+            # Ссылки, обработанные до остановки, не берём повторно из новых поисков
+            for url in resume.url_status:
+                seen.claim_url(url)
+
+    def task_queued(self, task: SearchTask, links: List[str], from_journal: bool = False) -> None:
+        if self.journal and not from_journal:
+            self.journal.task_links(task, links)
+        if links:
+            self._pending[task] = len(links)
+        elif self.journal:
+            self.journal.task_done(task)
+
+    def url_done(self, task: SearchTask, url: str, status: str) -> None:
+        if not self.journal:
+            return
+        if status in TERMINAL_STATUSES:
+            self.journal.url_status(url, status)
+        else:
+            self._unfinished.add(task)
+        self._pending[task] -= 1
+        if self._pending[task] == 0:
+            del self._pending[task]
+            if task in self._unfinished:
+                self._unfinished.discard(task)
+            else:
+                self.journal.task_done(task)
+
+
+async def _known_job_ids(job_ids: Iterable[int]) -> Set[int]:
+    """ID вакансий, которые уже есть в БД; при ошибке БД — пустое множество (обход не прерывается)."""
+    try:
+        job_ids = list(job_ids)
+        return await asyncio.to_thread(lambda: get_storage().known_job_ids(job_ids))
+    except Exception as e:
+        print(f"[-] Не удалось проверить известные вакансии: {e}")
+        return set()
+
+
+async def _all_known(cards: List[JobCard]) -> bool:
+    """Все вакансии страницы поиска уже есть в БД (карточки без job ID считаются новыми)."""
+    job_ids = {card.job_id for card in cards}
+    if not job_ids or None in job_ids:
+        return False
+    return len(await _known_job_ids(job_ids)) == len(job_ids)
+
+
+async def _collect_search_page(page: Page, task: SearchTask, page_no: int) -> List[JobCard]:
+    """Открывает страницу поиска page_no (смещение start) и собирает её карточки."""
+    _, geo_id, current_role = task
+    await safe_goto(page, build_search_url(current_role, geo_id, start=page_no * SEARCH_PAGE_SIZE))
+    return await collect_job_cards(page, limit=SEARCH_PAGE_SIZE)
+
+
+async def _collect_more_pages(pages: List[Page], task: SearchTask, cards: List[JobCard]) -> List[JobCard]:
+    """
+    Дообходит поиск по страницам 1..SEARCH_MAX_PAGES-1 (страница 0 уже собрана в cards).
+    Страницы открываются пачками по числу вкладок поиска. Обход останавливается, когда
+    страница не дала новых карточек (пустая выдача или LinkedIn повторил последнюю
+    страницу) или, при SEARCH_STOP_ON_KNOWN, все её новые вакансии уже есть в БД.
+    """
+    metrics = get_metrics()
+    if SEARCH_STOP_ON_KNOWN and await _all_known(cards):
+        metrics.inc("search_early_stop")
+        print("[=] Search page 1: all jobs already known, stop")
+        return cards
+    collected = {card.job_url for card in cards}
+    page_no = 1
+    while page_no < SEARCH_MAX_PAGES:
+        batch = range(page_no, min(page_no + len(pages), SEARCH_MAX_PAGES))
+        results = await asyncio.gather(
+            *(_collect_search_page(tab, task, n) for tab, n in zip(pages, batch)),
+            return_exceptions=True,
+        )
+        page_no = batch.stop
+
+        for n, result in zip(batch, results):
+            if isinstance(result, Exception):
+                print(f"[-] Search page {n + 1} failed: {result}")
+                metrics.inc("search_pages", outcome="error")
+                return cards
+            metrics.inc("search_pages", outcome="ok")
+            new_cards = [card for card in result if card.job_url not in collected]
+            if not new_cards:
+                print(f"[=] Search page {n + 1}: no new cards, stop")
+                return cards
+
+            collected.update(card.job_url for card in new_cards)
+            cards.extend(new_cards)
+            print(f"[+] Search page {n + 1}: {len(new_cards)} new cards")
+            if SEARCH_STOP_ON_KNOWN and await _all_known(new_cards):
+                metrics.inc("search_early_stop")
+                print(f"[=] Search page {n + 1}: all jobs already known, stop")
+                return cards
+    return cards
+
+
+async def _collect_task_links(pages: List[Page], task: SearchTask, crawl: _Crawl, interactive_login: bool) -> List[str]:
+    """Открывает поиск по задаче и возвращает новые ссылки на вакансии."""
+    page = pages[0]
+    city_name, geo_id, current_role = task
+    search_url = build_search_url(current_role, geo_id)
+
+    print(f"\n[+] Role: {current_role}")
+    print(f"[+] Open search: {search_url}")
+
+    await safe_goto(page, search_url)
+    try:
+        print("SEARCH page title:", await page.title())
+    except Exception:
+        pass
+
+    if not await is_logged_in(page):
+        get_rate_limiter().on_block("authwall", pause=False)
+        if not interactive_login:
+            raise RuntimeError("LinkedIn просит логин: залогиньтесь обычным запуском и повторите")
+        print("\n[!] LinkedIn просит логин.")
+        print("    Залогинься вручную в открывшемся окне, затем нажми Enter в консоли.")
+        # Блокируем весь event loop намеренно: остальные вкладки тоже ждут логина
+        input("Press Enter after login...")
+        await safe_goto(page, search_url)
+
+    if SEARCH_MAX_PAGES > 1:
+        get_metrics().inc("search_pages", outcome="ok")
+        cards = await collect_job_cards(page, limit=SEARCH_PAGE_SIZE)
+        cards = await _collect_more_pages(pages, task, cards)
+    else:
+        cards = await collect_job_cards(page)
+    cards = list({card.job_url: card for card in cards}.values())
+    print(f"[+] Collected links: {len(cards)} (unique)")
+
+    # Отсеянные карточки не отмечаются как виденные: та же вакансия может подойти под другую роль
+    if PREFILTER_BY_TITLE:
+        cards = _prefilter_cards(cards, current_role)
+
+    links = [card.job_url for card in cards if crawl.seen.claim_url(card.job_url)]
+    if SKIP_KNOWN_JOBS:
+        links = await _skip_known_links(links)
+    # Карточки запоминаются только для ссылок, которые пойдут в очередь: _process_link
+    # их забирает, а карточки отброшенных ссылок остались бы в памяти до конца прогона
+    by_url = {card.job_url: card for card in cards}
+    for job_url in links:
+        crawl.cards[job_url] = by_url[job_url]
+    return links
+
+
+async def _produce_links(
+    pages: List[Page],
+    tasks: Iterable[SearchTask],
+    queue: asyncio.Queue,
+    crawl: _Crawl,
+    workers: int,
+    interactive_login: bool,
+) -> None:
+    """Обходит поиск (город × роль) на своих вкладках и кладёт ссылки в общую очередь."""
+    current_city = None
+    try:
+        for task in tasks:
+            task = tuple(task)
+            city_name, _, current_role = task
+
+            if crawl.resume and task in crawl.resume.done_tasks:
+                continue
+
+            if city_name != current_city:
+                current_city = city_name
+                print("\n==============================")
+                print(f"[+] CITY: {city_name}")
+                print("==============================")
+
+            links = crawl.resume.pending_links(task) if crawl.resume else None
+            if links is not None:
+                links = [job_url for job_url in links if crawl.seen.claim_url(job_url)]
+                print(f"\n[+] Role: {current_role} (resume: {len(links)} links left)")
+                crawl.task_queued(task, links, from_journal=True)
+            else:
+                links = await _collect_task_links(pages, task, crawl, interactive_login)
+                crawl.task_queued(task, links)
+
+            for job_url in links:
+                await queue.put((job_url, task))
+    finally:
+        for _ in range(workers):
+            await queue.put(_QUEUE_DONE)
+
+
+async def _extract_with_retries(page: Page, job_url: str, city_name: str) -> Tuple[Optional[Job], Optional[Exception]]:
+    last_err = None
+    for attempt in range(RETRY_ATTEMPTS):
+        if attempt:
+            get_metrics().inc("extract_retries")
+        try:
+            return await extract_job_from_view(page, job_url, city_name), None
+        except Exception as e:
+            last_err = e
+            get_metrics().inc("extract_errors", error=type(e).__name__)
+            get_rate_limiter().on_block("error", pause=False)
+            await asyncio.sleep(RETRY_DELAYS_SEC[min(attempt, len(RETRY_DELAYS_SEC) - 1)])
+    return None, last_err
+
+
+def _apply_card(job: Job, card: Optional[JobCard]) -> None:
+    """Дополняет вакансию данными карточки поиска (у ссылок из журнала --resume карточек нет)."""
+    if card is None:
+        return
+    job.company = job.company or card.company
+    job.linkedin_job_id = job.linkedin_job_id or card.job_id
+    job.posted_at = job.posted_at or card.posted_at
+    job.promoted = job.promoted or card.promoted
+
+
+async def _process_link(page: Page, job_url: str, task: SearchTask, crawl: _Crawl) -> str:
+    """Обрабатывает одну вакансию и возвращает её статус для журнала."""
+    city_name, _, current_role = task
+    card = crawl.cards.pop(job_url, None)
+    job, last_err = await _extract_with_retries(page, job_url, city_name)
+
+    if not job:
+        if is_bad_redirect(page.url):
+            print(f"[-] Skip (redirected): {job_url} -> {page.url}")
+            return "redirected"
+        print(f"[-] Skip (failed/empty): {job_url} ({last_err})")
+        return "failed"
+
+    get_rate_limiter().on_success()
+    _apply_card(job, card)
+
+    # Role filter (по title + description)
+    if not matches_role(job.title, job.description, current_role):
+        print(f"[-] Filtered out by role: {job.title}")
+        return "filtered"
+
+    # Dedup: вкладки работают в одном event loop, поэтому проверка и отметка атомарны
+    key = dedup_digest(job.description, job.hr_email or job.hr_linkedin or job.job_url)
+    if not crawl.seen.claim_key(key):
+        print(f"[=] Duplicate: {job.title}")
+        return "duplicate"
+
+    # Дубликат из прошлых прогонов: фильтр отвечает без БД для новых ключей,
+    # срабатывание подтверждается по индексу (заодно обновляется updated_at)
+    if crawl.known_keys is not None and key in crawl.known_keys:
+        if get_storage().touch_dedup_hash(job.source, key):
+            get_metrics().inc("known_keys", result="confirmed")
+            print(f"[=] Already saved in a previous run: {job.title}")
+            return "duplicate"
+        get_metrics().inc("known_keys", result="false_positive")
+
+    # Почти-дубликат по описанию (репост с другим началом или рекрутером); та же вакансия
+    # LinkedIn дубликатом не считается и дальше обновляется через upsert
+    if NEAR_DUP_ENABLED:
+        with get_metrics().stage("near_dup"):
+            match = get_near_dup_index().check_and_add(
+                job.linkedin_job_id or job_id_from_url(job.job_url) or job.job_url, job.description
+            )
+        if match:
+            print(f"[=] Near-duplicate ({match[1]:.2f}) of {match[0]}: {job.title}")
+            return "near_duplicate"
+
+    if crawl.keep_jobs:
+        crawl.all_jobs.append(job)
+    print(f"[+] Added: {job.title} | {job.location}")
+
+    # Стоки: PostgreSQL, NDJSON, колбэки; ошибка одного не мешает остальным.
+    # Асинхронный write (очередь aiter_jobs) ждётся: медленный потребитель притормаживает вкладку
+    for sink in crawl.sinks:
+        try:
+            result = sink.write(job)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"[-] Ошибка записи вакансии ({type(sink).__name__}): {e}")
+    return "added"
+
+
+async def _detail_worker(page: Page, queue: asyncio.Queue, crawl: _Crawl) -> None:
+    """Берёт ссылки из очереди и обрабатывает их на своей вкладке."""
+    while True:
+        item = await queue.get()
+        if item is _QUEUE_DONE:
+            return
+
+        job_url, task = item
+        with get_metrics().stage("job_total"):
+            status = await _process_link(page, job_url, task, crawl)
+        get_metrics().inc("jobs", status=status)
+        crawl.url_done(task, job_url, status)
+
+
+# Этапы, которые печатаются в конце прогона (полный набор — в JSON-отчёте)
+_SUMMARY_STAGES = ["job_total", "goto", "rate_wait", "description", "recruiter", "contact_info", "db_flush"]
+
+
+def _load_known_keys(crawl: _Crawl) -> None:
+    """Фильтр Блума ключей из БД: из файла DEDUP_BLOOM_PATH плюс строки, добавленные после него."""
+    try:
+        with get_metrics().stage("known_keys_load"):
+            bloom, scanned = load_known_keys(
+                get_storage(), DEDUP_BLOOM_PATH, DEDUP_BLOOM_CAPACITY, DEDUP_BLOOM_ERROR_RATE
+            )
+    except Exception as e:
+        print(f"[-] Не удалось загрузить ключи прошлых прогонов: {e}")
+        return
+    crawl.known_keys = bloom
+    print(
+        f"[+] Known dedup keys: {bloom.count} ({scanned} read from DB, "
+        f"{len(bloom.bits) / 1024 / 1024:.1f} MB filter)"
+    )
+
+
+def _load_near_dup_index() -> None:
+    """Загружает сигнатуры сохранённых вакансий в индекс почти-дубликатов (один раз на процесс)."""
+    index = get_near_dup_index()
+    if index.loaded:
+        return
+    try:
+        with get_metrics().stage("near_dup_load"):
+            count = index.load(get_storage().iter_minhashes())
+        print(f"[+] Near-duplicate index: {count} stored descriptions")
+    except Exception as e:
+        # Без истории индекс всё равно ловит дубликаты внутри прогона
+        index.loaded = True
+        print(f"[-] Не удалось загрузить сигнатуры из БД: {e}")
+
+
+def _write_metrics_report(journal: Optional[RunJournal]) -> None:
+    """JSON-отчёт рядом с журналом прогона и, если задан, .prom-файл."""
+    metrics = get_metrics()
+    if journal:
+        path = journal.dir / f"metrics-{journal.part}.json"
+        try:
+            metrics.write_json(path)
+            print(f"[+] Metrics report: {path}")
+        except OSError as e:
+            print(f"[-] Не удалось записать отчёт метрик: {e}")
+
+    if METRICS_PROM_FILE:
+        prom_path = METRICS_PROM_FILE
+        if journal and journal.part != "main":
+            # У каждого шарда свой файл, иначе процессы перезапишут друг друга
+            root, ext = os.path.splitext(METRICS_PROM_FILE)
+            prom_path = f"{root}-{journal.part}{ext}"
+        try:
+            metrics.write_prometheus(prom_path)
+        except OSError as e:
+            print(f"[-] Не удалось записать {prom_path}: {e}")
+
+
+def _print_run_summary(blocker: Optional[ResourceBlocker]) -> None:
+    metrics = get_metrics()
+    if blocker:
+        print(f"[+] Network filter: {blocker.summary()}")
+    print(f"[+] Rate limiter: {get_rate_limiter().summary()}")
+    if EXTRACT_MODE == "network":
+        print(
+            f"[+] Network extraction: from JSON {metrics.counter('extract_source', source='network')}, "
+            f"DOM fallback {metrics.counter('extract_source', source='dom_fallback')}"
+        )
+    if PREFILTER_BY_TITLE:
+        print(f"[+] Pre-filter: {metrics.counter('visits_saved')} job page visits saved")
+    if NEAR_DUP_ENABLED:
+        print(
+            f"[+] Near-duplicates: {metrics.counter('jobs', status='near_duplicate')} skipped, "
+            f"index size {len(get_near_dup_index())}"
+        )
+    contacts = get_contact_cache()
+    print(f"[+] Contact cache: hits {contacts.hits}, fetched {contacts.misses}")
+
+
+async def run_async(
+    tasks: Optional[Iterable[SearchTask]] = None,
+    detail_tabs: int = DETAIL_TABS,
+    user_data_dir: str = USER_DATA_DIR,
+    proxy_server: Optional[str] = None,
+    seen=None,
+    interactive_login: bool = True,
+    journal: Optional[RunJournal] = None,
+    resume: Optional[ResumeState] = None,
+    metrics_port: int = METRICS_PORT,
+    keep_jobs: bool = True,
+    on_job: Optional[Callable[[Job], None]] = None,
+    sinks: Optional[Sequence] = None,
+) -> List[Job]:
+    """
+    Асинхронный обход: вкладка поиска (при SEARCH_PARALLEL_PAGES > 1 — несколько)
+    собирает ссылки, detail_tabs вкладок параллельно открывают вакансии из общей очереди.
+
+    Args:
+        tasks: Поисковые задачи (по умолчанию вся матрица search_tasks())
+        detail_tabs: Число параллельных вкладок вакансий
+        user_data_dir: Профиль Chromium
+        proxy_server: Прокси вместо PROXY_SERVER
+        seen: Объект с claim_url/claim_key (по умолчанию LocalSeen)
+        interactive_login: Можно ли ждать ручного логина в консоли
+        journal: Журнал прогона для последующего --resume
+        resume: Состояние прерванного прогона (пропускаются завершённые задачи и ссылки)
+        metrics_port: Порт для /metrics в формате Prometheus (0 — не поднимать)
+        keep_jobs: Копить принятые вакансии и вернуть их списком (False — вернуть пустой список)
+        on_job: Вызывается для каждой принятой вакансии сразу (как CallbackSink после sinks);
+            корутина-функция ждётся вкладкой
+        sinks: Стоки с write(job)/close() (по умолчанию [PostgresSink()]); закрывает их вызывающий.
+            write может вернуть awaitable — вкладка ждёт его, прежде чем взять следующую ссылку
+    """
+    sinks = list(sinks) if sinks is not None else [PostgresSink()]
+    if on_job:
+        sinks.append(CallbackSink(on_job))
+    crawl = _Crawl(seen if seen is not None else LocalSeen(), journal, resume, keep_jobs, sinks)
+    tasks = tasks if tasks is not None else search_tasks()
+    detail_tabs = max(1, detail_tabs)
 
     # Подключаемся к БД в начале, чтобы таблица была создана и соединение открыто
     get_storage()
+    if DEDUP_BLOOM_ENABLED:
+        _load_known_keys(crawl)
+    if NEAR_DUP_ENABLED:
+        _load_near_dup_index()
+
+    blocker = ResourceBlocker() if BLOCK_RESOURCES else None
+    metrics = get_metrics()
+    metrics_server = serve_prometheus(metrics, metrics_port) if metrics_port else None
+
+    completed = False
+    try:
+        async with async_playwright() as p:
+            context, search_page = await create_context_and_page(p, user_data_dir, proxy_server, blocker)
+            # Дополнительные вкладки поиска нужны только при постраничном обходе
+            search_pages = [search_page]
+            if SEARCH_MAX_PAGES > 1:
+                search_pages += [await context.new_page() for _ in range(SEARCH_PARALLEL_PAGES - 1)]
+            detail_pages = [await context.new_page() for _ in range(detail_tabs)]
+            for tab in detail_pages:
+                track_network(tab)
+                if EXTRACT_MODE == "network":
+                    listen_voyager(tab)
 
-    with sync_playwright() as p:
-        context, page = create_context_and_page(p)
+            queue: asyncio.Queue = asyncio.Queue()
+            await asyncio.gather(
+                _produce_links(search_pages, tasks, queue, crawl, detail_tabs, interactive_login),
+                *(_detail_worker(tab, queue, crawl) for tab in detail_pages),
+            )
 
-        for city_name, geo_id in GEO_IDS.items():
-            print(f"\n==============================")
-            print(f"[+] CITY: {city_name}")
-            print(f"==============================")
+            await context.close()
+        completed = True
+    finally:
+        # И при ошибке (Playwright, БД, сток), и при отмене из iter_jobs: фоновый писатель
+        # дописывает принятое в БД, сервер метрик останавливается
+        if completed:
+            _print_run_summary(blocker)
+        close_storage()
+        print(f"[+] Stages: {metrics.summary(_SUMMARY_STAGES)}")
+        _write_metrics_report(journal)
+        if metrics_server:
+            metrics_server.shutdown()
 
-            for current_role in ROLES:
-                search_url = build_search_url(current_role, geo_id)
+    return crawl.all_jobs
 
-                print(f"\n[+] Role: {current_role}")
-                print(f"[+] Open search: {search_url}")
 
-                safe_goto(page, search_url)
-                try:
-                    print("SEARCH page title:", page.title())
-                except Exception:
-                    pass
+# Маркер конца потока iter_jobs
+_ITER_DONE = object()
 
-                sleep_jitter()
 
-                if not is_logged_in(page):
-                    print("\n[!] LinkedIn просит логин.")
-                    print("    Залогинься вручную в открывшемся окне, затем нажми Enter в консоли.")
-                    input("Press Enter after login...")
-                    safe_goto(page, search_url)
-                    sleep_jitter()
+async def aiter_jobs(
+    resume: Optional[str] = None,
+    sinks: Optional[Sequence] = None,
+    on_job: Optional[Callable[[Job], None]] = None,
+    buffer: int = 100,
+    **run_kwargs,
+) -> AsyncIterator[Job]:
+    """
+    Асинхронный генератор принятых вакансий: каждая отдаётся сразу, как прошла
+    фильтры и дедупликацию, пока обход продолжается. Стоки (sinks, по умолчанию
+    PostgreSQL) получают вакансию раньше потребителя.
 
-                links = collect_job_links(page)
-                links = list(dict.fromkeys(links))
-                print(f"[+] Collected links: {len(links)} (unique)")
+    Прогон ведёт журнал, как run(): resume — None, "latest" или run_id.
+    Если потребитель прекращает итерацию, обход отменяется, принятое сохраняется,
+    а журнал остаётся незавершённым — прогон можно продолжить через --resume.
+    Вакансии, которые потребитель ещё не забрал, ждут в очереди на buffer штук;
+    когда она полна, вкладки вакансий ждут потребителя и обход притормаживает.
 
-                role_keywords = ROLE_KEYWORDS.get(current_role, [])
+    run_kwargs — остальные параметры run_async (tasks, detail_tabs, proxy_server, ...).
+    """
+    run_id, state = prepare_run(resume)
+    journal = RunJournal(run_id)
+    jobs: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer))
 
-                for i, job_url in enumerate(links, start=1):
-                    if job_url in processed_urls:
-                        continue
-                    processed_urls.add(job_url)
+    async def accept(job: Job) -> None:
+        if on_job:
+            on_job(job)
+        await jobs.put(job)
 
-                    if i % 5 == 0:
-                        print("[+] Cooling pause...")
-                        # Чуть сокращаем паузу, но оставляем рандом и «отдых»
-                        time.sleep(random.uniform(4, 8))
+    async def crawl() -> None:
+        cancelled = False
+        try:
+            await run_async(journal=journal, resume=state, keep_jobs=False, on_job=accept, sinks=sinks, **run_kwargs)
+            journal.finished()
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # После отмены потребителя нет: маркер в полную очередь никто не заберёт
+            if not cancelled:
+                await jobs.put(_ITER_DONE)
 
-                    job = None
-                    last_err = None
+    task = asyncio.create_task(crawl())
+    try:
+        while True:
+            job = await jobs.get()
+            if job is _ITER_DONE:
+                break
+            yield job
+        # Ошибку обхода (если была) получает потребитель
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        journal.close()
 
-                    for attempt in range(RETRY_ATTEMPTS):
-                        try:
-                            sleep_jitter()
-                            job = extract_job_from_view(page, job_url, city_name)
-                            break
-                        except Exception as e:
-                            last_err = e
-                            time.sleep(RETRY_DELAYS_SEC[min(attempt, len(RETRY_DELAYS_SEC) - 1)])
 
-                    if not job:
-                        if is_bad_redirect(page.url):
-                            print(f"[-] Skip (redirected): {job_url} -> {page.url}")
-                        else:
-                            print(f"[-] Skip (failed/empty): {job_url} ({last_err})")
-                        continue
+def iter_jobs(
+    resume: Optional[str] = None,
+    sinks: Optional[Sequence] = None,
+    buffer: int = 100,
+    **run_kwargs,
+) -> Iterator[Job]:
+    """
+    Синхронный вариант aiter_jobs: обход идёт в отдельном потоке со своим event loop,
+    вакансии передаются через очередь на buffer штук. Если потребитель не успевает,
+    очереди (эта и очередь aiter_jobs) заполняются и вкладки вакансий ждут его —
+    в памяти не больше 2 × buffer непрочитанных вакансий.
 
-                    # Role filter (по title + description)
-                    text_for_role = f"{job.title}\n{job.description}".lower()
-                    if role_keywords and not any(k in text_for_role for k in role_keywords):
-                        print(f"[-] Filtered out by role: {job.title}")
-                        continue
+    Прерванная итерация (break, исключение) останавливает обход; генератор стоит
+    закрывать явно (contextlib.closing), чтобы браузер закрылся сразу.
+    """
+    out: "queue_mod.Queue" = queue_mod.Queue(maxsize=max(1, buffer))
+    stop = threading.Event()
 
-                    # Dedup
-                    key = dedup_key(job.description, job.hr_email or job.hr_linkedin or job.job_url)
-                    if key in seen_keys:
-                        print(f"[=] Duplicate: {job.title}")
-                        continue
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.2)
+                return True
+            except queue_mod.Full:
+                continue
+        return False
 
-                    seen_keys.add(key)
-                    all_jobs.append(job)
-                    print(f"[+] Added: {job.title} | {job.location}")
+    async def pump() -> None:
+        loop = asyncio.get_running_loop()
+        agen = aiter_jobs(resume, sinks, buffer=buffer, **run_kwargs)
+        try:
+            async for job in agen:
+                # Ждём места в очереди вне event loop, чтобы вкладки продолжали работать
+                if not await loop.run_in_executor(None, put, (job, None)):
+                    break
+        finally:
+            await agen.aclose()
 
-                    # Сохраняем в PostgreSQL
-                    try:
-                        save_or_update(job, job.job_url)
-                    except Exception as e:
-                        print(f"[-] Ошибка при сохранении в БД: {e}")
+    def target() -> None:
+        error = None
+        try:
+            asyncio.run(pump())
+        except BaseException as e:
+            error = e
+        put((_ITER_DONE, error))
 
-        context.close()
+    thread = threading.Thread(target=target, name="iter-jobs", daemon=True)
+    thread.start()
+    try:
+        while True:
+            job, error = out.get()
+            if job is _ITER_DONE:
+                if error is not None:
+                    raise error
+                return
+            yield job
+    finally:
+        stop.set()
+        thread.join()
 
-    # Финализируем работу с БД (финальный commit и закрытие соединения)
-    close_storage()
 
-    return all_jobs
+def run(
+    resume: Optional[str] = None,
+    keep_jobs: bool = True,
+    on_job: Optional[Callable[[Job], None]] = None,
+    sinks: Optional[Sequence] = None,
+) -> List[Job]:
+    """
+    Синхронная точка входа: потребитель aiter_jobs в текущем потоке.
 
+    resume: None — новый прогон, "latest" или run_id — продолжить прерванный прогон.
+    keep_jobs: вернуть список принятых вакансий (False — пустой список, память не растёт).
+    on_job, sinks: как в run_async — для потоковой выгрузки.
+    """
+    async def consume() -> List[Job]:
+        jobs: List[Job] = []
+        async for job in aiter_jobs(resume, sinks, on_job=on_job):
+            if keep_jobs:
+                jobs.append(job)
+        return jobs
 
+    return asyncio.run(consume())
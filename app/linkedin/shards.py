@@ -0,0 +1,181 @@
+import asyncio
+import multiprocessing
+import queue as queue_mod
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from app.config import METRICS_PORT, SHARDS, SHARD_PROXIES, USER_DATA_DIR
+from app.linkedin.journal import ResumeState, RunJournal, prepare_run
+from app.linkedin.runner import SearchTask, run_async, search_tasks
+from app.metrics import get_metrics
+from app.output.ndjson_writer import NdjsonWriter, part_path, remove_parts
+
+# Кэши и lock-файлы Chromium не копируем: они большие и мешают запуску второго экземпляра
+_PROFILE_IGNORE = shutil.ignore_patterns(
+    "Singleton*",
+    "lockfile",
+    "Cache",
+    "Code Cache",
+    "GPUCache",
+    "Service Worker",
+    "ShaderCache",
+)
+
+
+class SharedSeen:
+    """
+    Дедупликация ссылок и ключей между процессами через словари Manager.
+
+    setdefault выполняется на стороне менеджера одним вызовом, поэтому
+    «проверить и занять» атомарно: побеждает первый шард.
+    """
+
+    def __init__(self, urls, keys, owner: int):
+        self._urls = urls
+        self._keys = keys
+        self._owner = owner
+        self._local_urls = set()
+        self._local_keys = set()
+
+    def _claim(self, shared, local: set, item) -> bool:
+        if item in local:
+            return False
+        local.add(item)
+        return shared.setdefault(item, self._owner) == self._owner
+
+    def claim_url(self, url: str) -> bool:
+        return self._claim(self._urls, self._local_urls, url)
+
+    def claim_key(self, key: bytes) -> bool:
+        return self._claim(self._keys, self._local_keys, key)
+
+
+def shard_profile_dir(shard_no: int) -> str:
+    return f"{USER_DATA_DIR}_shard{shard_no}"
+
+
+def clone_profile(shard_no: int) -> str:
+    """Копирует основной профиль (с сохранённым логином) в профиль шарда."""
+    dst = shard_profile_dir(shard_no)
+    src = Path(USER_DATA_DIR)
+    if src.exists():
+        shutil.copytree(src, dst, ignore=_PROFILE_IGNORE, dirs_exist_ok=True)
+    return dst
+
+
+def _drain(task_queue) -> Iterator[SearchTask]:
+    """Берёт задачи из общей очереди, пока она не опустеет."""
+    while True:
+        try:
+            yield task_queue.get_nowait()
+        except queue_mod.Empty:
+            return
+
+
+def _shard_worker(
+    shard_no: int,
+    task_queue,
+    seen_urls,
+    seen_keys,
+    proxy_server: Optional[str],
+    run_id: str,
+    resume: Optional[ResumeState],
+    ndjson_path: Optional[str] = None,
+) -> int:
+    """Обход задач из общей очереди в процессе шарда. Возвращает число принятых вакансий."""
+    profile_dir = clone_profile(shard_no)
+    print(f"[+] Shard {shard_no}: profile {profile_dir}, proxy {proxy_server or '-'}")
+    journal = RunJournal(run_id, part=f"shard{shard_no}")
+    # Потоковая выгрузка: у каждого шарда свой файл. Вакансии не копятся и не возвращаются
+    # через pickle — родителю нужен только их счёт
+    writer = NdjsonWriter(part_path(ndjson_path, f"shard{shard_no}"), append=resume is not None) if ndjson_path else None
+    try:
+        asyncio.run(
+            run_async(
+                tasks=_drain(task_queue),
+                user_data_dir=profile_dir,
+                proxy_server=proxy_server,
+                seen=SharedSeen(seen_urls, seen_keys, shard_no),
+                interactive_login=False,
+                journal=journal,
+                resume=resume,
+                metrics_port=METRICS_PORT + shard_no if METRICS_PORT else 0,
+                keep_jobs=False,
+                on_job=writer.write if writer else None,
+            )
+        )
+        return get_metrics().counter("jobs", status="added")
+    finally:
+        if writer:
+            writer.close()
+        journal.close()
+
+
+def run_sharded(
+    shards: int = SHARDS,
+    proxies: Sequence[str] = SHARD_PROXIES,
+    resume: Optional[str] = None,
+    ndjson_path: Optional[str] = None,
+) -> int:
+    """
+    Запускает обход матрицы город × роль в нескольких процессах.
+
+    Задачи раздаются через общую очередь (свободный шард берёт следующую),
+    ссылки и dedup-ключи дедуплицируются между процессами. Основной профиль
+    должен быть уже залогинен: шарды не ждут ручного входа.
+    Каждый шард пишет свою часть журнала прогона, resume работает как в run().
+    С ndjson_path шарды пишут вакансии в свои NDJSON-файлы (part_path); части прошлых
+    прогонов удаляются перед новым (при resume — дописываются).
+    Возвращает число принятых вакансий по всем шардам.
+    """
+    total = 0
+    run_id, state = prepare_run(resume)
+    if ndjson_path and state is None:
+        removed = remove_parts(ndjson_path)
+        if removed:
+            print(f"[=] Удалены части NDJSON прошлого прогона: {removed}")
+    tasks = search_tasks()
+    if state:
+        tasks = [task for task in tasks if task not in state.done_tasks]
+    if not tasks:
+        print("[+] Все задачи прогона уже выполнены")
+        return total
+    shards = max(1, min(shards, len(tasks)))
+
+    with multiprocessing.Manager() as manager:
+        task_queue = manager.Queue()
+        for task in tasks:
+            task_queue.put(task)
+        seen_urls = manager.dict()
+        seen_keys = manager.dict()
+
+        # spawn: Playwright и psycopg2 не переживают fork
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=shards, mp_context=ctx) as pool:
+            futures = {
+                pool.submit(
+                    _shard_worker,
+                    shard_no,
+                    task_queue,
+                    seen_urls,
+                    seen_keys,
+                    proxies[shard_no % len(proxies)] if proxies else None,
+                    run_id,
+                    state,
+                    ndjson_path,
+                ): shard_no
+                for shard_no in range(shards)
+            }
+            for future in as_completed(futures):
+                shard_no = futures[future]
+                try:
+                    count = future.result()
+                except Exception as e:
+                    print(f"[-] Shard {shard_no} failed: {e}")
+                    continue
+                print(f"[+] Shard {shard_no} done | jobs: {count}")
+                total += count
+
+    return total
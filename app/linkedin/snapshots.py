@@ -0,0 +1,78 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.config import SNAPSHOTS_DIR
+
+INDEX_FILE = "index.jsonl"
+
+
+class SnapshotStore:
+    """
+    Хранилище снимков DOM страниц вакансий.
+
+    Файл снимка — gzip HTML по пути <root>/ab/cd/<sha256>.html.gz, где sha256
+    считается от HTML, поэтому одинаковые страницы хранятся один раз.
+    index.jsonl связывает снимок с вакансией и тем, что в HTML не попадает
+    (город поиска, email из контактов рекрутера).
+    """
+
+    def __init__(self, root: str = SNAPSHOTS_DIR):
+        self.root = Path(root)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}.html.gz"
+
+    def save(self, html: str, job_url: str, city: str, contact_email: str = "") -> str:
+        """Сохраняет снимок (если такого ещё нет) и дописывает запись в индекс. Возвращает sha256."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+
+        record = {
+            "sha256": digest,
+            "job_url": job_url,
+            "city": city,
+            "contact_email": contact_email,
+            "captured_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(self.root / INDEX_FILE, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return digest
+
+    def load(self, digest: str) -> str:
+        return gzip.decompress(self.path_for(digest).read_bytes()).decode("utf-8")
+
+    def iter_index(self) -> Iterator[dict]:
+        """Записи индекса; для повторно снятой вакансии остаётся последняя."""
+        index_path = self.root / INDEX_FILE
+        if not index_path.exists():
+            return
+        latest = {}
+        with open(index_path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                latest[record["job_url"]] = record
+        yield from latest.values()
+
+
+_store_instance: Optional[SnapshotStore] = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = SnapshotStore()
+    return _store_instance
@@ -1,3 +1,20 @@
-def build_search_url(role: str, geo_id: int) -> str:
+import re
+from typing import Optional
+
+# /jobs/view/1234567890/ или /jobs/view/qa-engineer-at-acme-1234567890/
+_JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/?#]*-)?(\d+)")
+
+
+def build_search_url(role: str, geo_id: int, start: int = 0) -> str:
+    """Поиск вакансий; start — смещение выдачи (страница LinkedIn — SEARCH_PAGE_SIZE карточек)."""
     query = role.replace(" ", "%20")
-    return f"https://www.linkedin.com/jobs/search/?geoId={geo_id}&keywords={query}"
\ No newline at end of file
+    url = f"https://www.linkedin.com/jobs/search/?geoId={geo_id}&keywords={query}"
+    if start:
+        url += f"&start={start}"
+    return url
+
+
+def job_id_from_url(url: str) -> Optional[int]:
+    """Канонический ID вакансии LinkedIn из ссылки /jobs/view/..., None если его нет."""
+    m = _JOB_ID_RE.search(url or "")
+    return int(m.group(1)) if m else None
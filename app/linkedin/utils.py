@@ -1,17 +1,14 @@
-import random
-import time
-from typing import Any, Optional
+import asyncio
+from typing import Optional
 
-from playwright.sync_api import TimeoutError as PwTimeoutError, Page
+from playwright.async_api import TimeoutError as PwTimeoutError, Page
 
-from app.config import RETRY_ATTEMPTS, RETRY_DELAYS_SEC, MIN_DELAY_SEC, MAX_DELAY_SEC, NAV_TIMEOUT_MS
+from app.config import RETRY_ATTEMPTS, RETRY_DELAYS_SEC, NAV_TIMEOUT_MS
+from app.linkedin.ratelimit import get_rate_limiter
+from app.metrics import get_metrics
 
 
-def sleep_jitter() -> None:
-    time.sleep(random.uniform(MIN_DELAY_SEC, MAX_DELAY_SEC))
-
-
-def is_logged_in(page: Page) -> bool:
+async def is_logged_in(page: Page) -> bool:
     u = (page.url or "").lower()
     if any(x in u for x in ["/login", "/checkpoint", "/authwall"]):
         return False
@@ -22,13 +19,13 @@ def is_logged_in(page: Page) -> bool:
         'a.global-nav__primary-link[href*="/in/"]',
     ]:
         try:
-            if page.locator(sel).first.count():
+            if await page.locator(sel).first.count():
                 return True
         except Exception:
             pass
 
     try:
-        if page.locator("text=Sign in").first.is_visible(timeout=1200):
+        if await page.locator("text=Sign in").first.is_visible(timeout=1200):
             return False
     except Exception:
         pass
@@ -36,17 +33,27 @@ def is_logged_in(page: Page) -> bool:
     return True
 
 
-def safe_goto(page: Page, url: str) -> None:
+async def safe_goto(page: Page, url: str) -> None:
+    metrics = get_metrics()
     last_err: Optional[Exception] = None
     for attempt in range(RETRY_ATTEMPTS):
+        if attempt:
+            metrics.inc("goto_retries")
+        # Каждая навигация проходит через общий адаптивный ограничитель темпа
+        with metrics.stage("rate_wait"):
+            await get_rate_limiter().acquire()
         try:
-            page.goto(url, wait_until="domcontentloaded", timeout=NAV_TIMEOUT_MS)
+            with metrics.stage("goto"):
+                await page.goto(url, wait_until="domcontentloaded", timeout=NAV_TIMEOUT_MS)
+            metrics.inc("navigations", outcome="ok")
             return
         except PwTimeoutError as e:
             last_err = e
+            metrics.inc("navigations", outcome="timeout")
         except Exception as e:
             last_err = e
-        time.sleep(RETRY_DELAYS_SEC[min(attempt, len(RETRY_DELAYS_SEC) - 1)])
+            metrics.inc("navigations", outcome="error")
+        await asyncio.sleep(RETRY_DELAYS_SEC[min(attempt, len(RETRY_DELAYS_SEC) - 1)])
     raise last_err  # type: ignore[misc]
 
 
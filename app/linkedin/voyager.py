@@ -0,0 +1,260 @@
+import asyncio
+import json
+import re
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from playwright.async_api import Page, Response
+
+# Ответы Voyager API, в которых приходят данные вакансии и команды найма
+_POSTING_URL = re.compile(r"/voyager/api/.*(jobPosting|jobs/jobPostings|JobPostingDetailSections|jobDetails)", re.I)
+_HIRING_URL = re.compile(r"/voyager/api/.*(hiringTeam|jobPoster|HiringTeam)", re.I)
+
+_JOB_URN_ID = re.compile(r"urn:li:(?:fs_normalized_jobPosting|fsd_jobPosting|fs_jobPosting|jobPosting):(\d+)")
+# Секции вакансии со своим типом urn (urn:li:fsd_jobDescription:N и т.п.): id в них — id вакансии
+_JOB_SECTION_URN_ID = re.compile(r"urn:li:\w*job\w*:(\d+)", re.I)
+
+# urn:li:fsd_workplaceType:N (и старый fs_workplaceType)
+_WORKPLACE_BY_ID = {"1": "office", "2": "remote", "3": "hybrid"}
+_WORKPLACE_BY_NAME = {
+    "on-site": "office", "onsite": "office", "в офисе": "office", "на месте работодателя": "office",
+    "remote": "remote", "удаленно": "remote", "удалённо": "remote", "удаленная работа": "remote",
+    "hybrid": "hybrid", "гибридный формат": "hybrid", "гибрид": "hybrid",
+}
+
+
+@dataclass
+class JobPayload:
+    """Данные вакансии, собранные из JSON-ответов LinkedIn (поля заполняются по мере прихода ответов)."""
+
+    job_id: int
+    title: str = ""
+    description: str = ""
+    company: str = ""
+    work_format: str = ""
+    recruiter_profile: str = ""
+    recruiter_name: str = ""
+
+    def merge(self, other: "JobPayload") -> None:
+        for name in ("title", "description", "company", "work_format", "recruiter_profile", "recruiter_name"):
+            if not getattr(self, name) and getattr(other, name):
+                setattr(self, name, getattr(other, name))
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.title and self.description)
+
+
+def _walk(node) -> Iterator[dict]:
+    """Все словари внутри JSON (data и included у нормализованного ответа Voyager)."""
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            yield cur
+            stack.extend(cur.values())
+        elif isinstance(cur, list):
+            stack.extend(cur)
+
+
+def _text(value) -> str:
+    """Поле-текст Voyager: строка или {"text": ...} (TextViewModel / AttributedText)."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        text = value.get("text")
+        if isinstance(text, str):
+            return text.strip()
+    return ""
+
+
+def _job_id(entity: dict) -> Optional[int]:
+    for key in ("entityUrn", "jobPostingUrn", "*jobPosting", "dashEntityUrn", "preDashNormalizedJobPostingUrn"):
+        m = _JOB_URN_ID.search(str(entity.get(key) or ""))
+        if m:
+            return int(m.group(1))
+    posting_id = entity.get("jobPostingId")
+    if isinstance(posting_id, int) or (isinstance(posting_id, str) and posting_id.isdigit()):
+        return int(posting_id)
+    return None
+
+
+def _section_job_id(entity: dict) -> Optional[int]:
+    """id вакансии из urn секции (описание и т.п.), у которой нет urn jobPosting."""
+    m = _JOB_SECTION_URN_ID.search(str(entity.get("entityUrn") or ""))
+    return int(m.group(1)) if m else None
+
+
+def _workplace(entity: dict, workplace_names: Dict[str, str]) -> str:
+    for urn in entity.get("workplaceTypes") or entity.get("*workplaceTypesResolutionResults") or []:
+        urn = str(urn)
+        if urn in workplace_names:
+            return workplace_names[urn]
+        wp = _WORKPLACE_BY_ID.get(urn.rsplit(":", 1)[-1])
+        if wp:
+            return wp
+    if entity.get("workRemoteAllowed") is True:
+        return "remote"
+    return ""
+
+
+def _profile_url(public_id: str) -> str:
+    return f"https://www.linkedin.com/in/{public_id}/"
+
+
+def parse_voyager_payload(url: str, payload: dict, job_id: Optional[int] = None) -> List[JobPayload]:
+    """
+    Достаёт из одного JSON-ответа Voyager данные вакансий.
+
+    Схемы ответов у LinkedIn меняются, поэтому разбор не привязан к $type:
+    вакансия — словарь с title и urn jobPosting, формат работы — по urn/названию
+    workplaceType, рекрутер — профиль с publicIdentifier в ответе команды найма
+    или профиль, на который ссылается вакансия. job_id — вакансия, которую
+    сейчас открывает вкладка: к ней относятся секции описания, чей urn или
+    jobPostingId совпадает с ним. Словари без id вакансии (например, «о компании»
+    внутри ответа) не приписываются ни к какой вакансии.
+    """
+    entities = list(_walk(payload))
+    by_urn = {e["entityUrn"]: e for e in entities if isinstance(e.get("entityUrn"), str)}
+
+    workplace_names = {}
+    for e in entities:
+        urn = e.get("entityUrn") or ""
+        if isinstance(urn, str) and "workplaceType" in urn:
+            name = _text(e.get("localizedName")).lower()
+            if name in _WORKPLACE_BY_NAME:
+                workplace_names[urn] = _WORKPLACE_BY_NAME[name]
+
+    results: Dict[int, JobPayload] = {}
+
+    def get(jid: Optional[int]) -> Optional[JobPayload]:
+        jid = jid or job_id
+        if jid is None:
+            return None
+        if jid not in results:
+            results[jid] = JobPayload(job_id=jid)
+        return results[jid]
+
+    posting_response = bool(_POSTING_URL.search(url))
+    for e in entities:
+        title = _text(e.get("title"))
+        description = _text(e.get("description"))
+        jid = _job_id(e)
+        if jid is None and posting_response and job_id and len(description) >= 40:
+            # Секция описания без urn jobPosting — только если её urn указывает на открытую вакансию
+            if _section_job_id(e) == job_id:
+                jid = job_id
+        if not (jid and (title or description)):
+            continue
+        item = get(jid)
+        item.merge(
+            JobPayload(
+                job_id=jid,
+                title=title,
+                description=description,
+                company=_text(e.get("companyName")) or _text((e.get("companyDetails") or {}).get("name")),
+                work_format=_workplace(e, workplace_names),
+            )
+        )
+        # Автор вакансии, если ответ ссылается на его профиль
+        for key in ("*poster", "*jobPoster", "*hiringTeamMember", "posterUrn"):
+            profile = by_urn.get(e.get(key) or "")
+            if profile and profile.get("publicIdentifier"):
+                item.recruiter_profile = item.recruiter_profile or _profile_url(profile["publicIdentifier"])
+                item.recruiter_name = item.recruiter_name or " ".join(
+                    x for x in (_text(profile.get("firstName")), _text(profile.get("lastName"))) if x
+                )
+
+    if _HIRING_URL.search(url):
+        for e in entities:
+            public_id = e.get("publicIdentifier")
+            if not isinstance(public_id, str) or not public_id:
+                continue
+            item = get(_job_id(e))
+            if item and not item.recruiter_profile:
+                item.recruiter_profile = _profile_url(public_id)
+                item.recruiter_name = " ".join(
+                    x for x in (_text(e.get("firstName")), _text(e.get("lastName"))) if x
+                )
+            break
+
+    return list(results.values())
+
+
+class VoyagerListener:
+    """
+    Слушает JSON-ответы Voyager на вкладке и копит данные по job ID.
+
+    Перед переходом на вакансию вызывается expect(job_id): накопленное
+    сбрасывается, а секции описания с urn этой вакансии дальше относятся к ней.
+    """
+
+    def __init__(self, page: Page):
+        self.payloads: Dict[int, JobPayload] = {}
+        self.current_job_id: Optional[int] = None
+        self._updated = asyncio.Event()
+        self.responses = 0
+        self.parse_errors = 0
+        page.on("response", self._on_response)
+
+    async def _on_response(self, response: Response) -> None:
+        url = response.url
+        if "/voyager/api/" not in url or not (_POSTING_URL.search(url) or _HIRING_URL.search(url)):
+            return
+        try:
+            payload = json.loads(await response.body())
+        except Exception:
+            self.parse_errors += 1
+            return
+        self.responses += 1
+        for item in parse_voyager_payload(url, payload, self.current_job_id):
+            if item.job_id in self.payloads:
+                self.payloads[item.job_id].merge(item)
+            else:
+                self.payloads[item.job_id] = item
+        self._updated.set()
+
+    def expect(self, job_id: Optional[int]) -> None:
+        # Похожие вакансии из прошлых ответов больше не нужны
+        self.current_job_id = job_id
+        self.payloads = {}
+
+    async def wait(self, job_id: int, timeout_ms: int, hiring_grace_ms: int = 0) -> Optional[JobPayload]:
+        """
+        Ждёт данные вакансии: заголовок и описание — до timeout_ms,
+        затем ещё до hiring_grace_ms ответа команды найма. None — данных нет.
+        """
+        deadline = time.monotonic() + timeout_ms / 1000
+        grace_until: Optional[float] = None
+        while True:
+            item = self.payloads.get(job_id)
+            now = time.monotonic()
+            if item and item.complete:
+                if item.recruiter_profile:
+                    return item
+                if grace_until is None:
+                    grace_until = now + hiring_grace_ms / 1000
+                if now >= grace_until:
+                    return item
+            elif now >= deadline:
+                return None
+
+            wake_at = grace_until if grace_until is not None else deadline
+            self._updated.clear()
+            try:
+                await asyncio.wait_for(self._updated.wait(), timeout=max(0.0, wake_at - now))
+            except asyncio.TimeoutError:
+                pass
+
+
+_listeners: "weakref.WeakKeyDictionary[Page, VoyagerListener]" = weakref.WeakKeyDictionary()
+
+
+def listen_voyager(page: Page) -> VoyagerListener:
+    """Подключает перехват JSON-ответов к вкладке (один раз, до первой навигации)."""
+    listener = _listeners.get(page)
+    if listener is None:
+        listener = _listeners[page] = VoyagerListener(page)
+    return listener
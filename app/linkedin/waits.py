@@ -0,0 +1,116 @@
+import asyncio
+import random
+import time
+import weakref
+from typing import Iterable, Optional
+
+from playwright.async_api import Page
+
+from app.config import HUMAN_PAUSE_MIN_MS, HUMAN_PAUSE_MAX_MS
+
+# Ожидания по условиям вместо фиксированных wait_for_timeout.
+# Все функции ограничены timeout_ms и не бросают исключений по таймауту:
+# возвращают результат «как есть», дальше решает вызывающий код.
+
+_TEXT_STABLE_JS = """
+([sel, intervalMs, stableChecks, timeoutMs, minLen]) => new Promise((resolve) => {
+    const started = performance.now();
+    let last = -1;
+    let same = 0;
+    const tick = () => {
+        const el = document.querySelector(sel);
+        const n = el ? (el.innerText || "").length : 0;
+        if (n >= minLen && n === last) {
+            same += 1;
+            if (same >= stableChecks) return resolve(n);
+        } else {
+            same = 0;
+        }
+        last = n;
+        if (performance.now() - started >= timeoutMs) return resolve(n);
+        setTimeout(tick, intervalMs);
+    };
+    tick();
+})
+"""
+
+
+async def human_pause(min_ms: int = HUMAN_PAUSE_MIN_MS, max_ms: int = HUMAN_PAUSE_MAX_MS) -> None:
+    """Короткая случайная пауза там, где она нужна против антибота."""
+    await asyncio.sleep(random.uniform(min_ms, max_ms) / 1000)
+
+
+async def wait_for_any(page: Page, selectors: Iterable[str], timeout_ms: int = 5000) -> bool:
+    """Ждёт появления в DOM любого из селекторов. True — дождались."""
+    try:
+        await page.locator(", ".join(selectors)).first.wait_for(state="attached", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_text_stable(
+    page: Page,
+    selector: str,
+    timeout_ms: int = 4000,
+    interval_ms: int = 150,
+    stable_checks: int = 2,
+    min_len: int = 1,
+) -> int:
+    """
+    Ждёт, пока длина innerText элемента перестанет меняться.
+
+    Опрос идёт внутри страницы, поэтому это один вызов к браузеру.
+    Возвращает последнюю длину текста (0 — элемента нет).
+    """
+    try:
+        return await page.evaluate(
+            _TEXT_STABLE_JS,
+            [selector, interval_ms, stable_checks, timeout_ms, min_len],
+        )
+    except Exception:
+        return 0
+
+
+class _NetworkTracker:
+    """Считает незавершённые запросы страницы и время последней сетевой активности."""
+
+    def __init__(self, page: Page):
+        self.inflight = 0
+        self.last_activity = time.monotonic()
+        page.on("request", self._on_start)
+        page.on("requestfinished", self._on_end)
+        page.on("requestfailed", self._on_end)
+
+    def _on_start(self, _request) -> None:
+        self.inflight += 1
+        self.last_activity = time.monotonic()
+
+    def _on_end(self, _request) -> None:
+        self.inflight = max(0, self.inflight - 1)
+        self.last_activity = time.monotonic()
+
+
+_trackers: "weakref.WeakKeyDictionary[Page, _NetworkTracker]" = weakref.WeakKeyDictionary()
+
+
+def track_network(page: Page) -> None:
+    """Подключает учёт запросов к вкладке (один раз, до первой навигации)."""
+    if page not in _trackers:
+        _trackers[page] = _NetworkTracker(page)
+
+
+async def wait_for_network_idle(page: Page, idle_ms: int = 400, timeout_ms: int = 3000) -> bool:
+    """
+    Ждёт, пока на вкладке не будет активных запросов idle_ms подряд.
+    True — сеть затихла, False — вышли по timeout_ms.
+    """
+    track_network(page)
+    tracker: Optional[_NetworkTracker] = _trackers.get(page)
+    deadline = time.monotonic() + timeout_ms / 1000
+    idle_sec = idle_ms / 1000
+    while time.monotonic() < deadline:
+        if tracker.inflight == 0 and time.monotonic() - tracker.last_activity >= idle_sec:
+            return True
+        await asyncio.sleep(0.05)
+    return False
@@ -1,25 +1,81 @@
+import argparse
 import os
 from dotenv import load_dotenv
 
+from app.config import OUTPUT_JSON_PATH, OUTPUT_NDJSON_PATH, SHARDS
 from app.linkedin.runner import run
-from app.output.json_writer import write_jobs_to_json
-from app.storage.postgres import close_storage  # ← ДОБАВЬ
+from app.metrics import get_metrics
+from app.output.ndjson_writer import NdjsonWriter, ndjson_to_json, part_paths
+from app.storage.postgres import close_storage, get_writer  # ← ДОБАВЬ
 
 load_dotenv()
 
 SAVE_TO_JSON = os.getenv("SAVE_TO_JSON", "false").lower() == "true"
 
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="LinkedIn jobs scraper")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=SHARDS,
+        help="Число процессов для обхода матрицы город × роль (по умолчанию SHARDS из config)",
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="RUN_ID",
+        help="Продолжить прерванный прогон (без RUN_ID — последний из RUNS_DIR)",
+    )
+    parser.add_argument(
+        "--replay-spill",
+        action="store_true",
+        help="Дописать в БД вакансии, отложенные писателем в WRITER_SPILL_PATH, и выйти",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
+    if args.replay_spill:
+        try:
+            replayed = get_writer().replay_spill()
+        finally:
+            close_storage()
+        print(f"\nDone. Replayed from spill | jobs: {replayed}")
+        return
+
+    jobs_count = 0
     try:
-        jobs = run()
+        if args.shards > 1:
+            from app.linkedin.shards import run_sharded
+
+            jobs_count = run_sharded(
+                args.shards,
+                resume=args.resume,
+                ndjson_path=OUTPUT_NDJSON_PATH if SAVE_TO_JSON else None,
+            )
+        elif SAVE_TO_JSON:
+            # Вакансии пишутся в NDJSON по мере приёма: после падения выгрузка не теряется,
+            # при --resume дописывается в тот же файл
+            with NdjsonWriter(OUTPUT_NDJSON_PATH, append=args.resume is not None) as writer:
+                run(resume=args.resume, keep_jobs=False, on_job=writer.write)
+            jobs_count = writer.written
+        else:
+            # Вакансии уже в БД: список в памяти не нужен
+            run(resume=args.resume, keep_jobs=False)
+            jobs_count = get_metrics().counter("jobs", status="added")
     finally:
         close_storage()  # ← ОБЯЗАТЕЛЬНО
 
     if SAVE_TO_JSON:
-        out_path = write_jobs_to_json(jobs, "output_linkedin.json")
-        print(f"\nDone. Saved JSON: {out_path.resolve()} | jobs: {len(jobs)}")
+        sources = part_paths(OUTPUT_NDJSON_PATH, args.shards) if args.shards > 1 else [OUTPUT_NDJSON_PATH]
+        total = ndjson_to_json(sources, OUTPUT_JSON_PATH)
+        print(f"\nDone. Saved JSON: {os.path.abspath(OUTPUT_JSON_PATH)} | jobs: {jobs_count} (in file: {total})")
     else:
-        print(f"\nDone. Saved to PostgreSQL | jobs: {len(jobs)}")
+        print(f"\nDone. Saved to PostgreSQL | jobs: {jobs_count}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Границы корзин гистограмм, секунды (как у Prometheus: le = «меньше или равно»)
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+# Сколько последних замеров на этап держим для перцентилей
+_RESERVOIR = 5000
+
+_PREFIX = "linkedin_scraper"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(_BUCKETS)
+        self.recent: deque = deque(maxlen=_RESERVOIR)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        for i, bound in enumerate(_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+    def summary(self) -> dict:
+        ordered = sorted(self.recent)
+        return {
+            "count": self.count,
+            "total_sec": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(_percentile(ordered, 0.5) * 1000, 1),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class RunMetrics:
+    """
+    Метрики прогона: длительности этапов (гистограммы), счётчики событий
+    и gauges — текущие значения состояния (например, темп ограничителя).
+
+    Этап замеряется контекстным менеджером stage() — он одинаково работает
+    вокруг синхронного кода и вокруг await. Запись идёт и из фонового потока
+    (BackgroundWriter), поэтому всё под одним lock.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], int] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = _Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Замеряет блок кода как этап name (в том числе если блок упал)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def inc(self, name: str, value: int = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter(self, name: str, **labels: str) -> int:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def gauge(self, name: str, **labels: str) -> Optional[float]:
+        with self._lock:
+            return self._gauges.get((name, tuple(sorted(labels.items()))))
+
+    def report(self) -> dict:
+        """Отчёт для JSON: перцентили по этапам и счётчики."""
+        with self._lock:
+            stages = {name: hist.summary() for name, hist in sorted(self._stages.items())}
+            counters: Dict[str, object] = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                if labels:
+                    counters.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+                else:
+                    counters[name] = value
+            gauges: Dict[str, object] = {}
+            for (name, labels), value in sorted(self._gauges.items()):
+                if labels:
+                    gauges.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+                else:
+                    gauges[name] = value
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "duration_sec": round(time.time() - self.started, 1),
+            "stages": stages,
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def write_json(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
+
+    def prometheus_text(self) -> str:
+        """Метрики в текстовом формате Prometheus (exposition format 0.0.4)."""
+        lines = []
+        name = f"{_PREFIX}_stage_duration_seconds"
+        lines.append(f"# HELP {name} Duration of scraper stages.")
+        lines.append(f"# TYPE {name} histogram")
+        with self._lock:
+            for stage, hist in sorted(self._stages.items()):
+                for bound, count in zip(_BUCKETS, hist.buckets):
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+
+            typed = set()
+            for (counter, labels), value in sorted(self._counters.items()):
+                metric = f"{_PREFIX}_{counter}_total"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{metric}{{{label_str}}} {value}" if label_str else f"{metric} {value}")
+
+            typed = set()
+            for (gauge, labels), value in sorted(self._gauges.items()):
+                metric = f"{_PREFIX}_{gauge}"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} gauge")
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{metric}{{{label_str}}} {value}" if label_str else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Файл для node_exporter textfile collector (пишется атомарно)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def summary(self, stages: Optional[List[str]] = None) -> str:
+        """Короткая строка для лога: p50/p95 по основным этапам."""
+        report = self.report()["stages"]
+        parts = []
+        for name in stages or list(report):
+            s = report.get(name)
+            if s:
+                parts.append(f"{name} p50 {s['p50_ms']:.0f} / p95 {s['p95_ms']:.0f} ms (n={s['count']})")
+        return "; ".join(parts)
+
+
+def serve_prometheus(metrics: RunMetrics, port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Поднимает /metrics в фоновом потоке. Возвращает сервер или None, если порт занят."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        print(f"[-] Metrics: не удалось занять порт {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[+] Metrics: http://{host}:{port}/metrics")
+    return server
+
+
+_metrics_instance: Optional[RunMetrics] = None
+
+
+def get_metrics() -> RunMetrics:
+    global _metrics_instance
+    if _metrics_instance is None:
+        _metrics_instance = RunMetrics()
+    return _metrics_instance
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -8,7 +9,26 @@ class Job:
     description: str
     salary: str
     location: str
-    work_format: str = ""
     hr_email: str
     hr_linkedin: str
+    work_format: str = ""
     source: str = "LinkedIn"
+    # Из карточки поиска (если вакансия пришла из поиска, а не из журнала/снимка)
+    company: str = ""
+    linkedin_job_id: Optional[int] = None
+    posted_at: Optional[str] = None  # дата публикации, YYYY-MM-DD
+    promoted: bool = False
+
+
+@dataclass
+class JobCard:
+    """Карточка вакансии из списка результатов поиска (до открытия страницы вакансии)."""
+
+    job_url: str
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    job_id: Optional[int] = None
+    posted_text: str = ""  # как в списке: «2 дня назад», «1 week ago»
+    posted_at: Optional[str] = None  # дата публикации, YYYY-MM-DD
+    promoted: bool = False
@@ -0,0 +1,73 @@
+"""
+Офлайн-переизвлечение вакансий из снимков DOM (CAPTURE_SNAPSHOTS).
+
+Запуск из корня проекта:
+    python -m app.offline --out reextracted.ndjson --workers 8
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Iterator, List, Tuple
+
+from app.config import SNAPSHOTS_DIR
+from app.linkedin.classify import get_classifier
+from app.linkedin.snapshots import SnapshotStore
+from app.offline.html import extract_job_from_html
+
+# Снимков на задачу процесса: извлечённые вакансии классифицируются одним classify_many
+CHUNK_SIZE = 64
+
+
+def _chunks(items: List[dict], size: int) -> Iterator[List[dict]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _extract_chunk(args: Tuple[str, List[dict]]) -> List[dict]:
+    root, records = args
+    store = SnapshotStore(root)
+    jobs = []
+    for record in records:
+        try:
+            html = store.load(record["sha256"])
+            job = extract_job_from_html(
+                html, record["job_url"], record.get("city", ""), record.get("contact_email", ""), classify=False
+            )
+        except Exception as e:
+            print(f"[-] {record.get('job_url')}: {e}")
+            continue
+        if job:
+            jobs.append(job)
+    for job, result in zip(jobs, get_classifier().classify_many((job.title, job.description) for job in jobs)):
+        job.work_format = result.work_format
+    return [asdict(job) for job in jobs]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-extract jobs from stored DOM snapshots")
+    parser.add_argument("--snapshots", default=SNAPSHOTS_DIR, help="Каталог снимков (по умолчанию SNAPSHOTS_DIR)")
+    parser.add_argument("--out", default="reextracted.ndjson", help="Куда писать вакансии (NDJSON)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Число процессов")
+    args = parser.parse_args()
+
+    records = list(SnapshotStore(args.snapshots).iter_index())
+    print(f"[+] Snapshots: {len(records)}")
+
+    started = time.monotonic()
+    extracted = 0
+    with open(args.out, "w", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        tasks = ((args.snapshots, chunk) for chunk in _chunks(records, CHUNK_SIZE))
+        for jobs in pool.map(_extract_chunk, tasks):
+            for job in jobs:
+                out.write(json.dumps(job, ensure_ascii=False) + "\n")
+            extracted += len(jobs)
+
+    elapsed = time.monotonic() - started
+    print(f"[+] Extracted {extracted}/{len(records)} jobs in {elapsed:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+from typing import List, Optional
+
+import lxml.html
+
+from app.linkedin.parse import (
+    build_job,
+    description_from_page_text,
+    is_notifications_title,
+    is_valid_job,
+    normalize_profile_url,
+    title_from_page_title,
+)
+from app.models import Job
+from app.normalize import clean_description
+
+# Блочные теги: на их границах inner_text браузера ставит перевод строки
+_BLOCK_TAGS = frozenset(
+    "address article aside blockquote br dd div dl dt fieldset figcaption figure footer form "
+    "h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table tbody thead tr td th ul".split()
+)
+_SKIP_TAGS = frozenset("script style noscript template svg head".split())
+
+
+def inner_text(element) -> str:
+    """Приближение element.innerText без браузера: текст с переводами строк на границах блоков."""
+    parts: List[str] = []
+
+    def walk(node) -> None:
+        tag = node.tag if isinstance(node.tag, str) else ""
+        if tag and tag not in _SKIP_TAGS and node.get("hidden") is None:
+            block = tag in _BLOCK_TAGS
+            if block:
+                parts.append("\n")
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child)
+            if block:
+                parts.append("\n")
+        if node.tail:
+            parts.append(node.tail)
+
+    walk(element)
+    return "".join(parts)
+
+
+def extract_job_from_html(
+    html: str, job_url: str, city: str, contact_email: str = "", classify: bool = True
+) -> Optional[Job]:
+    """
+    Тот же Job, что extract_job_from_view, но из сохранённого снимка страницы.
+
+    Контакты рекрутера в снимок не попадают, поэтому email из них передаётся отдельно
+    (он записан в индексе снимков). classify — как в build_job.
+    """
+    doc = lxml.html.fromstring(html)
+
+    title = ""
+    h1 = doc.find(".//h1")
+    if h1 is not None:
+        title = (h1.text_content() or "").strip()
+    if not title:
+        page_title = doc.find(".//title")
+        if page_title is not None:
+            title = title_from_page_title(page_title.text_content())
+
+    if is_notifications_title(title):
+        return None
+
+    main = doc.find(".//main")
+    description = description_from_page_text(inner_text(main if main is not None else doc))
+    description = clean_description(description)
+
+    if not is_valid_job(title, description):
+        return None
+
+    recruiter_profile = ""
+    for a in doc.iterfind(".//a[@href]"):
+        href = a.get("href") or ""
+        if "/in/" in href:
+            recruiter_profile = normalize_profile_url(href)
+            break
+
+    return build_job(job_url, title, description, city, recruiter_profile, contact_email, classify=classify)
@@ -0,0 +1,26 @@
+"""
+Конвертация NDJSON-выгрузки в прежний JSON-массив (indent=2).
+
+Запуск из корня проекта:
+    python -m app.output.convert output_linkedin.ndjson -o output_linkedin.json
+    python -m app.output.convert output_linkedin.shard*.ndjson.gz -o output_linkedin.json
+"""
+import argparse
+
+from app.config import OUTPUT_JSON_PATH
+from app.output.ndjson_writer import ndjson_to_json
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert NDJSON job export to a JSON array")
+    parser.add_argument("sources", nargs="+", help="NDJSON-файлы (.ndjson, .ndjson.gz, .ndjson.zst)")
+    parser.add_argument("-o", "--out", default=OUTPUT_JSON_PATH, help="Куда писать JSON (по умолчанию OUTPUT_JSON_PATH)")
+    parser.add_argument("--compression", choices=["gzip", "zstd"], default=None, help="Сжатие, если не по расширению")
+    args = parser.parse_args()
+
+    count = ndjson_to_json(args.sources, args.out, args.compression)
+    print(f"[+] {args.out}: {count} вакансий")
+
+
+if __name__ == "__main__":
+    main()
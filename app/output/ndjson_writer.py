@@ -0,0 +1,245 @@
+import gzip
+import io
+import json
+import os
+import time
+import zlib
+from dataclasses import asdict
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Union
+
+from app.config import OUTPUT_FSYNC_EVERY, OUTPUT_FSYNC_INTERVAL_SEC
+from app.models import Job
+
+_COMPRESSIONS = (None, "gzip", "zstd")
+
+
+def compression_for(path: Union[str, Path], compression: Optional[str] = None) -> Optional[str]:
+    """Сжатие по явному параметру или по расширению файла (.gz / .zst)."""
+    if compression:
+        if compression not in _COMPRESSIONS:
+            raise ValueError(f"Неизвестное сжатие {compression!r}: ожидается gzip или zstd")
+        return compression
+    suffix = Path(path).suffix.lower()
+    if suffix == ".gz":
+        return "gzip"
+    if suffix in (".zst", ".zstd"):
+        return "zstd"
+    return None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Для сжатия zstd нужен пакет zstandard: pip install zstandard") from None
+    return zstandard
+
+
+class NdjsonWriter:
+    """
+    Потоковая запись вакансий в NDJSON: одна строка на вакансию, сразу после приёма.
+
+    Память не растёт с размером прогона. Буфер сбрасывается на диск (flush + fsync)
+    каждые fsync_every записей или раз в fsync_interval_sec, так что после падения
+    теряется не больше одной пачки. Сжатие gzip/zstd пишется потоково; при дозаписи
+    (append=True, например --resume) добавляется новый gzip-член / zstd-фрейм,
+    такие файлы читаются как один поток.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        compression: Optional[str] = None,
+        append: bool = False,
+        fsync_every: int = OUTPUT_FSYNC_EVERY,
+        fsync_interval_sec: float = OUTPUT_FSYNC_INTERVAL_SEC,
+    ):
+        self.path = Path(path)
+        self.compression = compression_for(path, compression)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval_sec = fsync_interval_sec
+        self.written = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if append and self.path.exists():
+            _repair_tail(self.path, self.compression)
+        self._raw = open(self.path, "ab" if append else "wb")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._stream = _zstandard().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def write(self, job: Job) -> None:
+        line = json.dumps(asdict(job), ensure_ascii=False) + "\n"
+        self._stream.write(line.encode("utf-8"))
+        self.written += 1
+        self._pending += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval_sec:
+            self.sync()
+
+    def sync(self) -> None:
+        """Дописывает сжатый блок и буферы ОС на диск."""
+        if self.compression == "gzip":
+            self._stream.flush()  # Z_SYNC_FLUSH: всё записанное читается без конца gzip-члена
+        elif self.compression == "zstd":
+            self._stream.flush(_zstandard().FLUSH_BLOCK)
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._raw.closed:
+            return
+        if self._stream is not self._raw:
+            self._stream.close()  # конец gzip-члена / zstd-фрейма
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def part_path(path: Union[str, Path], part: str) -> Path:
+    """Файл части (шарда): output_linkedin.ndjson.gz -> output_linkedin.shard0.ndjson.gz."""
+    path = Path(path)
+    stem, dot, suffixes = path.name.partition(".")
+    return path.with_name(f"{stem}.{part}{dot}{suffixes}")
+
+
+def part_paths(path: Union[str, Path], shards: int) -> list:
+    """
+    Файлы частей шардов 0..shards-1, которые есть на диске. Список строится по числу
+    шардов, а не по маске: части от прошлого прогона с большим числом шардов не попадут.
+    """
+    return [p for p in (part_path(path, f"shard{i}") for i in range(shards)) if p.exists()]
+
+
+def remove_parts(path: Union[str, Path]) -> int:
+    """Удаляет все файлы частей path (перед новым прогоном). Возвращает их число."""
+    stale = list(Path(path).parent.glob(part_path(path, "shard*").name))
+    for p in stale:
+        p.unlink()
+    return len(stale)
+
+
+def _open_text(path: Union[str, Path], compression: Optional[str]) -> IO[str]:
+    compression = compression_for(path, compression)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        fh = open(path, "rb")
+        reader = _zstandard().ZstdDecompressor().stream_reader(fh, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _read_errors(compression: Optional[str]) -> tuple:
+    """Ошибки чтения оборванного сжатого потока."""
+    errors = (EOFError, OSError, zlib.error)
+    if compression == "zstd":
+        errors += (_zstandard().ZstdError,)
+    return errors
+
+
+def _iter_lines(path: Union[str, Path], compression: Optional[str]) -> Iterator[str]:
+    """Целые строки файла; на оборванном хвосте (падение посреди записи) чтение останавливается."""
+    compression = compression_for(path, compression)
+    with _open_text(path, compression) as fh:
+        try:
+            for line in fh:
+                if not line.endswith("\n"):
+                    return
+                yield line
+        except _read_errors(compression):
+            return
+
+
+def iter_ndjson(path: Union[str, Path], compression: Optional[str] = None) -> Iterator[dict]:
+    """
+    Записи NDJSON по одной. Файл, оборванный падением (незавершённый gzip-член,
+    недописанная последняя строка), читается до последней целой строки.
+    """
+    for line in _iter_lines(path, compression):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _repair_tail(path: Path, compression: Optional[str]) -> None:
+    """
+    Перед дозаписью убирает оборванный хвост после падения: иначе новые строки
+    склеятся с недописанной (без сжатия) или окажутся за битым gzip/zstd-потоком.
+    """
+    if compression is None:
+        with open(path, "rb+") as fh:
+            size = fh.seek(0, os.SEEK_END)
+            if not size:
+                return
+            fh.seek(max(0, size - 1))
+            if fh.read(1) == b"\n":
+                return
+            # Ищем последний перевод строки с конца файла блоками
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                fh.seek(start)
+                pos = fh.read(end - start).rfind(b"\n")
+                if pos >= 0:
+                    fh.truncate(start + pos + 1)
+                    return
+                end = start
+            fh.truncate(0)
+        return
+
+    try:
+        with _open_text(path, compression) as fh:
+            for line in fh:
+                if not line.endswith("\n"):
+                    break
+            else:
+                return
+    except _read_errors(compression):
+        pass
+    # Сжатый поток оборван: переписываем целые строки в новый файл
+    tmp = path.with_name(f"{path.name}.repair")
+    with open(tmp, "wb") as raw:
+        if compression == "gzip":
+            stream = gzip.GzipFile(fileobj=raw, mode="wb")
+        else:
+            stream = _zstandard().ZstdCompressor().stream_writer(raw, closefd=False)
+        for line in _iter_lines(path, compression):
+            stream.write(line.encode("utf-8"))
+        stream.close()
+    os.replace(tmp, path)
+    print(f"[!] {path}: оборванный хвост после падения отброшен")
+
+
+def ndjson_to_json(
+    sources: Iterable[Union[str, Path]],
+    path: Union[str, Path] = "output_linkedin.json",
+    compression: Optional[str] = None,
+) -> int:
+    """
+    Конвертирует NDJSON (один или несколько файлов, например части шардов) в прежний
+    формат — JSON-массив с indent=2, как write_jobs_to_json. Пишет потоково,
+    по одной вакансии. Возвращает число записей.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("[")
+        for source in sources:
+            for record in iter_ndjson(source, compression):
+                item = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+                out.write(("," if count else "") + "\n  " + item)
+                count += 1
+        out.write("\n]" if count else "]")
+    return count
@@ -0,0 +1,32 @@
+from typing import Callable
+
+from app.models import Job
+from app.storage.postgres import save_or_update
+
+
+class PostgresSink:
+    """Сохранение в PostgreSQL через фоновый писатель (save_or_update). Сток по умолчанию."""
+
+    def write(self, job: Job) -> None:
+        save_or_update(job, job.job_url)
+
+    def close(self) -> None:
+        # Писатель и соединение закрывает close_storage() в конце run_async
+        pass
+
+
+class CallbackSink:
+    """Вызывает функцию для каждой принятой вакансии (результат корутины-функции ждёт runner)."""
+
+    def __init__(self, fn: Callable[[Job], object]):
+        self.fn = fn
+
+    def write(self, job: Job):
+        return self.fn(job)
+
+    def close(self) -> None:
+        pass
+
+
+# Сток — любой объект с write(job) и close(); NdjsonWriter из app.output.ndjson_writer подходит как есть.
+# write может вернуть awaitable: вкладка вакансий дождётся его (так aiter_jobs передаёт backpressure)
@@ -1,10 +1,13 @@
 import os
-from typing import Optional
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
 
 import psycopg2
 from dotenv import load_dotenv
 
-from app.dedupe.key import dedup_key
+from app.dedupe.key import dedup_key, key_digest
+from app.dedupe.minhash import get_hasher
+from app.linkedin.urls import job_id_from_url
+from app.metrics import get_metrics
 from app.models import Job
 
 # Загружаем переменные окружения из .env
@@ -16,11 +19,84 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL не найден в переменных окружения. Создайте файл .env с DATABASE_URL=...")
 
 
+# Колонки, которые пишутся при сохранении вакансии (порядок как в job_to_row)
+INSERT_COLUMNS = (
+    "source",
+    "title",
+    "company",
+    "location",
+    "url",
+    "description",
+    "salary",
+    "work_format",
+    "contact",
+    "desc200",
+    "contact_norm",
+    "dedup_hash",
+    "linkedin_job_id",
+    "posted_at",
+    "promoted",
+    "minhash",
+)
+
+# Колонки уникального ключа: по ним ищется конфликт при upsert.
+# dedup_hash — 16-байтный md5 от (desc200, contact_norm): индекс по нему в разы меньше
+# индекса по самим строкам, и сравнение при upsert — по фиксированным 16 байтам
+CONFLICT_COLUMNS = ("source", "dedup_hash")
+
+# INSERT с ON CONFLICT UPDATE; {values} — одна строка "(%s, ...)" или "%s" для execute_values
+INSERT_SQL = (
+    "INSERT INTO table_1_linkedin_parser (" + ", ".join(INSERT_COLUMNS) + ") VALUES {values} "
+    "ON CONFLICT (" + ", ".join(CONFLICT_COLUMNS) + ") "
+    "DO UPDATE SET updated_at = NOW(), "
+    "linkedin_job_id = COALESCE(table_1_linkedin_parser.linkedin_job_id, EXCLUDED.linkedin_job_id), "
+    "company = COALESCE(NULLIF(table_1_linkedin_parser.company, ''), EXCLUDED.company), "
+    "posted_at = COALESCE(table_1_linkedin_parser.posted_at, EXCLUDED.posted_at), "
+    "minhash = COALESCE(table_1_linkedin_parser.minhash, EXCLUDED.minhash)"
+)
+
+
+def job_to_row(job: Job, job_url: str) -> tuple:
+    """Строка для INSERT_COLUMNS из вакансии."""
+    # Вычисляем контакт для дедупликации (email → linkedin → job_url)
+    key_contact = job.hr_email or job.hr_linkedin or job.job_url
+    desc200, contact_norm = dedup_key(job.description, key_contact)
+
+    # Человекочитаемый контакт: email | linkedin | url (то, что увидим в БД)
+    contact = " | ".join(
+        [c for c in [job.hr_email, job.hr_linkedin, job.job_url] if c]
+    )
+
+    # Сигнатура для поиска почти-дубликатов (NULL у слишком коротких описаний)
+    minhash = get_hasher().signature_bytes(job.description)
+
+    return (
+        job.source,
+        job.title,
+        job.company,
+        job.location,
+        job_url,
+        job.description,
+        job.salary,
+        job.work_format,
+        contact,
+        desc200,
+        contact_norm,
+        key_digest(desc200, contact_norm),
+        job.linkedin_job_id or job_id_from_url(job_url),
+        job.posted_at,
+        job.promoted,
+        psycopg2.Binary(minhash) if minhash else None,
+    )
+
+
 class PostgresStorage:
     """Класс для работы с PostgreSQL. Управляет одним соединением."""
 
-    def __init__(self, database_url: str):
+    def __init__(self, database_url: str, migrate: bool = True):
         self.database_url = database_url
+        # Создание таблицы и миграции — только у основного соединения, не у BackgroundWriter
+        self.migrate = migrate
         self.conn: Optional[psycopg2.extensions.connection] = None
         self.cursor: Optional[psycopg2.extensions.cursor] = None
         self.batch_size = 10  # Размер пачки для коммита
@@ -31,11 +107,18 @@ class PostgresStorage:
         if self.conn is None or self.conn.closed:
             self.conn = psycopg2.connect(self.database_url)
             self.cursor = self.conn.cursor()
-            self._init_table()
+            if self.migrate:
+                self._init_table()
             print("[+] Подключено к PostgreSQL")
 
     def _init_table(self) -> None:
-        """Создаёт таблицу table_1_linkedin_parser, если её ещё нет."""
+        """
+        Создаёт таблицу table_1_linkedin_parser, если её ещё нет, и доводит старые таблицы
+        до текущей схемы. Каждый шаг миграции сначала проверяется по каталогу (колонки,
+        индексы), так что на актуальной схеме подключение не сканирует таблицу и не берёт
+        блокировок ALTER TABLE. IF NOT EXISTS остаётся на случай одновременного первого
+        запуска нескольких шардов.
+        """
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS table_1_linkedin_parser (
                 id SERIAL PRIMARY KEY,
@@ -48,15 +131,130 @@ class PostgresStorage:
                 salary TEXT,
                 work_format TEXT,
                 contact TEXT,
+                linkedin_job_id BIGINT,
+                posted_at DATE,
+                promoted BOOLEAN NOT NULL DEFAULT FALSE,
+                minhash BYTEA,
                 desc200 VARCHAR(200) NOT NULL,
                 contact_norm VARCHAR(512) NOT NULL,
+                dedup_hash BYTEA NOT NULL,
                 created_at TIMESTAMPTZ DEFAULT NOW(),
                 updated_at TIMESTAMPTZ DEFAULT NOW(),
-                UNIQUE (source, desc200, contact_norm)
+                UNIQUE (source, dedup_hash)
             )
         """)
+        columns = self._table_columns()
+        indexes = self._table_indexes()
+        self._migrate_dedup_hash(columns, indexes)
+        self._migrate_job_id(columns, indexes)
+        self._migrate_card_columns(columns)
+        if "minhash" not in columns:
+            self.cursor.execute("ALTER TABLE table_1_linkedin_parser ADD COLUMN IF NOT EXISTS minhash BYTEA")
+        if "table_1_linkedin_parser_created_at_id_idx" not in indexes:
+            # Keyset-пагинация scripts/view_vacancies.py: ORDER BY created_at DESC, id DESC без сортировки
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS table_1_linkedin_parser_created_at_id_idx
+                ON table_1_linkedin_parser (created_at, id)
+            """)
+        self._init_recruiter_cache()
         self.conn.commit()
 
+    def _table_columns(self) -> Dict[str, bool]:
+        """Колонки таблицы вакансий: имя -> NOT NULL."""
+        self.cursor.execute("""
+            SELECT attname, attnotnull FROM pg_attribute
+            WHERE attrelid = 'table_1_linkedin_parser'::regclass AND attnum > 0 AND NOT attisdropped
+        """)
+        return dict(self.cursor.fetchall())
+
+    def _table_indexes(self) -> Set[str]:
+        """Имена индексов таблицы вакансий (включая индексы ограничений UNIQUE)."""
+        self.cursor.execute("""
+            SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = 'table_1_linkedin_parser'::regclass
+        """)
+        return {name for (name,) in self.cursor.fetchall()}
+
+    def _migrate_dedup_hash(self, columns: Dict[str, bool], indexes: Set[str]) -> None:
+        """
+        Переводит старые таблицы с UNIQUE (source, desc200, contact_norm) на UNIQUE (source, dedup_hash):
+        добавляет и заполняет dedup_hash тем же md5, что key_digest, и удаляет прежнее ограничение.
+        Таблица с dedup_hash NOT NULL уже переведена (миграция идёт в одной транзакции).
+        """
+        if columns.get("dedup_hash"):
+            if "table_1_linkedin_parser_source_dedup_hash_key" not in indexes:
+                self._create_dedup_hash_index()
+            return
+
+        if "dedup_hash" not in columns:
+            self.cursor.execute("ALTER TABLE table_1_linkedin_parser ADD COLUMN IF NOT EXISTS dedup_hash BYTEA")
+        self.cursor.execute("""
+            UPDATE table_1_linkedin_parser
+            SET dedup_hash = decode(md5(desc200 || E'\\x1f' || contact_norm), 'hex')
+            WHERE dedup_hash IS NULL
+        """)
+        if self.cursor.rowcount:
+            print(f"[+] dedup_hash заполнен для {self.cursor.rowcount} строк")
+        self.cursor.execute("ALTER TABLE table_1_linkedin_parser ALTER COLUMN dedup_hash SET NOT NULL")
+        if "table_1_linkedin_parser_source_dedup_hash_key" not in indexes:
+            self._create_dedup_hash_index()
+        # Имя прежнего ограничения сгенерировано PostgreSQL, ищем его по колонкам
+        self.cursor.execute("""
+            SELECT c.conname
+            FROM pg_constraint c
+            WHERE c.conrelid = 'table_1_linkedin_parser'::regclass AND c.contype = 'u'
+              AND (
+                SELECT array_agg(a.attname::text ORDER BY a.attname)
+                FROM pg_attribute a
+                WHERE a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+              ) = ARRAY['contact_norm', 'desc200', 'source']
+        """)
+        for (name,) in self.cursor.fetchall():
+            self.cursor.execute(f'ALTER TABLE table_1_linkedin_parser DROP CONSTRAINT "{name}"')
+            print(f"[+] Удалено ограничение {name}: уникальность теперь по (source, dedup_hash)")
+
+    def _create_dedup_hash_index(self) -> None:
+        self.cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS table_1_linkedin_parser_source_dedup_hash_key
+            ON table_1_linkedin_parser (source, dedup_hash)
+        """)
+
+    def _migrate_job_id(self, columns: Dict[str, bool], indexes: Set[str]) -> None:
+        """Добавляет индексированный linkedin_job_id в старые таблицы и один раз заполняет его из url."""
+        if "linkedin_job_id" not in columns:
+            self.cursor.execute("ALTER TABLE table_1_linkedin_parser ADD COLUMN IF NOT EXISTS linkedin_job_id BIGINT")
+            self.cursor.execute("""
+                UPDATE table_1_linkedin_parser
+                SET linkedin_job_id = substring(url from '/jobs/view/(?:[^/?#]*-)?([0-9]+)')::BIGINT
+                WHERE url ~ '/jobs/view/(?:[^/?#]*-)?[0-9]+'
+            """)
+        if "table_1_linkedin_parser_job_id_idx" not in indexes:
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS table_1_linkedin_parser_job_id_idx
+                ON table_1_linkedin_parser (linkedin_job_id)
+            """)
+
+    def _migrate_card_columns(self, columns: Dict[str, bool]) -> None:
+        """Колонки данных из карточки поиска для таблиц, созданных до их появления."""
+        if "posted_at" not in columns:
+            self.cursor.execute("ALTER TABLE table_1_linkedin_parser ADD COLUMN IF NOT EXISTS posted_at DATE")
+        if "promoted" not in columns:
+            self.cursor.execute(
+                "ALTER TABLE table_1_linkedin_parser ADD COLUMN IF NOT EXISTS promoted BOOLEAN NOT NULL DEFAULT FALSE"
+            )
+
+    def _init_recruiter_cache(self) -> None:
+        """Таблица кэша контактов рекрутеров (в т.ч. отрицательных: контактов нет)."""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS linkedin_recruiter_contacts (
+                profile_url TEXT PRIMARY KEY,
+                email TEXT NOT NULL DEFAULT '',
+                raw TEXT NOT NULL DEFAULT '',
+                has_contact BOOLEAN NOT NULL,
+                fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+
     def close(self) -> None:
         """Закрывает соединение с базой данных."""
         if self.cursor:
@@ -80,7 +278,7 @@ class PostgresStorage:
         """
         Сохраняет или обновляет вакансию в базе данных.
 
-        При конфликте по уникальному индексу (source, desc200, contact_norm)
+        При конфликте по уникальному индексу (source, dedup_hash)
         обновляет только updated_at.
 
         Args:
@@ -89,55 +287,153 @@ class PostgresStorage:
         """
         self._ensure_connected()
 
-        # Вычисляем контакт для дедупликации (email → linkedin → job_url)
-        key_contact = job.hr_email or job.hr_linkedin or job.job_url
-        desc200, contact_norm = dedup_key(job.description, key_contact)
+        try:
+            with get_metrics().stage("db_save"):
+                self.cursor.execute(
+                    INSERT_SQL.format(values="(" + ", ".join(["%s"] * len(INSERT_COLUMNS)) + ")"),
+                    job_to_row(job, job_url),
+                )
 
-        # Извлекаем company из contact или оставляем пустым
-        company = ""  # Можно расширить логику извлечения компании позже
+            self.batch_count += 1
 
-        # Человекочитаемый контакт: email | linkedin | url (то, что увидим в БД)
-        contact = " | ".join(
-            [c for c in [job.hr_email, job.hr_linkedin, job.job_url] if c]
+            # Делаем commit после каждой пачки
+            if self.batch_count >= self.batch_size:
+                self.commit()
+                print(f"[+] Сохранено {self.batch_size} вакансий в БД (commit)")
+
+        except psycopg2.Error as e:
+            print(f"[-] Ошибка при сохранении вакансии: {e}")
+            self.conn.rollback()
+            raise
+
+    def known_job_ids(self, job_ids: Iterable[int]) -> Set[int]:
+        """Возвращает те ID вакансий LinkedIn из списка, которые уже есть в таблице."""
+        ids = list({i for i in job_ids if i is not None})
+        if not ids:
+            return set()
+        self._ensure_connected()
+        self.cursor.execute(
+            "SELECT DISTINCT linkedin_job_id FROM table_1_linkedin_parser WHERE linkedin_job_id = ANY(%s)",
+            (ids,),
         )
+        return {row[0] for row in self.cursor.fetchall()}
 
-        # SQL для INSERT с ON CONFLICT UPDATE
-        insert_sql = """
-            INSERT INTO table_1_linkedin_parser (
-                source, title, company, location, url, description, 
-                salary, work_format, contact, desc200, contact_norm
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (source, desc200, contact_norm)
-            DO UPDATE SET updated_at = NOW()
+    def iter_minhashes(self, batch_size: int = 5000) -> Iterator[Tuple[Optional[int], str, bytes]]:
+        """
+        Сигнатуры MinHash всех вакансий: (linkedin_job_id, url, minhash).
+        Читается серверным курсором пачками, чтобы не держать в памяти всю выборку.
         """
+        self._ensure_connected()
+        with self.conn.cursor(name="minhash_scan") as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                "SELECT linkedin_job_id, url, minhash FROM table_1_linkedin_parser "
+                "WHERE minhash IS NOT NULL ORDER BY id"
+            )
+            for job_id, url, data in cur:
+                yield job_id, url, bytes(data)
+        self.conn.commit()
 
+    def dedup_table_stats(self) -> Tuple[int, int]:
+        """(max(id), оценка числа строк по статистике планировщика) — без полного сканирования."""
+        self._ensure_connected()
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM table_1_linkedin_parser")
+        max_id = self.cursor.fetchone()[0]
+        self.cursor.execute("SELECT reltuples::BIGINT FROM pg_class WHERE oid = 'table_1_linkedin_parser'::regclass")
+        rows = self.cursor.fetchone()[0]
+        return max_id, max(0, rows)
+
+    def iter_dedup_hashes(self, after_id: int = 0, batch_size: int = 20000) -> Iterator[Tuple[int, bytes]]:
+        """(id, dedup_hash) строк с id > after_id по возрастанию id, серверным курсором."""
+        self._ensure_connected()
+        with self.conn.cursor(name="dedup_hash_scan") as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                "SELECT id, dedup_hash FROM table_1_linkedin_parser WHERE id > %s ORDER BY id",
+                (after_id,),
+            )
+            for row_id, key in cur:
+                yield row_id, bytes(key)
+        self.conn.commit()
+
+    def touch_dedup_hash(self, source: str, key: bytes) -> bool:
+        """
+        Точная проверка ключа по уникальному индексу (source, dedup_hash): если вакансия
+        есть, обновляет ей updated_at (как upsert при конфликте) и возвращает True.
+        """
+        self._ensure_connected()
         try:
             self.cursor.execute(
-                insert_sql,
-                (
-                    job.source,
-                    job.title,
-                    company,
-                    job.location,
-                    job_url,
-                    job.description,
-                    job.salary,
-                    job.work_format,
-                    contact,
-                    desc200,
-                    contact_norm,
-                ),
+                "UPDATE table_1_linkedin_parser SET updated_at = NOW() WHERE source = %s AND dedup_hash = %s",
+                (source, key),
             )
+            found = self.cursor.rowcount > 0
+            self.commit()
+        except psycopg2.Error as e:
+            print(f"[-] Ошибка при проверке ключа дедупликации: {e}")
+            self.conn.rollback()
+            return False
+        return found
+
+    def touch_job_ids(self, job_ids: Iterable[int]) -> int:
+        """Одним запросом обновляет updated_at у уже известных вакансий. Возвращает число строк."""
+        ids = list({i for i in job_ids if i is not None})
+        if not ids:
+            return 0
+        self._ensure_connected()
+        try:
+            self.cursor.execute(
+                "UPDATE table_1_linkedin_parser SET updated_at = NOW() WHERE linkedin_job_id = ANY(%s)",
+                (ids,),
+            )
+            touched = self.cursor.rowcount
+            self.commit()
+        except psycopg2.Error as e:
+            print(f"[-] Ошибка при обновлении updated_at: {e}")
+            self.conn.rollback()
+            raise
+        return touched
 
-            self.batch_count += 1
+    def get_recruiter_contact(self, profile_url: str, ttl_hours: float, negative_ttl_hours: float) -> Optional[dict]:
+        """
+        Возвращает закэшированные контакты рекрутера, если запись не устарела.
 
-            # Делаем commit после каждой пачки
-            if self.batch_count >= self.batch_size:
-                self.commit()
-                print(f"[+] Сохранено {self.batch_size} вакансий в БД (commit)")
+        Для записей без контактов действует свой (обычно более короткий) TTL.
+        fetched_at — время получения контактов (unix time), по нему считается TTL в памяти процесса.
+        """
+        self._ensure_connected()
+        self.cursor.execute(
+            """
+            SELECT email, raw, EXTRACT(EPOCH FROM fetched_at) FROM linkedin_recruiter_contacts
+            WHERE profile_url = %s
+              AND fetched_at > NOW() - (CASE WHEN has_contact THEN %s ELSE %s END) * INTERVAL '1 hour'
+            """,
+            (profile_url, ttl_hours, negative_ttl_hours),
+        )
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        return {"public_profile_url": profile_url, "email": row[0], "raw": row[1], "fetched_at": float(row[2])}
 
+    def put_recruiter_contact(self, info: dict) -> None:
+        """Сохраняет контакты рекрутера (или их отсутствие) в кэш."""
+        self._ensure_connected()
+        email = info.get("email") or ""
+        raw = info.get("raw") or ""
+        try:
+            self.cursor.execute(
+                """
+                INSERT INTO linkedin_recruiter_contacts (profile_url, email, raw, has_contact, fetched_at)
+                VALUES (%s, %s, %s, %s, NOW())
+                ON CONFLICT (profile_url)
+                DO UPDATE SET email = EXCLUDED.email, raw = EXCLUDED.raw,
+                              has_contact = EXCLUDED.has_contact, fetched_at = NOW()
+                """,
+                (info["public_profile_url"], email, raw, bool(email or raw)),
+            )
+            self.commit()
         except psycopg2.Error as e:
-            print(f"[-] Ошибка при сохранении вакансии: {e}")
+            print(f"[-] Ошибка при сохранении контакта рекрутера: {e}")
             self.conn.rollback()
             raise
 
@@ -151,6 +447,7 @@ class PostgresStorage:
 
 # Глобальный экземпляр хранилища
 _storage_instance: Optional[PostgresStorage] = None
+_writer_instance = None
 
 
 def get_storage() -> PostgresStorage:
@@ -162,24 +459,38 @@ def get_storage() -> PostgresStorage:
     return _storage_instance
 
 
+def get_writer():
+    """Возвращает глобальный фоновый писатель вакансий (создаётся при первой записи)."""
+    global _writer_instance
+    if _writer_instance is None:
+        from app.storage.writer import BackgroundWriter
+
+        _writer_instance = BackgroundWriter(DATABASE_URL)
+    return _writer_instance
+
+
 def save_or_update(job: Job, job_url: str) -> None:
     """
     Удобная функция для сохранения или обновления вакансии.
 
-    Использует глобальный экземпляр хранилища.
+    Ставит вакансию в очередь фонового писателя: запись идёт пачками
+    в отдельном потоке и не задерживает браузер.
 
     Args:
         job: Объект Job с данными вакансии
         job_url: URL вакансии
     """
-    storage = get_storage()
-    storage.save_or_update(job, job_url)
+    # Время постановки в очередь: растёт, только если писатель не успевает за браузером
+    with get_metrics().stage("db_enqueue"):
+        get_writer().put(job, job_url)
 
 
 def close_storage() -> None:
-    """Закрывает глобальное соединение с БД."""
-    global _storage_instance
+    """Дописывает очередь фонового писателя и закрывает глобальное соединение с БД."""
+    global _storage_instance, _writer_instance
+    if _writer_instance:
+        _writer_instance.close()
+        _writer_instance = None
     if _storage_instance:
         _storage_instance.finalize()
         _storage_instance = None
-
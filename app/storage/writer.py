@@ -0,0 +1,270 @@
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from app.config import (
+    WRITER_BATCH_SIZE,
+    WRITER_QUEUE_SIZE,
+    WRITER_FLUSH_INTERVAL_SEC,
+    WRITER_RECONNECT_ATTEMPTS,
+    WRITER_SPILL_PATH,
+)
+from app.metrics import get_metrics
+from app.models import Job
+from app.output.ndjson_writer import NdjsonWriter, compression_for, iter_ndjson
+from app.storage.postgres import CONFLICT_COLUMNS, INSERT_COLUMNS, INSERT_SQL, PostgresStorage, job_to_row
+
+# Маркер остановки фонового потока
+_STOP = object()
+
+# Элемент очереди: строка для INSERT_COLUMNS и вакансия (для spill-файла, если строка не запишется)
+_Item = Tuple[tuple, Job]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class BackgroundWriter:
+    """
+    Фоновая запись вакансий в PostgreSQL.
+
+    Строки копятся в ограниченной очереди и сбрасываются отдельным потоком
+    со своим соединением: пачкой через execute_values, по достижении
+    batch_size или раз в flush_interval_sec. Если пачка не записалась,
+    строки повторяются по одной, так что плохая строка не тянет за собой остальные.
+
+    put() вызывается из event loop и никогда не ждёт: если очередь заполнена
+    (БД тормозит или недоступна), вакансия отбрасывается и учитывается в
+    счётчике writer_rows_dropped, а вкладки продолжают работу. Так же учитываются
+    пачки, не записанные после WRITER_RECONNECT_ATTEMPTS переподключений.
+    Отброшенные вакансии дописываются в spill_path (NDJSON) для replay_spill().
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        batch_size: int = WRITER_BATCH_SIZE,
+        queue_size: int = WRITER_QUEUE_SIZE,
+        flush_interval_sec: float = WRITER_FLUSH_INTERVAL_SEC,
+        spill_path: Optional[str] = WRITER_SPILL_PATH,
+    ):
+        # Своё соединение без миграций: схему готовит основное соединение (get_storage)
+        self.storage = PostgresStorage(database_url, migrate=False)
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self.spill_path = spill_path
+        # Пишут и event loop (переполнение очереди), и поток записи (БД недоступна)
+        self._spill: Optional[NdjsonWriter] = None
+        self._spill_lock = threading.Lock()
+
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.rows_dropped = 0
+        self.rows_spilled = 0
+        self.batches = 0
+        self.batch_fallbacks = 0
+        self.max_queue_depth = 0
+        self._flush_ms: deque = deque(maxlen=1000)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pg-writer", daemon=True)
+            self._thread.start()
+
+    def put(self, job: Job, job_url: str) -> None:
+        """Ставит вакансию в очередь записи без ожидания; при заполненной очереди — отбрасывает."""
+        self.start()
+        try:
+            self._queue.put_nowait((job_to_row(job, job_url), job))
+        except queue.Full:
+            self._drop([job], "queue_full")
+            return
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    def _drop(self, jobs: List[Job], reason: str) -> None:
+        """Учитывает вакансии, не попавшие в БД, и дописывает их в spill-файл."""
+        metrics = get_metrics()
+        self.rows_dropped += len(jobs)
+        metrics.inc("writer_rows_dropped", len(jobs), reason=reason)
+        if not self.spill_path:
+            print(f"[-] Writer: потеряно {len(jobs)} вакансий ({reason})")
+            return
+        try:
+            with self._spill_lock:
+                if self._spill is None:
+                    self._spill = NdjsonWriter(self.spill_path, append=True)
+                for job in jobs:
+                    self._spill.write(job)
+                self._spill.sync()
+        except OSError as e:
+            print(f"[-] Writer: потеряно {len(jobs)} вакансий ({reason}), spill-файл недоступен: {e}")
+            return
+        self.rows_spilled += len(jobs)
+        metrics.inc("writer_rows_spilled", len(jobs))
+        print(f"[-] Writer: {len(jobs)} вакансий ({reason}) отложены в {self.spill_path}")
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        batch: List[_Item] = []
+        deadline = time.monotonic() + self.flush_interval_sec
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                self.storage.close()
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval_sec
+
+    def _connect(self) -> bool:
+        for attempt in range(WRITER_RECONNECT_ATTEMPTS):
+            try:
+                self.storage._ensure_connected()
+                return True
+            except psycopg2.Error as e:
+                print(f"[-] Writer: нет соединения с БД ({e}), попытка {attempt + 1}")
+                time.sleep(2 ** attempt)
+        return False
+
+    def _flush(self, items: List[_Item]) -> None:
+        if not items:
+            return
+        # В одном INSERT ... ON CONFLICT DO UPDATE строка не может встретиться дважды
+        key_idx = [INSERT_COLUMNS.index(c) for c in CONFLICT_COLUMNS]
+        unique = {tuple(row[i] for i in key_idx): (row, job) for row, job in items}
+        items = list(unique.values())
+        rows = [row for row, _ in items]
+
+        started = time.monotonic()
+        if not self._connect():
+            self._drop([job for _, job in items], "db_unavailable")
+            return
+
+        conn, cur = self.storage.conn, self.storage.cursor
+        try:
+            execute_values(cur, INSERT_SQL.format(values="%s"), rows, page_size=len(rows))
+            conn.commit()
+            self.rows_written += len(rows)
+            get_metrics().inc("db_rows", len(rows), outcome="written")
+        except Exception as e:
+            # psycopg2.Error или ValueError на этапе mogrify (например, NUL в строке)
+            if not conn.closed:
+                conn.rollback()
+            self.batch_fallbacks += 1
+            print(f"[-] Writer: пачка из {len(rows)} не записалась ({e}), пишем по одной")
+            self._flush_one_by_one(items)
+
+        self.batches += 1
+        elapsed = time.monotonic() - started
+        self._flush_ms.append(elapsed * 1000)
+        get_metrics().observe("db_flush", elapsed)
+
+    def _flush_one_by_one(self, items: List[_Item]) -> None:
+        if not self._connect():
+            self._drop([job for _, job in items], "db_unavailable")
+            return
+        conn, cur = self.storage.conn, self.storage.cursor
+        single_sql = INSERT_SQL.format(values="(" + ", ".join(["%s"] * len(INSERT_COLUMNS)) + ")")
+        for row, _ in items:
+            try:
+                cur.execute(single_sql, row)
+                conn.commit()
+                self.rows_written += 1
+                get_metrics().inc("db_rows", outcome="written")
+            except Exception as e:
+                if not conn.closed:
+                    conn.rollback()
+                self.rows_failed += 1
+                get_metrics().inc("db_rows", outcome="failed")
+                print(f"[-] Writer: не удалось сохранить вакансию {row[INSERT_COLUMNS.index('url')]}: {e}")
+
+    def metrics(self) -> dict:
+        flush_ms = list(self._flush_ms)
+        return {
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "rows_dropped": self.rows_dropped,
+            "rows_spilled": self.rows_spilled,
+            "batches": self.batches,
+            "batch_fallbacks": self.batch_fallbacks,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "flush_ms_p50": round(_percentile(flush_ms, 0.5), 1),
+            "flush_ms_p95": round(_percentile(flush_ms, 0.95), 1),
+            "flush_ms_max": round(max(flush_ms), 1) if flush_ms else 0.0,
+        }
+
+    def replay_spill(self) -> int:
+        """
+        Дописывает в БД вакансии из spill-файла прошлых прогонов. Файл переименовывается
+        перед чтением: то, что снова не запишется, попадёт в новый spill-файл.
+        Возвращает число прочитанных вакансий.
+        """
+        if not self.spill_path or not Path(self.spill_path).exists():
+            return 0
+        path = Path(self.spill_path)
+        replaying = path.with_name(path.name + ".replay")
+        path.replace(replaying)
+        total = 0
+        batch: List[_Item] = []
+        for record in iter_ndjson(replaying, compression_for(path)):
+            job = Job(**record)
+            batch.append((job_to_row(job, job.job_url), job))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                total += len(batch)
+                batch = []
+        self._flush(batch)
+        total += len(batch)
+        replaying.unlink()
+        self.storage.close()
+        return total
+
+    def _close_spill(self) -> None:
+        with self._spill_lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+    def close(self) -> None:
+        """Дописывает всё из очереди и останавливает поток."""
+        if self._thread is None:
+            self._close_spill()
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._close_spill()
+        m = self.metrics()
+        print(
+            f"[+] Writer: записано {m['rows_written']}, ошибок {m['rows_failed']}, отброшено {m['rows_dropped']} "
+            f"(в spill {m['rows_spilled']}), "
+            f"пачек {m['batches']}, "
+            f"flush p50 {m['flush_ms_p50']} ms / p95 {m['flush_ms_p95']} ms, max очередь {m['max_queue_depth']}"
+        )
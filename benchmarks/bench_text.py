@@ -0,0 +1,228 @@
+"""
+Микро-бенчмарки текстовых функций (нормализация, разбор описания, дедуп, фильтр по роли, MinHash).
+
+Запуск из корня проекта:
+    python benchmarks/bench_text.py                      # замер и сравнение с baseline.json
+    python benchmarks/bench_text.py --update-baseline    # перезаписать baseline.json
+    python benchmarks/bench_text.py --only work_format   # только выбранные замеры
+
+Для каждой функции печатается время одного вызова (медиана по повторам) и пропускная
+способность. Если функция стала медленнее baseline больше чем в --tolerance раз,
+скрипт завершается с кодом 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+# Добавляем корень проекта в путь
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import ROLE_KEYWORDS
+from app.dedupe.key import dedup_digest, dedup_key
+from app.dedupe.minhash import MinHasher, NearDupIndex
+from app.linkedin.classify import get_classifier
+from app.linkedin.parse import (
+    description_from_page_text,
+    extract_between,
+    extract_work_format,
+    matches_role,
+)
+from app.normalize import clean_description, extract_email, normalize_text
+
+from benchmarks import legacy
+from benchmarks.corpus import descriptions, page_texts, titled_jobs
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+_START = ["Об этой вакансии", "About this job"]
+_END = ["О компании", "About the company", "© LinkedIn", "Похожие вакансии", "Similar jobs"]
+
+
+def _format_and_role(title: str, description: str, role: str) -> bool:
+    get_classifier().classify(title, description)
+    return matches_role(title, description, role)
+
+
+def _format_and_role_legacy(title: str, description: str, keywords: List[str]) -> bool:
+    legacy.extract_work_format(description)
+    return legacy.matches_role(title, description, keywords)
+
+
+# Размер индекса почти-дубликатов для замера поиска (как у таблицы за долгое время)
+NEAR_DUP_INDEX_SIZE = 100_000
+
+
+def _near_dup_index(hasher: MinHasher, size: int, seed: int = 7) -> NearDupIndex:
+    """Индекс из size случайных сигнатур: время поиска в LSH не зависит от содержимого записей."""
+    rnd = random.Random(seed)
+    index = NearDupIndex(hasher)
+    for i in range(size):
+        sig = hasher.from_bytes(rnd.randbytes(hasher.num_perm * 4))
+        index.add(i, sig)
+    return index
+
+
+def _cases(corpus_size: int) -> Dict[str, tuple]:
+    """Имя замера -> (функция, список аргументов для вызовов[, документов на вызов])."""
+    descs = descriptions(corpus_size)
+    pages = page_texts(corpus_size)
+    jobs = titled_jobs(corpus_size)
+    roles = list(ROLE_KEYWORDS)
+    role_args = [(t, d, roles[i % len(roles)]) for i, (t, d) in enumerate(jobs)]
+    legacy_role_args = [(t, d, ROLE_KEYWORDS[r]) for t, d, r in role_args]
+    classifier = get_classifier()
+    hasher = MinHasher()
+    index = _near_dup_index(hasher, NEAR_DUP_INDEX_SIZE)
+    signatures = [s for s in (hasher.signature(d) for d in descs) if s is not None]
+    return {
+        "normalize_text": (normalize_text, [(d,) for d in descs]),
+        "clean_description": (clean_description, [(p,) for p in pages]),
+        "extract_email": (extract_email, [(d,) for d in descs]),
+        "extract_between": (extract_between, [(p, _START, _END) for p in pages]),
+        "description_from_page_text": (description_from_page_text, [(p,) for p in pages]),
+        "work_format": (extract_work_format, [(d,) for d in descs]),
+        "work_format_legacy": (legacy.extract_work_format, [(d,) for d in descs]),
+        "dedup_key": (dedup_key, [(d, "hr@example.kz") for d in descs]),
+        "dedup_digest": (dedup_digest, [(d, "hr@example.kz") for d in descs]),
+        "role_filter": (matches_role, role_args),
+        "role_filter_legacy": (legacy.matches_role, legacy_role_args),
+        "classify": (classifier.classify, jobs),
+        # Пакет на весь корпус, как в офлайн-переобработке (python -m app.offline)
+        "classify_many": (classifier.classify_many, [(jobs,)], len(jobs)),
+        # Как в runner: формат работы в build_job, затем фильтр роли по той же вакансии
+        "format_and_role": (_format_and_role, role_args),
+        "format_and_role_legacy": (_format_and_role_legacy, legacy_role_args),
+        "minhash_signature": (hasher.signature, [(d,) for d in descs]),
+        # Поиск по индексу из NEAR_DUP_INDEX_SIZE сигнатур
+        "near_dup_query": (index.query, [(s,) for s in signatures]),
+    }
+
+
+def _measure(fn: Callable, args: List[tuple], repeats: int, docs_per_call: int = 1) -> List[float]:
+    """Прогоняет fn по всему корпусу repeats раз; возвращает мкс на документ для каждого прогона."""
+    for a in args[:20]:  # прогрев: компиляция regex, кэши
+        fn(*a)
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for a in args:
+            fn(*a)
+        samples.append((time.perf_counter() - started) * 1e6 / (len(args) * docs_per_call))
+    return samples
+
+
+def check_agreement(corpus_size: int) -> List[str]:
+    """Расхождения классификатора с прежними функциями на корпусе (ожидаемы только из-за границ слов)."""
+    diffs = []
+    for d in descriptions(corpus_size):
+        old, new = legacy.extract_work_format(d), extract_work_format(d)
+        if old != new:
+            diffs.append(f"work_format {old!r} -> {new!r}: {d[:60]!r}")
+    for t, d in titled_jobs(corpus_size):
+        for role, keywords in ROLE_KEYWORDS.items():
+            old, new = legacy.matches_role(t, d, keywords), matches_role(t, d, role)
+            if old != new:
+                diffs.append(f"role {role!r} {old} -> {new}: {t!r}")
+    return sorted(set(diffs))
+
+
+def run_benchmarks(corpus_size: int, repeats: int, only: List[str]) -> Dict[str, dict]:
+    results = {}
+    for name, (fn, args, *docs_per_call) in _cases(corpus_size).items():
+        if only and name not in only:
+            continue
+        samples = _measure(fn, args, repeats, *docs_per_call)
+        us = statistics.median(samples)
+        results[name] = {
+            "us_per_call": round(us, 3),
+            "calls_per_sec": int(1e6 / us) if us else 0,
+            "spread_pct": round((max(samples) - min(samples)) / us * 100, 1) if us else 0.0,
+        }
+    return results
+
+
+def _load_baseline() -> dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _print_report(results: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """Печатает таблицу и возвращает имена замеров с регрессией."""
+    base = baseline.get("results", {})
+    regressions = []
+    print(f"{'benchmark':<28} {'us/call':>10} {'calls/s':>12} {'spread':>8} {'baseline':>10} {'ratio':>7}")
+    for name, r in results.items():
+        b = base.get(name, {}).get("us_per_call")
+        ratio = r["us_per_call"] / b if b else None
+        mark = ""
+        if ratio is not None and ratio > tolerance:
+            regressions.append(name)
+            mark = "  <-- регрессия"
+        print(
+            f"{name:<28} {r['us_per_call']:>10.2f} {r['calls_per_sec']:>12} {r['spread_pct']:>7}% "
+            f"{(f'{b:.2f}' if b else '-'):>10} {(f'{ratio:.2f}x' if ratio else '-'):>7}{mark}"
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Микро-бенчмарки текстовых функций")
+    parser.add_argument("--corpus-size", type=int, default=400, help="Число текстов в корпусе")
+    parser.add_argument("--repeats", type=int, default=7, help="Сколько раз прогонять корпус")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Допустимое замедление относительно baseline (раз)")
+    parser.add_argument("--only", nargs="*", default=[], help="Запустить только указанные замеры")
+    parser.add_argument("--update-baseline", action="store_true", help="Сохранить результаты как новый baseline")
+    parser.add_argument("--check", action="store_true", help="Показать расхождения классификатора с прежними функциями")
+    args = parser.parse_args()
+
+    if args.check:
+        diffs = check_agreement(args.corpus_size)
+        print(f"[=] Расхождений с прежними функциями: {len(diffs)}")
+        for line in diffs:
+            print(f"    {line}")
+
+    results = run_benchmarks(args.corpus_size, args.repeats, args.only)
+
+    if args.update_baseline:
+        baseline = _load_baseline()
+        merged = {**baseline.get("results", {}), **results}
+        with open(BASELINE_PATH, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "corpus_size": args.corpus_size,
+                    "results": merged,
+                },
+                fh,
+                ensure_ascii=False,
+                indent=2,
+            )
+            fh.write("\n")
+        _print_report(results, {}, args.tolerance)
+        print(f"[+] Baseline сохранён: {BASELINE_PATH}")
+        return 0
+
+    baseline = _load_baseline()
+    if not baseline:
+        print("[!] baseline.json не найден — сравнивать не с чем (запустите с --update-baseline)")
+    elif baseline.get("corpus_size") != args.corpus_size:
+        print(f"[!] Baseline снят на корпусе {baseline.get('corpus_size')}, сейчас {args.corpus_size}")
+
+    regressions = _print_report(results, baseline, args.tolerance)
+    if regressions:
+        print(f"[-] Регрессия (> {args.tolerance}x baseline): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
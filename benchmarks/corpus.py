@@ -0,0 +1,190 @@
+"""
+Фикстурный корпус для бенчмарков: реалистичные описания вакансий RU/EN.
+
+Корпус детерминирован (фиксированный seed), чтобы цифры были сравнимы между запусками.
+"""
+import random
+from typing import List, Tuple
+
+_BASE_DESCRIPTIONS = [
+    # EN, QA, hybrid
+    """About the role
+We are looking for a QA Automation Engineer to join our payments team in Almaty. You will design and maintain automated test suites for web and mobile applications, work closely with developers and product managers, and help us ship reliable releases every two weeks.
+
+Responsibilities
+• Develop and maintain UI and API autotests (Python, pytest, Playwright)
+• Review requirements and write test plans and test cases
+• Integrate tests into CI/CD pipelines (GitLab CI)
+• Investigate production incidents and reproduce bugs
+
+Requirements
+• 3+ years of experience in QA, at least 1 year in test automation
+• Good knowledge of SQL and REST
+• English at B1 level or higher
+
+We offer
+• Hybrid work format: 2 days in the office, 3 days from home
+• Medical insurance, education budget
+Send your CV to careers@paytech.kz""",
+    # RU, Frontend, remote
+    """Мы — продуктовая IT-компания, разрабатываем платформу для онлайн-обучения. Ищем Frontend-разработчика в команду личного кабинета.
+
+Задачи:
+— разработка новых интерфейсов на React + TypeScript;
+— поддержка дизайн-системы и библиотеки компонентов;
+— оптимизация производительности клиентской части;
+— участие в код-ревью.
+
+Требования:
+— опыт коммерческой разработки на React от 2 лет;
+— уверенное знание JavaScript (ES6+), TypeScript;
+— опыт работы с REST и GraphQL;
+— понимание принципов адаптивной вёрстки.
+
+Условия:
+— полностью удаленный формат работы (удаленка из любой точки Казахстана);
+— гибкий график, оплачиваемый отпуск 24 дня;
+— ДМС после испытательного срока.
+Резюме присылайте на hr@edu-platform.kz с темой «Frontend».""",
+    # EN, Product Manager, office
+    """Acme Retail is hiring a Product Manager to own our loyalty program. The role is fully on-site in our Astana headquarters.
+
+What you will do:
+- Define the product vision and roadmap together with stakeholders
+- Run discovery: customer interviews, data analysis, A/B experiments
+- Write clear user stories and acceptance criteria for the delivery team
+- Track KPIs and report to the head of product
+
+What we expect:
+- 4+ years as a product manager or product owner in B2C
+- Strong analytical skills (SQL, Amplitude or similar)
+- Excellent communication in Russian and English
+
+This is an office based position, relocation support is available.""",
+    # RU, Project Manager, hybrid
+    """В крупный банк требуется руководитель проекта (Project Manager) для запуска цифровых продуктов.
+
+Обязанности:
+• планирование сроков и бюджета проектов, управление рисками;
+• координация работы команд разработки, аналитики и тестирования;
+• подготовка отчетности для руководства;
+• взаимодействие с подрядчиками.
+
+Требования:
+• опыт управления IT-проектами от 3 лет;
+• знание методологий Agile/Scrum и Waterfall;
+• сертификаты PMP/PMI будут преимуществом.
+
+Мы предлагаем:
+• гибридный формат работы (смешанный формат: офис в Алматы + удаленно);
+• конкурентную заработную плату, годовой бонус;
+• корпоративное обучение.""",
+    # EN, UX/UI Designer, remote-first
+    """We are a remote-first design studio building fintech and e-commerce products for clients in Europe and Central Asia. We're looking for a UX/UI Designer who loves solving complex problems with simple interfaces.
+
+You will:
+* Conduct user research and usability testing
+* Create user flows, wireframes and high-fidelity prototypes in Figma
+* Maintain and evolve our design system
+* Collaborate with frontend developers during implementation
+
+You have:
+* Portfolio showing end-to-end product design work
+* 2+ years of experience as a product designer or UI designer
+* Understanding of accessibility guidelines
+
+Work from anywhere, flexible working hours. Questions: design-jobs@studio.io""",
+    # RU, QA, office
+    """Компания-интегратор ищет инженера по тестированию (QA Engineer) в офис в Караганде.
+
+Чем предстоит заниматься:
+1. Ручное тестирование веб-приложений и мобильных приложений.
+2. Составление тест-кейсов и чек-листов.
+3. Регресс перед релизами, оформление баг-репортов в Jira.
+
+Что ждём от кандидата:
+1. Опыт тестирования от 1 года.
+2. Понимание клиент-серверной архитектуры, базовые знания SQL.
+3. Желание развиваться в автоматизации тестирования.
+
+Условия: работа в офисе, 5/2 с 9:00 до 18:00, официальное трудоустройство.""",
+    # EN, generic engineering, not remote
+    """Build the future of logistics with us. Our platform team builds internal tools used by 3,000 employees. This role is not remote: you will work from our office in Almaty with a flexible working schedule.
+
+Responsibilities include building dashboards, integrating with ERP systems and improving build pipelines. We use Python, Go, Kubernetes and PostgreSQL.
+
+Nice to have: experience with data engineering and observability tooling.""",
+    # Mixed RU/EN, Frontend, hybrid
+    """Senior Frontend Engineer (Vue/Angular) — гибрид, Астана.
+
+О команде: мы делаем B2B SaaS для HR-отделов, 40+ клиентов в СНГ.
+Stack: Vue 3, Angular 16 (legacy), TypeScript, Vite, Jest, Cypress.
+
+Вам предстоит:
+- развивать SPA, переводить legacy-модули на Vue 3;
+- писать unit и e2e тесты;
+- менторить junior-разработчиков.
+
+Мы предлагаем hybrid format (2–3 дня в офисе), компенсацию спорта и курсы английского. Контакт: talent@hr-saas.com""",
+]
+
+_PAGE_HEADER = (
+    "Главная Сеть Вакансии Сообщения Уведомления {title} {company} · {city} · 2 дня назад · "
+    "Более 100 откликов Гибридный формат Полная занятость Откликнуться Сохранить "
+)
+_PAGE_FOOTER = (
+    " О компании {company} 1 234 подписчика Подписаться Информационные технологии 201–500 сотрудников "
+    "Похожие вакансии Отправлять оповещения о похожих вакансиях © LinkedIn Corporation 2026"
+)
+
+_TITLES = [
+    "QA Automation Engineer",
+    "Frontend Developer",
+    "Product Manager",
+    "Руководитель проекта",
+    "UX/UI Designer",
+    "Инженер по тестированию",
+    "Platform Engineer",
+    "Senior Frontend Engineer",
+]
+_COMPANIES = ["PayTech", "EduPlatform", "Acme Retail", "Halyk Digital", "Studio", "Integrator", "LogiCo", "HR SaaS"]
+_CITIES = ["Алматы", "Астана", "Караганда"]
+
+
+def descriptions(n: int = 400, seed: int = 42) -> List[str]:
+    """n описаний разной длины: базовые тексты, склеенные и перемешанные по абзацам."""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        base = _BASE_DESCRIPTIONS[i % len(_BASE_DESCRIPTIONS)]
+        paragraphs = base.split("\n\n")
+        extra = rnd.choice(_BASE_DESCRIPTIONS).split("\n\n")
+        rnd.shuffle(extra)
+        text = "\n\n".join(paragraphs + extra[: rnd.randint(0, len(extra))])
+        out.append(text)
+    return out
+
+
+def page_texts(n: int = 400, seed: int = 42) -> List[str]:
+    """Тексты <main> страницы вакансии, как их видит scrape_job_description."""
+    rnd = random.Random(seed)
+    out = []
+    for i, desc in enumerate(descriptions(n, seed)):
+        title = _TITLES[i % len(_TITLES)]
+        company = rnd.choice(_COMPANIES)
+        city = rnd.choice(_CITIES)
+        marker = "Об этой вакансии" if i % 2 else "About this job"
+        out.append(
+            _PAGE_HEADER.format(title=title, company=company, city=city)
+            + marker
+            + "\n"
+            + desc
+            + "\n…Показать еще\n"
+            + _PAGE_FOOTER.format(company=company)
+        )
+    return out
+
+
+def titled_jobs(n: int = 400, seed: int = 42) -> List[Tuple[str, str]]:
+    """Пары (title, description) для фильтра по роли."""
+    return [(_TITLES[i % len(_TITLES)], d) for i, d in enumerate(descriptions(n, seed))]
@@ -0,0 +1,33 @@
+"""
+Прежние реализации, с которыми сравниваются оптимизированные версии.
+
+Код скопирован как был до перехода на app.linkedin.classify — только для бенчмарков.
+"""
+from typing import List
+
+from app.linkedin.patterns import _HYBRID_PATTERNS, _REMOTE_PATTERNS, _OFFICE_PATTERNS
+
+
+def extract_work_format(description: str) -> str:
+    text = description.lower()
+
+    for pattern in _HYBRID_PATTERNS:
+        if pattern.search(text):
+            return "hybrid"
+
+    for pattern in _REMOTE_PATTERNS:
+        if pattern.search(text):
+            return "remote"
+
+    for pattern in _OFFICE_PATTERNS:
+        if pattern.search(text):
+            return "office"
+
+    return ""
+
+
+def matches_role(title: str, description: str, role_keywords: List[str]) -> bool:
+    if not role_keywords:
+        return True
+    text_for_role = f"{title}\n{description}".lower()
+    return any(k in text_for_role for k in role_keywords)
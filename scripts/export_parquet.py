@@ -0,0 +1,146 @@
+"""
+Выгрузка table_1_linkedin_parser в Parquet (набор файлов с партициями city=/created_date=).
+
+Запуск из корня проекта:
+    python scripts/export_parquet.py --out export/vacancies
+    python scripts/export_parquet.py --out export/vacancies --partition-by city --overwrite
+
+Таблица читается серверным курсором пачками по --chunk-size строк, каждая пачка
+сразу уходит в pyarrow.dataset, поэтому память клиента ограничена размером пачки.
+Малокардинальные колонки (source, location, work_format, company) хранятся как
+словари Arrow и пишутся со словарным кодированием Parquet.
+Нужен pyarrow: pip install pyarrow
+"""
+import argparse
+import os
+import sys
+import time
+
+# Добавляем корень проекта в путь
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+import psycopg2
+
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    print("Ошибка: в .env нет DATABASE_URL")
+    sys.exit(1)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    print("Ошибка: для выгрузки в Parquet нужен pyarrow (pip install pyarrow)")
+    sys.exit(1)
+
+# Колонки выгрузки: служебные ключи дедупликации (desc200, contact_norm, dedup_hash, minhash) не нужны аналитике
+_DICT = pa.dictionary(pa.int32(), pa.string())
+COLUMNS = [
+    ("id", pa.int64()),
+    ("source", _DICT),
+    ("title", pa.string()),
+    ("company", _DICT),
+    ("location", _DICT),
+    ("url", pa.string()),
+    ("description", pa.large_string()),
+    ("salary", pa.string()),
+    ("work_format", _DICT),
+    ("contact", pa.string()),
+    ("linkedin_job_id", pa.int64()),
+    ("posted_at", pa.date32()),
+    ("promoted", pa.bool_()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("updated_at", pa.timestamp("us", tz="UTC")),
+]
+DICTIONARY_COLUMNS = [name for name, type_ in COLUMNS if type_ == _DICT]
+
+# Колонки партиций вычисляются в SQL: город — из location, дата — из created_at
+PARTITIONS = {
+    "city": ("COALESCE(NULLIF(split_part(location, ',', 1), ''), 'unknown')", pa.string()),
+    "created_date": ("(created_at AT TIME ZONE 'UTC')::date", pa.date32()),
+}
+
+
+def build_schema(partition_by) -> "pa.Schema":
+    fields = [pa.field(name, type_) for name, type_ in COLUMNS]
+    fields += [pa.field(name, PARTITIONS[name][1]) for name in partition_by]
+    return pa.schema(fields)
+
+
+def iter_batches(conn, schema: "pa.Schema", partition_by, chunk_size: int):
+    """RecordBatch на каждую пачку строк серверного курсора."""
+    select = [name for name, _ in COLUMNS] + [f"{PARTITIONS[name][0]} AS {name}" for name in partition_by]
+    with conn.cursor(name="parquet_export") as cur:
+        cur.itersize = chunk_size
+        cur.execute("SELECT " + ", ".join(select) + " FROM table_1_linkedin_parser ORDER BY id")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выгрузка вакансий в Parquet")
+    parser.add_argument("--out", default="export/vacancies", help="Каталог набора Parquet")
+    parser.add_argument(
+        "--partition-by",
+        nargs="*",
+        choices=list(PARTITIONS),
+        default=list(PARTITIONS),
+        help="Колонки партиций (по умолчанию city created_date; без значений — без партиций)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Строк в пачке чтения и в row group")
+    parser.add_argument("--compression", default="zstd", help="Сжатие Parquet: zstd, snappy, gzip, none")
+    parser.add_argument("--overwrite", action="store_true", help="Заменить файлы в затронутых партициях")
+    args = parser.parse_args()
+
+    if not args.overwrite and os.path.isdir(args.out) and os.listdir(args.out):
+        print(f"Ошибка: каталог {args.out} не пуст (--overwrite заменит файлы партиций)")
+        sys.exit(1)
+
+    conn = psycopg2.connect(DATABASE_URL)
+    schema = build_schema(args.partition_by)
+    parquet = ds.ParquetFileFormat()
+    file_options = parquet.make_write_options(
+        compression=None if args.compression == "none" else args.compression,
+        use_dictionary=DICTIONARY_COLUMNS,
+    )
+
+    rows = 0
+
+    def counted(batches):
+        nonlocal rows
+        for batch in batches:
+            rows += batch.num_rows
+            print(f"\r[=] Прочитано строк: {rows}", end="", flush=True)
+            yield batch
+
+    started = time.monotonic()
+    try:
+        ds.write_dataset(
+            counted(iter_batches(conn, schema, args.partition_by, args.chunk_size)),
+            args.out,
+            schema=schema,
+            format=parquet,
+            file_options=file_options,
+            partitioning=ds.partitioning(
+                pa.schema([schema.field(name) for name in args.partition_by]), flavor="hive"
+            ) if args.partition_by else None,
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="delete_matching" if args.overwrite else "error",
+            max_rows_per_group=args.chunk_size,
+        )
+    finally:
+        conn.close()
+
+    elapsed = time.monotonic() - started
+    print(f"\n[+] Выгружено {rows} строк в {args.out} за {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} строк/с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Почти-дубликаты среди уже сохранённых вакансий (MinHash + LSH, как в runner).
+
+Запуск из корня проекта:
+    python scripts/near_duplicates.py                    # дописать сигнатуры и напечатать пары
+    python scripts/near_duplicates.py --out pairs.csv    # пары в CSV
+    python scripts/near_duplicates.py --backfill-only    # только заполнить колонку minhash
+
+Сначала для строк без сигнатуры (старые записи) считается minhash, затем все
+вакансии по порядку id проходят через индекс: пара — более поздняя запись и
+самая похожая из более ранних.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+# Добавляем корень проекта в путь
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+import psycopg2
+from psycopg2.extras import execute_values
+
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    print("Ошибка: в .env нет DATABASE_URL")
+    sys.exit(1)
+
+from app.config import NEAR_DUP_THRESHOLD
+from app.dedupe.minhash import MinHasher, NearDupIndex
+from app.storage.postgres import PostgresStorage
+
+
+def backfill(conn, hasher: MinHasher, batch_size: int) -> int:
+    """Считает minhash для строк, где его нет. Возвращает число обновлённых строк."""
+    updated = 0
+    with conn.cursor(name="minhash_backfill") as src, conn.cursor() as dst:
+        src.itersize = batch_size
+        src.execute("SELECT id, description FROM table_1_linkedin_parser WHERE minhash IS NULL ORDER BY id")
+        batch = []
+        for id_, description in src:
+            sig = hasher.signature_bytes(description or "")
+            if sig is None:
+                continue
+            batch.append((id_, psycopg2.Binary(sig)))
+            if len(batch) >= batch_size:
+                updated += _update(dst, batch)
+                batch = []
+        if batch:
+            updated += _update(dst, batch)
+    conn.commit()
+    return updated
+
+
+def _update(cur, batch) -> int:
+    execute_values(
+        cur,
+        "UPDATE table_1_linkedin_parser AS t SET minhash = v.minhash "
+        "FROM (VALUES %s) AS v (id, minhash) WHERE t.id = v.id",
+        batch,
+    )
+    return len(batch)
+
+
+def find_pairs(conn, index: NearDupIndex, batch_size: int):
+    """Пары (id, id более ранней похожей записи, похожесть, title, title похожей)."""
+    titles = {}
+    with conn.cursor(name="minhash_pairs") as cur:
+        cur.itersize = batch_size
+        cur.execute(
+            "SELECT id, title, minhash FROM table_1_linkedin_parser WHERE minhash IS NOT NULL ORDER BY id"
+        )
+        for id_, title, data in cur:
+            sig = index.hasher.from_bytes(bytes(data))
+            if sig is None:
+                continue
+            match = index.query(sig)
+            if match:
+                dup_of, score = match
+                yield id_, dup_of, score, title or "", titles.get(dup_of, "")
+            else:
+                index.add(id_, sig)
+                titles[id_] = title or ""
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Почти-дубликаты вакансий в БД")
+    parser.add_argument("--threshold", type=float, default=NEAR_DUP_THRESHOLD, help="Минимальная похожесть (0..1)")
+    parser.add_argument("--out", default=None, help="CSV с парами (по умолчанию — печать)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Размер пачки чтения и UPDATE")
+    parser.add_argument("--backfill-only", action="store_true", help="Только заполнить колонку minhash")
+    args = parser.parse_args()
+
+    # Подключение через PostgresStorage: таблица мигрируется (колонка minhash) при подключении
+    storage = PostgresStorage(DATABASE_URL)
+    storage.connect()
+    conn = storage.conn
+    hasher = MinHasher()
+
+    started = time.monotonic()
+    updated = backfill(conn, hasher, args.batch_size)
+    print(f"[+] Сигнатуры посчитаны: {updated} строк ({time.monotonic() - started:.1f}s)")
+    if args.backfill_only:
+        storage.close()
+        return
+
+    started = time.monotonic()
+    index = NearDupIndex(hasher, threshold=args.threshold)
+    pairs = 0
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else None
+    try:
+        writer = csv.writer(out) if out else None
+        if writer:
+            writer.writerow(["id", "duplicate_of", "similarity", "title", "duplicate_of_title"])
+        for id_, dup_of, score, title, dup_title in find_pairs(conn, index, args.batch_size):
+            pairs += 1
+            if writer:
+                writer.writerow([id_, dup_of, f"{score:.3f}", title, dup_title])
+            else:
+                print(f"  {id_:6} ~ {dup_of:6} | {score:.2f} | {title[:45]:45} | {dup_title[:45]}")
+    finally:
+        if out:
+            out.close()
+    elapsed = time.monotonic() - started
+    print(f"[+] Проверено записей: {len(index) + pairs}, почти-дубликатов: {pairs} ({elapsed:.1f}s)")
+    if args.out:
+        print(f"[+] Пары: {args.out}")
+    storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,24 @@
 Просмотр таблицы table_1_linkedin_parser в PostgreSQL.
 Запуск из корня проекта: python -m scripts.view_vacancies
 Или: python scripts/view_vacancies.py (из корня проекта)
+
+Примеры:
+    python scripts/view_vacancies.py                                   # последние 20 вакансий
+    python scripts/view_vacancies.py --city Алматы --work-format remote --has-email
+    python scripts/view_vacancies.py --since 2026-01-01 --until 2026-01-31 --limit 0 --format csv --out jan.csv
+    python scripts/view_vacancies.py --after 2026-01-31T10:00:00+00:00,1234  # следующая страница
+
+Страницы листаются по ключу (created_at, id), а не через OFFSET: каждая страница —
+проход по индексу от курсора, время не зависит от её номера. Число записей —
+оценка планировщика (EXPLAIN), точный COUNT(*) — только для небольших выборок
+или с --exact-count. Строки читаются серверным курсором и выводятся по мере чтения.
 """
+import argparse
+import csv
+import json
 import os
 import sys
+from datetime import date, datetime
 
 # Добавляем корень проекта в путь
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,35 +33,156 @@ if not DATABASE_URL:
     print("Ошибка: в .env нет DATABASE_URL")
     sys.exit(1)
 
+COLUMNS = ["id", "created_at", "title", "company", "location", "work_format", "salary", "contact", "url"]
+# Выборки, по оценке планировщика меньше стольких строк, считаются точным COUNT(*)
+EXACT_COUNT_BELOW = 50_000
+# Строк за одно обращение серверного курсора
+FETCH_SIZE = 2000
+
+
+def build_where(args):
+    """Условия WHERE и параметры по фильтрам командной строки."""
+    where, params = [], []
+    if args.city:
+        where.append("location ILIKE %s")
+        params.append(args.city.replace("%", r"\%").replace("_", r"\_") + "%")
+    if args.work_format:
+        where.append("lower(work_format) = ANY(%s)")
+        params.append([f.lower() for f in args.work_format])
+    if args.since:
+        where.append("created_at >= %s")
+        params.append(args.since)
+    if args.until:
+        # --until включительно: до начала следующего дня
+        where.append("created_at < %s::date + 1")
+        params.append(args.until)
+    if args.has_email:
+        # contact — "email | linkedin | url", email (если есть) идёт первым
+        where.append("contact ~ '^[^ |]+@'")
+    return where, params
+
+
+def count_rows(cur, where, params, exact: bool):
+    """(число строк, точное ли оно). Большие выборки — по оценке планировщика, без скана."""
+    sql = "FROM table_1_linkedin_parser" + (" WHERE " + " AND ".join(where) if where else "")
+    if not exact:
+        cur.execute("EXPLAIN (FORMAT JSON) SELECT 1 " + sql, params)
+        estimate = int(cur.fetchone()[0][0]["Plan"]["Plan Rows"])
+        if estimate >= EXACT_COUNT_BELOW:
+            return estimate, False
+    cur.execute("SELECT COUNT(*) " + sql, params)
+    return cur.fetchone()[0], True
+
+
+def parse_cursor(value: str):
+    """Курсор страницы "created_at,id" (печатается после каждой страницы)."""
+    try:
+        created, id_ = value.rsplit(",", 1)
+        return datetime.fromisoformat(created), int(id_)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается created_at,id, получено {value!r}") from None
+
+
+def iter_rows(conn, where, params, after, limit: int):
+    """Строки по убыванию (created_at, id) начиная после курсора after; limit 0 — без ограничения."""
+    where = list(where)
+    params = list(params)
+    if after:
+        where.append("(created_at, id) < (%s, %s)")
+        params.extend(after)
+    sql = (
+        "SELECT " + ", ".join(COLUMNS) + " FROM table_1_linkedin_parser"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + " ORDER BY created_at DESC, id DESC"
+    )
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+    with conn.cursor(name="view_vacancies") as cur:
+        cur.itersize = min(limit, FETCH_SIZE) if limit else FETCH_SIZE
+        cur.execute(sql, params)
+        for row in cur:
+            yield dict(zip(COLUMNS, row))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} не сериализуется в JSON")
+
+
+def print_table(rows, out):
+    print("id | created_at | title | location | work_format:", file=out)
+    print("-" * 110, file=out)
+    for r in rows:
+        title = r["title"] or ""
+        title_short = title[:50] + ("..." if len(title) > 50 else "")
+        loc = (r["location"] or "")[:25]
+        created = r["created_at"].strftime("%Y-%m-%d %H:%M") if r["created_at"] else ""
+        print(f"  {r['id']:6} | {created:16} | {title_short:53} | {loc:25} | {r['work_format'] or ''}", file=out)
+        yield r
+
+
+def write_csv(rows, out):
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+    writer.writeheader()
+    for r in rows:
+        writer.writerow(r)
+        yield r
+
+
+def write_ndjson(rows, out):
+    for r in rows:
+        out.write(json.dumps(r, ensure_ascii=False, default=_json_default) + "\n")
+        yield r
+
+
+WRITERS = {"table": print_table, "csv": write_csv, "ndjson": write_ndjson}
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Просмотр и выборка вакансий из БД")
+    parser.add_argument("--city", help="Город: начало location, без учёта регистра")
+    parser.add_argument("--work-format", action="append", help="Формат работы (можно несколько раз)")
+    parser.add_argument("--since", type=date.fromisoformat, help="Добавлены с даты (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Добавлены по дату включительно (YYYY-MM-DD)")
+    parser.add_argument("--has-email", action="store_true", help="Только вакансии с email в контактах")
+    parser.add_argument("--limit", type=int, default=20, help="Строк на странице (0 — все, потоком)")
+    parser.add_argument("--after", type=parse_cursor, help="Курсор следующей страницы: created_at,id")
+    parser.add_argument("--format", choices=list(WRITERS), default="table", help="Формат вывода")
+    parser.add_argument("--out", default=None, help="Файл вывода (по умолчанию — stdout)")
+    parser.add_argument("--exact-count", action="store_true", help="Точный COUNT(*) вместо оценки")
+    parser.add_argument("--no-count", action="store_true", help="Не считать число записей")
+    args = parser.parse_args()
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    # Служебные сообщения — в stderr, если stdout занят CSV/NDJSON
+    log = sys.stdout if args.format == "table" and args.out is None else sys.stderr
+
     conn = psycopg2.connect(DATABASE_URL)
-    cur = conn.cursor()
-
-    # Количество записей
-    cur.execute("SELECT COUNT(*) FROM table_1_linkedin_parser")
-    total = cur.fetchone()[0]
-    print(f"Всего записей в vacancies: {total}\n")
-
-    # Последние 20 вакансий (id, title, location, created_at)
-    cur.execute("""
-        SELECT id, title, location, created_at
-        FROM table_1_linkedin_parser
-        ORDER BY id DESC
-        LIMIT 20
-    """)
-    rows = cur.fetchall()
-    print("Последние 20 записей (id | title | location | created_at):")
-    print("-" * 80)
-    for r in rows:
-        id_, title, location, created = r
-        title_short = (title or "")[:50] + ("..." if len(title or "") > 50 else "")
-        loc = (location or "")[:25]
-        print(f"  {id_:5} | {title_short:53} | {loc:25} | {created}")
-
-    cur.close()
-    conn.close()
-    print("\n[+] Готово. Подключение к БД закрыто.")
+    conn.set_session(readonly=True)
+    where, params = build_where(args)
+    try:
+        if not args.no_count:
+            with conn.cursor() as cur:
+                total, exact = count_rows(cur, where, params, args.exact_count)
+            print(f"Записей{' по фильтрам' if where else ''}: {total if exact else f'~{total}'}\n", file=log)
+
+        last = None
+        shown = 0
+        for row in WRITERS[args.format](iter_rows(conn, where, params, args.after, args.limit), out):
+            last = row
+            shown += 1
+    finally:
+        conn.close()
+        if args.out:
+            out.close()
+
+    if args.limit and shown == args.limit and last and last["created_at"]:
+        print(f"\nСледующая страница: --after {last['created_at'].isoformat()},{last['id']}", file=log)
+    if args.out:
+        print(f"[+] Записано строк: {shown} в {args.out}", file=log)
+    print("\n[+] Готово. Подключение к БД закрыто.", file=log)
 
 
 if __name__ == "__main__":
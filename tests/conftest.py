@@ -0,0 +1,4 @@
+import os
+
+# app.storage.postgres требует DATABASE_URL при импорте; тесты к БД не подключаются
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
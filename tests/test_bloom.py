@@ -0,0 +1,40 @@
+import hashlib
+
+from app.dedupe.bloom import BloomFilter
+
+
+def key(n: int) -> bytes:
+    return hashlib.md5(f"job-{n}".encode()).digest()
+
+
+def test_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for n in range(5000):
+        bloom.add(key(n))
+
+    assert all(key(n) in bloom for n in range(5000))
+    false_positives = sum(key(n) in bloom for n in range(5000, 25000))
+    assert false_positives / 20000 < 0.03
+    assert not bloom.full
+
+
+def test_save_and_load_round_trip(tmp_path):
+    bloom = BloomFilter(capacity=100, error_rate=0.001)
+    for n in range(50):
+        bloom.add(key(n))
+    bloom.watermark = 42
+    path = tmp_path / "bloom.bin"
+    bloom.save(str(path))
+
+    loaded = BloomFilter.load(str(path), error_rate=0.001)
+    assert loaded.bits == bloom.bits
+    assert (loaded.count, loaded.watermark) == (50, 42)
+    assert all(key(n) in loaded for n in range(50))
+
+
+def test_load_rejects_damaged_file(tmp_path):
+    path = tmp_path / "bloom.bin"
+    BloomFilter(capacity=100, error_rate=0.001).save(str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    assert BloomFilter.load(str(path), error_rate=0.001) is None
+    assert BloomFilter.load(str(tmp_path / "missing.bin"), error_rate=0.001) is None
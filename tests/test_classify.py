@@ -0,0 +1,65 @@
+import pytest
+
+from app.config import ROLE_KEYWORDS
+from app.linkedin.classify import Classification, TextClassifier
+from benchmarks import legacy
+from benchmarks.corpus import descriptions, titled_jobs
+
+CORPUS_SIZE = 200
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return TextClassifier(role_keywords={"UI": ["ui", "figma"], "QA": ["qa", "test"]})
+
+
+@pytest.mark.parametrize(
+    "title, description, roles",
+    [
+        ("Build engineer", "We build and guide", frozenset()),
+        ("UI designer", "", frozenset({"UI"})),
+        ("Designer", "Макеты в Figma, UI-kit", frozenset({"UI"})),
+        ("Aqua developer", "Testing of APIs", frozenset({"QA"})),
+        ("QA/UI", "", frozenset({"QA", "UI"})),
+    ],
+)
+def test_short_keywords_match_whole_words_only(classifier, title, description, roles):
+    assert classifier.classify(title, description).roles == roles
+    for role in ("UI", "QA"):
+        assert classifier.matches_role(title, description, role) == (role in roles)
+
+
+def test_work_format_ignores_title(classifier):
+    assert classifier.classify("Remote QA", "Работа в офисе").work_format == "office"
+
+
+def test_classify_many_equals_single_calls():
+    classifier = TextClassifier()
+    jobs = titled_jobs(CORPUS_SIZE) + [("", ""), (None, None)]
+    assert classifier.classify_many(jobs) == [classifier.classify(t, d) for t, d in jobs]
+    assert classifier.classify_many([]) == []
+    assert classifier.classify_many([("", "")]) == [Classification()]
+
+
+def test_work_format_agrees_with_legacy():
+    classifier = TextClassifier()
+    docs = descriptions(CORPUS_SIZE)
+    batch = classifier.classify_many(("", d) for d in docs)
+    for d, result in zip(docs, batch):
+        expected = legacy.extract_work_format(d)
+        assert classifier.work_format(d) == expected
+        assert result.work_format == expected
+
+
+def test_roles_agree_with_legacy_except_word_boundaries():
+    classifier = TextClassifier()
+    jobs = titled_jobs(CORPUS_SIZE)
+    for (title, description), result in zip(jobs, classifier.classify_many(jobs)):
+        text = f"{title}\n{description}".lower()
+        for role, keywords in ROLE_KEYWORDS.items():
+            old = legacy.matches_role(title, description, [k.lower() for k in keywords])
+            new = role in result.roles
+            if old != new:
+                # Прежний фильтр находил короткий ключ внутри слова («ui» в «build»)
+                assert old and not new
+                assert all(len(k) <= 3 for k in keywords if k.lower() in text)
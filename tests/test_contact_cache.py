@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.linkedin import contact_cache
+from app.linkedin.contact_cache import ContactCache
+from app.linkedin.extract import ContactInfoUnavailable
+
+PROFILE = "https://www.linkedin.com/in/recruiter/"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ContactCache(ttl_hours=24, negative_ttl_hours=1)
+    stored = []
+    monkeypatch.setattr(cache, "_from_db", lambda profile_url: None)
+    monkeypatch.setattr(cache, "_to_db", stored.append)
+    cache.stored = stored
+    return cache
+
+
+def test_transient_failure_is_not_cached(cache):
+    calls = []
+
+    async def failing():
+        calls.append("fail")
+        raise ContactInfoUnavailable(PROFILE)
+
+    async def ok():
+        calls.append("ok")
+        return {"email": "hr@example.com", "raw": "hr@example.com"}
+
+    async def main():
+        with pytest.raises(ContactInfoUnavailable):
+            await cache.get_or_fetch(PROFILE, failing)
+        return await cache.get_or_fetch(PROFILE, ok)
+
+    info = asyncio.run(main())
+    assert calls == ["fail", "ok"]
+    assert info["email"] == "hr@example.com"
+    assert [row["email"] for row in cache.stored] == ["hr@example.com"]
+
+
+def test_opened_panel_without_email_is_cached(cache):
+    calls = []
+
+    async def empty():
+        calls.append("empty")
+        return {"email": "", "raw": ""}
+
+    async def main():
+        await cache.get_or_fetch(PROFILE, empty)
+        return await cache.get_or_fetch(PROFILE, empty)
+
+    info = asyncio.run(main())
+    assert calls == ["empty"]
+    assert info["email"] == ""
+    assert cache.hits == 1 and len(cache.stored) == 1
+
+
+def test_memory_entries_expire_by_ttl(cache, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(contact_cache.time, "time", lambda: now[0])
+    calls = []
+
+    async def fetch_with_email():
+        calls.append("email")
+        return {"email": "hr@example.com", "raw": "hr@example.com"}
+
+    async def fetch_empty():
+        calls.append("empty")
+        return {"email": "", "raw": ""}
+
+    async def fetch(profile_url, fn):
+        return await cache.get_or_fetch(profile_url, fn)
+
+    other = "https://www.linkedin.com/in/other/"
+    asyncio.run(fetch(PROFILE, fetch_with_email))
+    asyncio.run(fetch(other, fetch_empty))
+
+    # Через 2 часа: отрицательный результат (TTL 1 ч) устарел, контакт (24 ч) — нет
+    now[0] += 2 * 3600
+    asyncio.run(fetch(PROFILE, fetch_with_email))
+    asyncio.run(fetch(other, fetch_empty))
+    assert calls == ["email", "empty", "empty"]
+
+    now[0] += 24 * 3600
+    asyncio.run(fetch(PROFILE, fetch_with_email))
+    assert calls == ["email", "empty", "empty", "email"]
+
+
+def test_concurrent_requests_share_one_fetch_and_release_lock(cache):
+    calls = []
+
+    async def slow_fetch():
+        calls.append("fetch")
+        await asyncio.sleep(0.01)
+        return {"email": "hr@example.com", "raw": "hr@example.com"}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch(PROFILE, slow_fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == ["fetch"]
+    assert all(r["email"] == "hr@example.com" for r in results)
+    assert cache.hits == 4 and cache.misses == 1
+    assert cache._locks == {}
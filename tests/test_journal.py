@@ -0,0 +1,49 @@
+from app.linkedin.journal import RunJournal, load_state
+from app.linkedin.runner import LocalSeen, _Crawl
+
+TASK = ("Алматы", 103035651, "Python Developer")
+LINKS = [f"https://www.linkedin.com/jobs/view/{n}/" for n in (1, 2, 3, 4)]
+
+
+def test_resume_after_crash_keeps_failed_and_unprocessed_links_pending(tmp_path):
+    journal = RunJournal("run1", runs_dir=str(tmp_path))
+    crawl = _Crawl(LocalSeen(), journal=journal)
+    crawl.task_queued(TASK, LINKS)
+    crawl.url_done(TASK, LINKS[0], "added")
+    crawl.url_done(TASK, LINKS[1], "failed")
+    crawl.url_done(TASK, LINKS[2], "duplicate")
+    # Падение: LINKS[3] не обработана, журнал не закрыт штатно
+    journal.close()
+
+    state = load_state("run1", runs_dir=str(tmp_path))
+    assert TASK not in state.done_tasks
+    assert state.url_status == {LINKS[0]: "added", LINKS[2]: "duplicate"}
+    assert state.pending_links(TASK) == [LINKS[1], LINKS[3]]
+
+    # Продолжение: занятыми считаются только окончательно обработанные ссылки
+    seen = LocalSeen()
+    _Crawl(seen, resume=state)
+    assert [url for url in LINKS if seen.claim_url(url)] == [LINKS[1], LINKS[3]]
+
+
+def test_task_with_failed_link_is_not_done(tmp_path):
+    journal = RunJournal("run2", runs_dir=str(tmp_path))
+    crawl = _Crawl(LocalSeen(), journal=journal)
+    crawl.task_queued(TASK, LINKS[:2])
+    crawl.url_done(TASK, LINKS[0], "filtered")
+    crawl.url_done(TASK, LINKS[1], "redirected")
+    journal.close()
+
+    state = load_state("run2", runs_dir=str(tmp_path))
+    assert TASK not in state.done_tasks
+    assert state.pending_links(TASK) == [LINKS[1]]
+
+    # Повторный обход дообрабатывает ссылку, и задача закрывается
+    journal = RunJournal("run2", runs_dir=str(tmp_path))
+    crawl = _Crawl(LocalSeen(), journal=journal, resume=state)
+    links = state.pending_links(TASK)
+    crawl.task_queued(TASK, links, from_journal=True)
+    crawl.url_done(TASK, links[0], "added")
+    journal.close()
+
+    assert TASK in load_state("run2", runs_dir=str(tmp_path)).done_tasks
@@ -0,0 +1,40 @@
+import pytest
+
+from app.metrics import RunMetrics
+
+
+def test_counters_and_gauges_in_report_and_prometheus():
+    metrics = RunMetrics()
+    metrics.inc("jobs", status="added")
+    metrics.inc("jobs", 2, status="added")
+    metrics.inc("jobs", status="failed")
+    metrics.inc("visits_saved", 5)
+    metrics.set_gauge("rate_limiter_rate_rps", 0.4)
+    metrics.set_gauge("rate_limiter_rate_rps", 0.2)
+
+    assert metrics.counter("jobs", status="added") == 3
+    assert metrics.counter("jobs", status="missing") == 0
+    assert metrics.gauge("rate_limiter_rate_rps") == 0.2
+
+    report = metrics.report()
+    assert report["counters"] == {"jobs": {"status=added": 3, "status=failed": 1}, "visits_saved": 5}
+    assert report["gauges"] == {"rate_limiter_rate_rps": 0.2}
+
+    text = metrics.prometheus_text()
+    assert text.count("# TYPE linkedin_scraper_jobs_total counter") == 1
+    assert 'linkedin_scraper_jobs_total{status="added"} 3' in text
+    assert "linkedin_scraper_visits_saved_total 5" in text
+    assert "# TYPE linkedin_scraper_rate_limiter_rate_rps gauge" in text
+    assert "linkedin_scraper_rate_limiter_rate_rps 0.2" in text
+
+
+def test_stage_is_recorded_when_block_raises():
+    metrics = RunMetrics()
+    with metrics.stage("goto"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.stage("goto"):
+            raise RuntimeError("timeout")
+    summary = metrics.report()["stages"]["goto"]
+    assert summary["count"] == 2
+    assert 'linkedin_scraper_stage_duration_seconds_count{stage="goto"} 2' in metrics.prometheus_text()
@@ -0,0 +1,54 @@
+import random
+
+from app.dedupe.minhash import MinHasher, NearDupIndex, similarity
+from benchmarks.corpus import descriptions
+
+BASE = descriptions(1)[0]
+
+
+def reposted(text: str) -> str:
+    # Репост: другая первая строка и подпись рекрутера, остальной текст тот же
+    lines = text.splitlines()
+    return "\n".join(["Срочно! Новая вакансия от нашего партнёра."] + lines[1:] + ["Пишите в Telegram @hr_almaty"])
+
+
+def random_text(seed: int, words: int = 200) -> str:
+    rnd = random.Random(seed)
+    vocab = BASE.split()
+    return " ".join(rnd.choice(vocab) for _ in range(words))
+
+
+def test_near_duplicate_pair_is_above_threshold():
+    index = NearDupIndex(MinHasher())
+    assert index.check_and_add(1, BASE) is None
+    match = index.check_and_add(2, reposted(BASE))
+    assert match is not None
+    assert match[0] == 1 and match[1] >= index.threshold
+
+
+def test_random_pair_is_not_flagged():
+    hasher = MinHasher()
+    index = NearDupIndex(hasher)
+    assert index.check_and_add(1, BASE) is None
+    assert index.check_and_add(2, random_text(7)) is None
+    assert similarity(hasher.signature(BASE), hasher.signature(random_text(7))) < index.threshold
+    assert len(index) == 2
+
+
+def test_same_job_is_not_its_own_duplicate():
+    index = NearDupIndex(MinHasher())
+    assert index.check_and_add(1, BASE) is None
+    assert index.check_and_add(1, BASE) is None
+    assert len(index) == 1
+
+
+def test_short_description_has_no_signature():
+    hasher = MinHasher()
+    assert hasher.signature("Python developer, remote") is None
+    assert NearDupIndex(hasher).check_and_add(1, "Python developer, remote") is None
+
+
+def test_signature_bytes_round_trip():
+    hasher = MinHasher()
+    sig = hasher.signature(BASE)
+    assert hasher.from_bytes(hasher.signature_bytes(BASE)) == sig
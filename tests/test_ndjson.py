@@ -0,0 +1,56 @@
+import pytest
+
+from app.models import Job
+from app.output.json_writer import write_jobs_to_json
+from app.output.ndjson_writer import NdjsonWriter, iter_ndjson, ndjson_to_json, part_path, part_paths
+
+
+def make_job(n: int) -> Job:
+    return Job(
+        job_url=f"https://www.linkedin.com/jobs/view/{n}/",
+        title=f"QA Engineer {n}",
+        description=f"Описание «{n}»\nс переводом строки и \"кавычками\"",
+        salary="не указана",
+        location="Алматы",
+        hr_email="hr@example.kz" if n % 2 else "",
+        hr_linkedin="",
+        linkedin_job_id=n or None,
+        posted_at="2026-03-01",
+        promoted=bool(n % 3),
+    )
+
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+@pytest.mark.parametrize("name", ["jobs.ndjson", "jobs.ndjson.gz"])
+def test_round_trip_equals_legacy_json(tmp_path, count, name):
+    jobs = [make_job(n) for n in range(count)]
+    with NdjsonWriter(tmp_path / name, fsync_every=2) as writer:
+        for job in jobs:
+            writer.write(job)
+
+    assert [Job(**record) for record in iter_ndjson(tmp_path / name)] == jobs
+    assert ndjson_to_json([tmp_path / name], tmp_path / "out.json") == count
+    legacy = write_jobs_to_json(jobs, tmp_path / "legacy.json")
+    assert (tmp_path / "out.json").read_text(encoding="utf-8") == legacy.read_text(encoding="utf-8")
+
+
+def test_append_after_crash_drops_torn_line(tmp_path):
+    path = tmp_path / "jobs.ndjson"
+    with NdjsonWriter(path) as writer:
+        writer.write(make_job(1))
+    with open(path, "ab") as fh:
+        fh.write(b'{"job_url": "https://www.linkedin.com/jobs/vi')
+
+    assert [r["job_url"] for r in iter_ndjson(path)] == [make_job(1).job_url]
+    with NdjsonWriter(path, append=True) as writer:
+        writer.write(make_job(2))
+    assert [Job(**r) for r in iter_ndjson(path)] == [make_job(1), make_job(2)]
+
+
+def test_part_paths_follow_shard_count(tmp_path):
+    path = tmp_path / "out.ndjson"
+    # shard5 — часть прошлого прогона с большим числом шардов
+    for i in (0, 1, 5):
+        with NdjsonWriter(part_path(path, f"shard{i}")) as writer:
+            writer.write(make_job(i))
+    assert part_paths(path, 3) == [part_path(path, "shard0"), part_path(path, "shard1")]
@@ -0,0 +1,30 @@
+from datetime import date
+
+import pytest
+
+from app.linkedin.parse import posted_date
+
+TODAY = date(2026, 3, 31)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2 дня назад", "2026-03-29"),
+        ("1 неделю назад", "2026-03-24"),
+        ("Reposted 3 hours ago", "2026-03-31"),
+        ("1 week ago", "2026-03-24"),
+        ("30+ days ago", "2026-03-01"),
+        ("1 мес. назад", "2026-03-01"),
+        ("2 нед. назад", "2026-03-17"),
+        ("3 ч назад", "2026-03-31"),
+        ("5 мин. назад", "2026-03-31"),
+        ("Just now", None),
+    ],
+)
+def test_posted_date_relative(text, expected):
+    assert posted_date(text, today=TODAY) == expected
+
+
+def test_posted_date_prefers_datetime_attr():
+    assert posted_date("30+ days ago", "2026-01-15", today=TODAY) == "2026-01-15"
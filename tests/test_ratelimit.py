@@ -0,0 +1,66 @@
+import asyncio
+import random
+
+from app.linkedin.ratelimit import AdaptiveRateLimiter
+from app.metrics import get_metrics
+
+
+def make_limiter(**kwargs) -> AdaptiveRateLimiter:
+    params = dict(start_rps=0.4, min_rps=0.05, max_rps=2.0, increase_rps=0.05, decrease_factor=0.5, jitter_sec=0)
+    params.update(kwargs)
+    return AdaptiveRateLimiter(**params)
+
+
+def test_rate_stays_within_bounds_under_signals():
+    limiter = make_limiter()
+    rnd = random.Random(1)
+    for _ in range(2000):
+        if rnd.random() < 0.2:
+            limiter.on_block("redirect", pause=False)
+        else:
+            limiter.on_success()
+        assert limiter.min_rps <= limiter.rate <= limiter.max_rps
+
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == limiter.max_rps
+    for _ in range(100):
+        limiter.on_block("authwall", pause=False)
+    assert limiter.rate == limiter.min_rps
+    assert limiter.min_rate_seen == limiter.min_rps and limiter.max_rate_seen == limiter.max_rps
+    assert get_metrics().gauge("rate_limiter_rate_rps") == limiter.min_rps
+
+
+def test_aimd_steps():
+    limiter = make_limiter()
+    limiter.on_success()
+    assert abs(limiter.rate - 0.45) < 1e-9
+    limiter.on_block("captcha", pause=False)
+    assert abs(limiter.rate - 0.225) < 1e-9
+    assert limiter.signals["captcha"] == 1
+
+
+def test_block_with_pause_delays_next_acquire():
+    limiter = make_limiter(start_rps=100, max_rps=100, cooldown_sec=0.2)
+    pauses_before = get_metrics().counter("rate_limiter_pauses", reason="checkpoint")
+
+    async def main():
+        await limiter.acquire()
+        limiter.on_block("checkpoint")
+        started = asyncio.get_running_loop().time()
+        await limiter.acquire()
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(main()) >= 0.19
+    assert get_metrics().counter("rate_limiter_pauses", reason="checkpoint") - pauses_before == 1
+
+
+def test_limiter_works_across_event_loops():
+    limiter = make_limiter(start_rps=1000, max_rps=1000)
+
+    async def acquire_twice():
+        await asyncio.gather(limiter.acquire(), limiter.acquire())
+
+    asyncio.run(acquire_twice())
+    asyncio.run(acquire_twice())
+    assert limiter.acquired == 4
@@ -0,0 +1,66 @@
+import asyncio
+
+from app.linkedin import runner
+from app.linkedin.journal import RunJournal, load_state
+from app.linkedin.runner import LocalSeen, _Crawl, _detail_worker
+from app.linkedin.shards import SharedSeen
+from app.metrics import get_metrics
+
+TASKS = [("Алматы", 103035651, "QA Engineer"), ("Астана", 106120046, "QA Engineer")]
+
+
+def test_local_seen_claims_once():
+    seen = LocalSeen()
+    assert seen.claim_url("a") and not seen.claim_url("a")
+    assert seen.claim_key(b"k") and not seen.claim_key(b"k")
+
+
+def test_shared_seen_first_shard_wins():
+    urls, keys = {}, {}
+    first, second = SharedSeen(urls, keys, owner=0), SharedSeen(urls, keys, owner=1)
+    assert first.claim_url("a")
+    assert not second.claim_url("a")
+    # Повтор в том же шарде — тоже не новая ссылка
+    assert not first.claim_url("a")
+    assert second.claim_key(b"k") and not first.claim_key(b"k")
+    assert urls == {"a": 0} and keys == {b"k": 1}
+
+
+def test_worker_pool_processes_each_link_once(tmp_path, monkeypatch):
+    links = {task: [f"https://www.linkedin.com/jobs/view/{i}{n}/" for n in range(7)] for i, task in enumerate(TASKS)}
+    statuses = {url: ("failed" if url.endswith("3/") else "added") for urls in links.values() for url in urls}
+    processed = []
+
+    async def fake_process_link(page, job_url, task, crawl):
+        await asyncio.sleep(0.001 * (len(processed) % 3))
+        processed.append((page, job_url))
+        return statuses[job_url]
+
+    monkeypatch.setattr(runner, "_process_link", fake_process_link)
+    added_before = get_metrics().counter("jobs", status="added")
+    journal = RunJournal("pool", runs_dir=str(tmp_path))
+    crawl = _Crawl(LocalSeen(), journal=journal)
+
+    async def main():
+        queue = asyncio.Queue(maxsize=4)
+        workers = [asyncio.create_task(_detail_worker(f"page{n}", queue, crawl)) for n in range(3)]
+        for task in TASKS:
+            crawl.task_queued(task, links[task])
+            for url in links[task]:
+                await queue.put((url, task))
+        for _ in workers:
+            await queue.put(runner._QUEUE_DONE)
+        await asyncio.gather(*workers)
+
+    asyncio.run(main())
+    journal.close()
+
+    assert sorted(url for _, url in processed) == sorted(statuses)
+    assert len({page for page, _ in processed}) == 3
+    assert get_metrics().counter("jobs", status="added") - added_before == 12
+    # В каждой задаче одна ссылка со сбоем: задачи остаются незавершёнными
+    state = load_state("pool", runs_dir=str(tmp_path))
+    assert state.done_tasks == set()
+    assert {task: state.pending_links(task) for task in TASKS} == {
+        task: [url for url in links[task] if statuses[url] == "failed"] for task in TASKS
+    }
@@ -0,0 +1,45 @@
+from app.linkedin.voyager import parse_voyager_payload
+
+POSTING_URL = "https://www.linkedin.com/voyager/api/jobs/jobPostings/4001"
+DESCRIPTION = "We are looking for a QA engineer to build and maintain our test automation."
+COMPANY_ABOUT = "Acme is a leading provider of everything, founded in 1949 and based in the desert."
+
+
+def _by_id(items):
+    return {item.job_id: item for item in items}
+
+
+def test_company_entity_description_is_not_attributed_to_job():
+    payload = {
+        "data": {"entityUrn": "urn:li:fsd_jobPosting:4001", "title": "QA Engineer"},
+        "included": [
+            {"entityUrn": "urn:li:fsd_company:77", "name": "Acme", "description": COMPANY_ABOUT},
+            {"description": {"text": COMPANY_ABOUT}},
+        ],
+    }
+    items = _by_id(parse_voyager_payload(POSTING_URL, payload, job_id=4001))
+    assert items[4001].title == "QA Engineer"
+    assert items[4001].description == ""
+
+
+def test_description_section_of_current_job_is_attributed():
+    payload = {
+        "included": [
+            {"entityUrn": "urn:li:fsd_company:77", "description": COMPANY_ABOUT},
+            {"entityUrn": "urn:li:fsd_jobDescription:4001", "description": {"text": DESCRIPTION}},
+            {"entityUrn": "urn:li:fsd_jobPosting:4001", "title": "QA Engineer"},
+        ],
+    }
+    items = _by_id(parse_voyager_payload(POSTING_URL, payload, job_id=4001))
+    assert items[4001].description == DESCRIPTION
+
+
+def test_description_with_job_posting_id():
+    payload = {"data": {"jobPostingId": 4001, "description": {"text": DESCRIPTION}}}
+    items = _by_id(parse_voyager_payload(POSTING_URL, payload, job_id=4001))
+    assert items[4001].description == DESCRIPTION
+
+
+def test_description_section_of_other_job_is_ignored():
+    payload = {"data": {"entityUrn": "urn:li:fsd_jobDescription:4002", "description": DESCRIPTION}}
+    assert parse_voyager_payload(POSTING_URL, payload, job_id=4001) == []
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+
+import psycopg2
+
+from app.metrics import get_metrics
+from app.models import Job
+from app.output.ndjson_writer import iter_ndjson
+from app.storage import writer as writer_mod
+from app.storage.postgres import INSERT_COLUMNS, job_to_row
+from app.storage.writer import BackgroundWriter
+
+URL_IDX = INSERT_COLUMNS.index("url")
+
+
+def make_job(n: int) -> Job:
+    return Job(
+        job_url=f"https://www.linkedin.com/jobs/view/{n}/",
+        title=f"Python Developer {n}",
+        description=f"Описание вакансии номер {n}",
+        salary="",
+        location="Алматы",
+        hr_email="",
+        hr_linkedin="",
+    )
+
+
+def test_put_does_not_block_loop_when_queue_is_full(tmp_path):
+    writer = BackgroundWriter(
+        "postgresql://unused", batch_size=1, queue_size=2, flush_interval_sec=0.05, spill_path=str(tmp_path / "spill.ndjson")
+    )
+    stalled = threading.Event()
+    release = threading.Event()
+    flushed = []
+
+    def stalled_flush(rows):
+        stalled.set()
+        release.wait(5)
+        flushed.extend(rows)
+
+    writer._flush = stalled_flush
+    dropped_before = get_metrics().counter("writer_rows_dropped", reason="queue_full")
+
+    async def main():
+        gaps = []
+
+        async def ticker():
+            last = time.monotonic()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        tick = asyncio.create_task(ticker())
+        writer.put(make_job(0), make_job(0).job_url)
+        await asyncio.to_thread(stalled.wait, 5)
+        for n in range(1, 50):
+            writer.put(make_job(n), make_job(n).job_url)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.05)
+        tick.cancel()
+        return gaps
+
+    try:
+        gaps = asyncio.run(main())
+    finally:
+        release.set()
+        writer.close()
+
+    # Очередь на 2 строки + одна в зависшем сбросе: остальные отброшены и посчитаны
+    assert writer.rows_dropped == 47
+    assert get_metrics().counter("writer_rows_dropped", reason="queue_full") - dropped_before == 47
+    assert len(flushed) == 3
+    assert max(gaps) < 0.5
+    assert writer.rows_spilled == 47
+    assert len(list(iter_ndjson(tmp_path / "spill.ndjson"))) == 47
+
+
+def test_rows_are_spilled_when_db_is_unavailable_and_replayed(tmp_path):
+    spill = tmp_path / "spill.ndjson"
+    writer = BackgroundWriter("postgresql://unused", batch_size=2, spill_path=str(spill))
+    writer._connect = lambda: False
+    dropped_before = get_metrics().counter("writer_rows_dropped", reason="db_unavailable")
+    jobs = [make_job(n) for n in range(3)]
+
+    writer._flush([(job_to_row(job, job.job_url), job) for job in jobs])
+    writer.close()
+
+    assert writer.rows_dropped == 3
+    assert get_metrics().counter("writer_rows_dropped", reason="db_unavailable") - dropped_before == 3
+    assert [Job(**record) for record in iter_ndjson(spill)] == jobs
+
+    replayed = []
+    writer = BackgroundWriter("postgresql://unused", batch_size=2, spill_path=str(spill))
+    writer._flush = lambda items: replayed.extend(job for _, job in items)
+    assert writer.replay_spill() == 3
+    assert replayed == jobs
+    assert not spill.exists()
+
+
+class FakeStorage:
+    """Соединение без БД: строки с url из bad падают, остальные запоминаются."""
+
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.rows = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.conn = self
+        self.cursor = self
+        self.closed = False
+
+    def _ensure_connected(self):
+        pass
+
+    def execute(self, sql, row):
+        if row[URL_IDX] in self.bad:
+            raise psycopg2.DataError("bad row")
+        self.rows.append(row)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+def test_failed_batch_falls_back_to_one_by_one(tmp_path, monkeypatch):
+    def failing_execute_values(cur, sql, rows, page_size):
+        raise psycopg2.DataError("batch failed")
+
+    monkeypatch.setattr(writer_mod, "execute_values", failing_execute_values)
+    jobs = [make_job(n) for n in range(5)]
+    storage = FakeStorage(bad={jobs[2].job_url})
+    writer = BackgroundWriter("postgresql://unused", batch_size=10, spill_path=str(tmp_path / "spill.ndjson"))
+    writer.storage = storage
+
+    for job in jobs:
+        writer.put(job, job.job_url)
+    writer.close()
+
+    assert [row[URL_IDX] for row in storage.rows] == [job.job_url for i, job in enumerate(jobs) if i != 2]
+    assert (writer.rows_written, writer.rows_failed, writer.batch_fallbacks) == (4, 1, 1)
+    # Плохая строка не откладывается в spill: повтор упал бы так же
+    assert writer.rows_dropped == 0 and not (tmp_path / "spill.ndjson").exists()
+
+
+def test_duplicate_keys_in_batch_are_collapsed(tmp_path, monkeypatch):
+    batches = []
+    monkeypatch.setattr(writer_mod, "execute_values", lambda cur, sql, rows, page_size: batches.append(rows))
+    writer = BackgroundWriter("postgresql://unused", batch_size=10, spill_path=str(tmp_path / "spill.ndjson"))
+    writer.storage = FakeStorage()
+
+    job = make_job(1)
+    writer.put(job, job.job_url)
+    writer.put(job, job.job_url)
+    writer.put(make_job(2), make_job(2).job_url)
+    writer.close()
+
+    assert len(batches) == 1 and len(batches[0]) == 2
+    assert writer.rows_written == 2